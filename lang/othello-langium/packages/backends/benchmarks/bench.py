@@ -0,0 +1,354 @@
+"""
+Benchmarks du backend : génération de coups, Minimax, évaluation, endpoint /move et logger LLM.
+
+Les positions mesurées sont fixes (tirées avec une graine à partir des variants
+livrés) pour que deux exécutions soient comparables. Les résultats sont écrits en
+JSON et peuvent être comparés à une référence enregistrée :
+
+    python bench.py --out results.json
+    python bench.py --compare baseline.json            # code de sortie 1 en cas de régression
+    python bench.py --save-baseline baseline.json      # nouvelle référence
+    python bench.py --quick --only movegen,minimax
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+BACKENDS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(os.path.join(BACKENDS_DIR, "server"))
+sys.path.append(os.path.join(BACKENDS_DIR, "llm"))
+
+from ai import get_valid_moves, apply_move, search_minimax
+from variants import load_variants, initial_board
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# Écart relatif toléré avant de signaler une régression (surchargé par métrique dans la référence)
+DEFAULT_THRESHOLD = 0.25
+
+# Variants mesurés : un plateau 8x8 et un plateau 16x16
+BOARD_VARIANTS = {"8x8": "variant1", "16x16": "variant3"}
+
+# Profondeur maximale du Minimax mesurée pour chaque taille de plateau
+SEARCH_DEPTHS = {"8x8": 5, "16x16": 3}
+
+# Recherche "nue" : sans cache de coups, bibliothèque d'ouvertures ni résolution de finale
+RAW_SEARCH = {"useCache": False, "useBook": False, "endgameEmpties": -1}
+
+SEED = 2024
+
+
+def sample_positions(config, count, min_plies, max_plies, seed=SEED):
+    """
+    Positions atteintes par des coups aléatoires (graine fixe) depuis la position initiale.
+
+    Returns:
+        list: [(plateau, camp au trait), ...]
+    """
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        board, player = initial_board(config), "black"
+        for _ in range(rng.randint(min_plies, max_plies)):
+            moves = get_valid_moves(board, player)
+            if not moves:
+                player = "white" if player == "black" else "black"
+                moves = get_valid_moves(board, player)
+                if not moves:
+                    break
+            board = apply_move(board, rng.choice(moves), player)
+            player = "white" if player == "black" else "black"
+        if get_valid_moves(board, player):
+            positions.append((board, player))
+    return positions
+
+
+def timed(fn, min_seconds):
+    """Répète `fn` pendant au moins `min_seconds` ; renvoie (appels, secondes)"""
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        calls += fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            return calls, elapsed
+
+
+def metric(value, unit, better):
+    return {"value": round(value, 3), "unit": unit, "better": better}
+
+
+def bench_movegen(variants, quick):
+    """Débit de get_valid_moves et apply_move sur un jeu de positions fixe"""
+    results = {}
+    for size, name in BOARD_VARIANTS.items():
+        positions = sample_positions(variants[name], 50, 4, 40)
+
+        def valid_moves_round():
+            for board, player in positions:
+                get_valid_moves(board, player)
+            return len(positions)
+
+        moves = [(board, player, move) for board, player in positions for move in get_valid_moves(board, player)]
+
+        def apply_round():
+            for board, player, move in moves:
+                apply_move(board, move, player)
+            return len(moves)
+
+        calls, seconds = timed(valid_moves_round, 0.2 if quick else 1.0)
+        results[f"movegen.{size}.valid_moves_per_s"] = metric(calls / seconds, "calls/s", "higher")
+        calls, seconds = timed(apply_round, 0.2 if quick else 1.0)
+        results[f"movegen.{size}.apply_move_per_s"] = metric(calls / seconds, "calls/s", "higher")
+    return results
+
+
+def bench_minimax(variants, quick):
+    """Nœuds/s et temps pour atteindre chaque profondeur (recherche séquentielle, sans cache)"""
+    results = {}
+    for size, name in BOARD_VARIANTS.items():
+        positions = sample_positions(variants[name], 3 if quick else 8, 6, 20, seed=SEED + 1)
+        max_depth = SEARCH_DEPTHS[size] - (1 if quick else 0)
+        config = dict(RAW_SEARCH, boardType=variants[name].get("boardType"),
+                      scoreGoal=variants[name].get("scoreGoal"))
+        for depth in range(1, max_depth + 1):
+            nodes, seconds = 0, 0.0
+            for board, player in positions:
+                result = search_minimax(board, player, depth, workers=1, config=config)
+                nodes += result.nodes
+                seconds += result.elapsed
+            results[f"minimax.{size}.depth{depth}_ms"] = metric(seconds * 1000 / len(positions), "ms", "lower")
+        results[f"minimax.{size}.nodes_per_s"] = metric(nodes / seconds, "nodes/s", "higher")
+    return results
+
+
+def bench_evaluation(variants, quick):
+    """
+    Coût d'une évaluation positionnelle hors cache, et part de la mobilité et des pions
+    frontière, recalculés à chaque feuille plutôt que tenus à jour par Position
+    """
+    from bitboard import allow_diagonal, from_board, valid_moves_mask
+    from search import Position, BLACK, WHITE
+    from evaluation import make_evaluator
+    from ai import get_search_config
+
+    results = {}
+    for size, name in BOARD_VARIANTS.items():
+        config = get_search_config(initial_board(variants[name]), variants[name])
+        positions = []
+        for board, player in sample_positions(variants[name], 50, 4, 40, seed=SEED + 3):
+            geom, own, opp, empty = from_board(board, player, allow_diagonal(config))
+            positions.append(Position.from_sides(geom, own, opp, empty, BLACK if player == "black" else WHITE))
+        evaluator = make_evaluator(positions[0].geom, config)
+
+        def evaluate_round():
+            evaluator.cache.clear()
+            for pos in positions:
+                evaluator.evaluate(pos)
+            return len(positions)
+
+        def mobility_round():
+            for pos in positions:
+                own, opp = pos.own(), pos.opp()
+                valid_moves_mask(pos.geom, own, opp, pos.empty).bit_count()
+                valid_moves_mask(pos.geom, opp, own, pos.empty).bit_count()
+            return len(positions)
+
+        def frontier_round():
+            for pos in positions:
+                frontier = evaluator._adjacent_to(pos.empty)
+                (pos.own() & frontier).bit_count() - (pos.opp() & frontier).bit_count()
+            return len(positions)
+
+        for term, fn in (("evaluate", evaluate_round), ("mobility", mobility_round), ("frontier", frontier_round)):
+            calls, seconds = timed(fn, 0.2 if quick else 1.0)
+            results[f"eval.{size}.{term}_us"] = metric(seconds * 1e6 / calls, "us", "lower")
+    return results
+
+
+def percentile(sorted_values, p):
+    index = min(len(sorted_values) - 1, max(0, round(p / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def bench_move_endpoint(variants, quick):
+    """Latence de /move (Minimax, profondeur 3) sous charge concurrente, via le client de test Flask"""
+    from server import app
+
+    config = variants[BOARD_VARIANTS["8x8"]]
+    positions = sample_positions(config, 16, 4, 30, seed=SEED + 2)
+    payloads = [{"board": board, "player": player, "aiType": "minimax", "depth": 3,
+                 "config": dict(RAW_SEARCH, boardType=config.get("boardType"), scoreGoal=config.get("scoreGoal"))}
+                for board, player in positions]
+    requests_count = 64 if quick else 256
+    concurrency = 8
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    counter = iter(range(requests_count))
+
+    def client_loop():
+        client = app.test_client()
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                return
+            start = time.perf_counter()
+            response = client.post("/move", json=payloads[i % len(payloads)])
+            elapsed = time.perf_counter() - start
+            if response.status_code != 200:
+                errors.append(response.status_code)
+                return
+            with lock:
+                latencies.append(elapsed * 1000)
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        threads = [threading.Thread(target=client_loop) for _ in range(concurrency)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    wall = time.perf_counter() - start
+    if errors:
+        raise RuntimeError(f"/move returned HTTP {errors[0]}")
+
+    latencies.sort()
+    return {
+        "move.p50_ms": metric(percentile(latencies, 50), "ms", "lower"),
+        "move.p90_ms": metric(percentile(latencies, 90), "ms", "lower"),
+        "move.p99_ms": metric(percentile(latencies, 99), "ms", "lower"),
+        "move.requests_per_s": metric(len(latencies) / wall, "requests/s", "higher"),
+    }
+
+
+def bench_logger(variants, quick):
+    """Coût d'une interaction journalisée : sur le chemin de la requête, puis jusqu'au disque"""
+    import llm_logger
+
+    interactions = 200 if quick else 1000
+    prompt = {"model": "openai/gpt-4o",
+              "messages": [{"role": "system", "content": "x" * 1500}, {"role": "user", "content": "y" * 500}]}
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+        llm_logger.LOG_DIR = llm_logger.Path(tmp)
+        session = llm_logger.start_game_session(game_mode="benchmark", session_id="benchmark")
+        start = time.perf_counter()
+        for _ in range(interactions):
+            llm_logger.log_interaction(prompt, '{"move": "D3"}', {"move": "D3"}, {"model": "openai/gpt-4o"},
+                                       0.5, session_id=session.session_id)
+        enqueue = time.perf_counter() - start
+        llm_logger.end_game_session(session_id=session.session_id)
+        total = time.perf_counter() - start
+    return {
+        "logger.log_interaction_us": metric(enqueue * 1e6 / interactions, "us", "lower"),
+        "logger.durable_per_interaction_us": metric(total * 1e6 / interactions, "us", "lower"),
+    }
+
+
+BENCHMARKS = {
+    "movegen": bench_movegen,
+    "minimax": bench_minimax,
+    "eval": bench_evaluation,
+    "move": bench_move_endpoint,
+    "logger": bench_logger,
+}
+
+
+def run(only=None, quick=False, log=print):
+    variants = load_variants()
+    results = {}
+    for name, bench in BENCHMARKS.items():
+        if only and name not in only:
+            continue
+        start = time.perf_counter()
+        results.update(bench(variants, quick))
+        log(f"{name}: {time.perf_counter() - start:.1f}s")
+    return {
+        "meta": {
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "quick": quick
+        },
+        "results": results
+    }
+
+
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Compare deux exécutions métrique par métrique.
+
+    Returns:
+        list: [(métrique, référence, actuel, variation relative, régression ?), ...]
+    """
+    thresholds = baseline.get("thresholds", {})
+    rows = []
+    for key, ref in sorted(baseline["results"].items()):
+        cur = current["results"].get(key)
+        if cur is None or not ref["value"]:
+            continue
+        change = (cur["value"] - ref["value"]) / ref["value"]
+        worse = -change if ref["better"] == "higher" else change
+        rows.append((key, ref["value"], cur["value"], change, worse > thresholds.get(key, threshold)))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backend benchmarks (JSON output, baseline comparison)")
+    parser.add_argument("--only", help=f"comma-separated subset of: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--quick", action="store_true", help="fewer positions and shallower searches")
+    parser.add_argument("--out", help="write the results to this JSON file")
+    parser.add_argument("--compare", nargs="?", const=BASELINE_PATH, help="baseline to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="tolerated relative slowdown before a metric counts as a regression")
+    parser.add_argument("--save-baseline", nargs="?", const=BASELINE_PATH, help="store the results as baseline")
+    args = parser.parse_args()
+
+    only = set(args.only.split(",")) if args.only else None
+    if only and only - set(BENCHMARKS):
+        parser.error(f"unknown benchmarks: {', '.join(sorted(only - set(BENCHMARKS)))}")
+    results = run(only, args.quick, log=lambda msg: print(msg, file=sys.stderr))
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.save_baseline:
+        thresholds = {}
+        if os.path.exists(args.save_baseline):
+            with open(args.save_baseline, encoding="utf-8") as f:
+                thresholds = json.load(f).get("thresholds", {})
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump({**results, "thresholds": thresholds}, f, indent=2)
+
+    if not args.compare:
+        for key, m in results["results"].items():
+            print(f"{key:<40} {m['value']:>14,.3f} {m['unit']}")
+        return
+
+    with open(args.compare, encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline["meta"].get("quick") != results["meta"]["quick"]:
+        print("Warning: the baseline and this run do not use the same --quick setting")
+    rows = compare(results, baseline, args.threshold)
+    for key, ref, cur, change, regressed in rows:
+        print(f"{key:<40} {ref:>14,.3f} -> {cur:>14,.3f} {change:+8.1%}{'  REGRESSION' if regressed else ''}")
+    regressions = [row for row in rows if row[4]]
+    if regressions:
+        print(f"{len(regressions)} regression(s) against {args.compare}")
+        sys.exit(1)
+    print(f"No regression against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,33 @@ let initialBoardState = null;
 
 // Variable pour tracker l'état de la session de jeu
 let gameSessionActive = false;
+// Identifiant de la session côté serveur (renvoyé avec /move et /end_game)
+let gameSessionId = null;
+
+/**
+ * Configuration du variant (issue du DSL) envoyée au backend avec chaque requête /move
+ */
+function getGameConfig() {
+    const data = document.body.dataset;
+    const config = {
+        rows: Number(data.rows) || undefined,
+        cols: Number(data.cols) || undefined,
+        boardType: data.boardType || 'square',
+        scoreGoal: data.scoreGoal || 'max',
+        allowDiagonal: data.allowDiagonal !== 'false'
+    };
+    if (data.timer) config.timer = Number(data.timer);
+    return config;
+}
+
+/**
+ * Directions de capture : les 4 diagonales sont retirées si le variant a `allowDiagonal = false`
+ */
+function getDirections() {
+    const orthogonal = [[0,1], [1,0], [0,-1], [-1,0]];
+    const diagonal = [[1,1], [1,-1], [-1,1], [-1,-1]];
+    return getGameConfig().allowDiagonal ? orthogonal.concat(diagonal) : orthogonal;
+}
 
 function getPlayerNames() {
     return { black: 'Alice', white: 'Bob' };
@@ -60,13 +87,15 @@ async function notifyGameStart() {
         const response = await fetch('http://127.0.0.1:5000/start_game', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ game_mode: gameMode })
+            // L'identifiant précédent permet au serveur de clore l'ancienne partie de ce client
+            body: JSON.stringify({ game_mode: gameMode, session_id: gameSessionId })
         });
         
         const data = await response.json();
         if (data.status === 'success') {
             console.log('Nouvelle session de jeu créée:', data.session_id);
             gameSessionActive = true;
+            gameSessionId = data.session_id;
         }
     } catch (error) {
         console.error('Erreur lors de la création de session:', error);
@@ -89,7 +118,8 @@ async function notifyGameEnd(winner, finalScores) {
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({
                 winner: winner,
-                final_scores: finalScores
+                final_scores: finalScores,
+                session_id: gameSessionId
             })
         });
         
@@ -98,6 +128,7 @@ async function notifyGameEnd(winner, finalScores) {
             console.log('Partie terminée et sauvegardée:', data.log_path);
         }
         gameSessionActive = false;
+        gameSessionId = null;
     } catch (error) {
         console.error('Erreur lors de la finalisation de session:', error);
     }
@@ -416,10 +447,7 @@ function checkIfPlayerCanMove() {
     
     function validMove(r, c, player) {
         if (getPiece(getCell(r, c))) return false;
-        const directions = [
-            [0,1], [1,0], [0,-1], [-1,0],
-            [1,1], [1,-1], [-1,1], [-1,-1]
-        ];
+        const directions = getDirections();
         for (const [dr, dc] of directions) {
             let i = r + dr, j = c + dc, foundOpponent = false;
             while (getCell(i, j) && getPiece(getCell(i, j)) === getOpponent(player)) {
@@ -680,10 +708,7 @@ document.addEventListener('DOMContentLoaded', () => {
         if (piece.classList.contains('white')) return 'white';
         return null;
     }
-    const directions = [
-        [0,1], [1,0], [0,-1], [-1,0],
-        [1,1], [1,-1], [-1,1], [-1,-1]
-    ];
+    const directions = getDirections();
     function validMove(r, c, player) {
         if (getPiece(getCell(r, c))) return false;
         for (const [dr, dc] of directions) {
@@ -699,10 +724,7 @@ document.addEventListener('DOMContentLoaded', () => {
         return false;
     }
     function flipPieces(r, c, player) {
-        const directions = [
-            [0,1], [1,0], [0,-1], [-1,0],
-            [1,1], [1,-1], [-1,1], [-1,-1]
-        ];
+        const directions = getDirections();
         for (const [dr, dc] of directions) {
             let i = r + dr, j = c + dc, path = [];
             while (table.rows[i]?.cells[j] && getPiece(table.rows[i].cells[j]) === getOpponent(player)) {
@@ -825,8 +847,12 @@ function sendStateToAI() {
         board: board,
         player: currentPlayer,
         depth: currentDepth,
-        aiType: aiType
+        aiType: aiType,
+        config: getGameConfig()
     };
+    if (gameSessionId) payload.session_id = gameSessionId;
+    // Humain vs IA : le serveur prépare ses réponses pendant que l'humain réfléchit
+    if (mode === 'ai') payload.ponder = true;
     
     console.log(`Envoi requête: ${currentPlayer} joue avec ${aiType}`);
     
@@ -901,10 +927,7 @@ function playAIMove(r, c) {
     function validMove(r, c, player) {
         const cell = table.rows[r]?.cells[c];
         if (getPiece(cell)) return false;
-        const directions = [
-            [0,1], [1,0], [0,-1], [-1,0],
-            [1,1], [1,-1], [-1,1], [-1,-1]
-        ];
+        const directions = getDirections();
         for (const [dr, dc] of directions) {
             let i = r + dr, j = c + dc, foundOpponent = false;
             while (table.rows[i]?.cells[j] && getPiece(table.rows[i].cells[j]) === getOpponent(player)) {
@@ -920,10 +943,7 @@ function playAIMove(r, c) {
     
     // Ajouter l'animation de retournement
     function flipPieces(r, c, player) {
-        const directions = [
-            [0,1], [1,0], [0,-1], [-1,0],
-            [1,1], [1,-1], [-1,1], [-1,-1]
-        ];
+        const directions = getDirections();
         for (const [dr, dc] of directions) {
             let i = r + dr, j = c + dc, path = [];
             while (table.rows[i]?.cells[j] && getPiece(table.rows[i].cells[j]) === getOpponent(player)) {
@@ -14,6 +14,16 @@ export function renderHTML(model: Game): string {
     const boardTypeParam = model.compileTime?.parameters.find(p => p.name === 'boardType');
     const boardType = boardTypeParam ? String(boardTypeParam.value).replace(/['"]/g, '') : 'square';
 
+    // --- Paramètres transmis au backend (/move) ---
+    const compileTimeValue = (name: string, fallback: string) => {
+        const param = model.compileTime?.parameters.find(p => p.name === name);
+        return param ? String(param.value).replace(/['"]/g, '') : fallback;
+    };
+    const timerParam = model.runTime?.parameters.find(p => p.name === 'timer');
+    const scoreGoal = compileTimeValue('scoreGoal', 'max');
+    const allowDiagonal = compileTimeValue('allowDiagonal', 'true');
+    const timer = timerParam ? String(timerParam.value) : '';
+
     // Rayon pour la forme circulaire
     const radius = Math.min(rows, cols) / 2;
 
@@ -27,7 +37,9 @@ export function renderHTML(model: Game): string {
     <link rel="stylesheet" href="/static/htmlGenerator.css"> 
 </head>
 
-<body data-black="Alice" data-white="Bob" class="${initialTheme}">
+<body data-black="Alice" data-white="Bob" data-rows="${rows}" data-cols="${cols}"
+      data-board-type="${boardType}" data-score-goal="${scoreGoal}"
+      data-allow-diagonal="${allowDiagonal}" data-timer="${timer}" class="${initialTheme}">
     <button class="home-btn" onclick="window.location.href='/'">🏠</button>
 
     <h1>${model.name}</h1>
@@ -0,0 +1,144 @@
+"""
+Faux serveur OpenRouter local, pour essayer le mode LLM (et son mode flux) sans réseau.
+
+Il répond à POST <base>/chat/completions comme l'API compatible OpenAI : d'un bloc,
+ou en flux SSE (`"stream": true`) découpé en petits morceaux espacés de `delay_ms`.
+Le coup renvoyé est le premier de la liste "Possible legal moves" du prompt (ou `move`),
+précédé d'un long raisonnement, comme le demande get_llm_move.
+
+    python fake_openrouter.py --port 8099
+    OPENROUTER_BASE_URL=http://127.0.0.1:8099 OPENROUTER_API_KEY=fake OPENROUTER_STREAM=1 python ../server/server.py
+
+Depuis Python (port libre choisi automatiquement) :
+
+    with FakeOpenRouter(delay_ms=20) as fake:
+        client = OpenRouterClient(base_url=fake.base_url, cache=None)
+"""
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_LEGAL_MOVES_RE = re.compile(r"Possible legal moves:\s*(.*)")
+
+DEFAULT_REASONING = ("Corners and edges are stable, so I avoid the squares next to them and keep "
+                     "my mobility high while limiting the opponent's options.")
+
+
+class FakeOpenRouter:
+    """Serveur HTTP local (thread en arrière-plan) imitant /chat/completions"""
+
+    def __init__(self, host="127.0.0.1", port=0, delay_ms=20, chunk_size=8, move=None,
+                 reasoning=DEFAULT_REASONING):
+        self.delay_ms = delay_ms
+        self.chunk_size = chunk_size
+        self.move = move
+        self.reasoning = reasoning
+        self.requests = 0
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-openrouter", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def reply_text(self, messages):
+        """Réponse du modèle : JSON dans un bloc de code, raisonnement d'abord"""
+        move = self.move
+        if move is None:
+            match = _LEGAL_MOVES_RE.search(messages[-1]["content"]) if messages else None
+            moves = [m.strip() for m in match.group(1).split(",")] if match else []
+            move = moves[0] if moves else "A1"
+        body = json.dumps({"reasoning": self.reasoning, "move": move}, indent=2)
+        return f"```json\n{body}\n```"
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                if not self.path.endswith("/chat/completions"):
+                    self.send_error(404)
+                    return
+                payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                fake.requests += 1
+                text = fake.reply_text(payload.get("messages") or [])
+                if payload.get("stream"):
+                    self._stream(payload, text)
+                else:
+                    self._send_json({"id": "fake", "model": payload.get("model"),
+                                     "choices": [{"message": {"role": "assistant", "content": text}}]})
+
+            def _send_json(self, data):
+                body = json.dumps(data).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _stream(self, payload, text):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                self.close_connection = True
+                # OpenRouter envoie des commentaires SSE tant que le modèle n'a rien produit
+                self.wfile.write(b": OPENROUTER PROCESSING\n\n")
+                for i in range(0, len(text), fake.chunk_size):
+                    time.sleep(fake.delay_ms / 1000)
+                    event = {"id": "fake", "model": payload.get("model"),
+                             "choices": [{"index": 0, "delta": {"content": text[i:i + fake.chunk_size]}}]}
+                    self.wfile.write(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local fake OpenRouter server (chat/completions, SSE streaming)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--delay-ms", type=float, default=20, help="delay between two streamed chunks")
+    parser.add_argument("--chunk-size", type=int, default=8, help="characters per streamed chunk")
+    parser.add_argument("--move", default=None, help="move always returned (default: first legal move of the prompt)")
+    args = parser.parse_args()
+    fake = FakeOpenRouter(args.host, args.port, args.delay_ms, args.chunk_size, args.move)
+    print(f"Fake OpenRouter listening on {fake.base_url}")
+    try:
+        fake._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        fake._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
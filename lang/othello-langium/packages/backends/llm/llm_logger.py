@@ -1,5 +1,28 @@
+"""
+Journalisation des parties jouées contre le LLM.
+
+Chaque partie est un fichier JSONL en ajout seul (data/eval/logs/game_<session_id>.jsonl) :
+un enregistrement par ligne ("session_start", "interaction", "metadata", "session_end").
+Les écritures partent dans une file consommée par un thread d'écriture qui regroupe
+les lignes et les vide sur disque par lots ; la requête /move ne fait donc aucune I/O.
+`read_session` reconstruit la vue JSON d'une partie (même format que les anciens
+fichiers game_<session_id>.json), et `python llm_logger.py convert` l'écrit sur disque.
+
+Plusieurs parties peuvent être jouées en même temps : elles sont suivies par un
+registre (SessionRegistry) indexé par l'identifiant de session que le client renvoie
+à chaque requête.
+"""
+import argparse
+import atexit
+import glob
 import os
 import json
+import queue
+import re
+import secrets
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime
 from pathlib import Path
 
@@ -9,150 +32,466 @@ LOG_DIR = PROJECT_ROOT / "data" / "eval" / "logs"
 # Créer le dossier de logs s'il n'existe pas
 os.makedirs(LOG_DIR, exist_ok=True)
 
-# Variable globale pour stocker la session de jeu actuelle
-_current_game_session = None
+# Politique de fsync : "never" (laissé à l'OS), "finalize" (à la fin de chaque partie),
+# "batch" (après chaque lot écrit) ou "always" (après chaque ligne)
+FSYNC_POLICIES = ("never", "finalize", "batch", "always")
+LOG_FSYNC = os.getenv("OTHELLO_LOG_FSYNC", "finalize")
+# Délai maximal avant qu'une ligne en file soit écrite, et taille maximale d'un lot
+LOG_FLUSH_MS = float(os.getenv("OTHELLO_LOG_FLUSH_MS", "200"))
+LOG_BATCH_SIZE = int(os.getenv("OTHELLO_LOG_BATCH", "64"))
+# Fichiers de log gardés ouverts entre deux lots (LRU) : bien en dessous de la limite
+# habituelle de 1024 descripteurs, quel que soit le nombre de parties suivies
+LOG_OPEN_FILES = int(os.getenv("OTHELLO_LOG_OPEN_FILES", "64"))
+
+
+class LogWriter:
+    """Thread d'écriture des fichiers JSONL, partagé par toutes les sessions"""
+
+    def __init__(self, fsync=LOG_FSYNC, flush_ms=LOG_FLUSH_MS, batch_size=LOG_BATCH_SIZE,
+                 max_open_files=LOG_OPEN_FILES):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy '{fsync}' (available: {', '.join(FSYNC_POLICIES)})")
+        self.fsync = fsync
+        self.flush_interval = flush_ms / 1000
+        self.batch_size = batch_size
+        self.max_open_files = max(1, max_open_files)
+        self._queue = queue.Queue()
+        # Fichiers ouverts, du moins au plus récemment écrit
+        self._files = OrderedDict()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="llm-log-writer", daemon=True)
+                    self._thread.start()
+
+    def write(self, path, record, close=False):
+        """Met un enregistrement en file ; `close` ferme le fichier une fois la ligne écrite"""
+        self._ensure_started()
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        self._queue.put((str(path), line, close, None))
+
+    def flush(self, timeout=None):
+        """Attend que tout ce qui a été mis en file soit écrit (et synchronisé si demandé)"""
+        if self._thread is None:
+            return True
+        done = threading.Event()
+        self._queue.put((None, None, False, done))
+        return done.wait(timeout)
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            # Regrouper les lignes arrivées pendant l'intervalle (ou jusqu'à remplir le lot)
+            while len(batch) < self.batch_size and batch[-1][3] is None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._write_batch(batch)
+
+    def _write_batch(self, batch):
+        touched = {}
+        barriers = []
+        for path, line, close, done in batch:
+            if done is not None:
+                barriers.append(done)
+                continue
+            try:
+                f = self._open(path, touched)
+                f.write(line)
+                if self.fsync == "always":
+                    f.flush()
+                    os.fsync(f.fileno())
+                touched[path] = f
+                if close:
+                    f.flush()
+                    if self.fsync != "never":
+                        os.fsync(f.fileno())
+                    f.close()
+                    del self._files[path]
+                    touched.pop(path)
+            except OSError as e:
+                print(f"Erreur d'écriture du log {path} : {e}")
+        for f in touched.values():
+            try:
+                f.flush()
+                if self.fsync == "batch":
+                    os.fsync(f.fileno())
+            except OSError as e:
+                print(f"Erreur d'écriture du log {f.name} : {e}")
+        for done in barriers:
+            done.set()
+
+    def _open(self, path, touched):
+        """Fichier de `path` ouvert en ajout ; le moins récemment écrit est fermé au-delà de max_open_files"""
+        f = self._files.get(path)
+        if f is not None:
+            self._files.move_to_end(path)
+            return f
+        while len(self._files) >= self.max_open_files:
+            oldest_path, oldest = self._files.popitem(last=False)
+            try:
+                oldest.flush()
+                # Lignes de ce lot : synchronisées comme les autres fichiers du lot
+                if touched.pop(oldest_path, None) is not None and self.fsync == "batch":
+                    os.fsync(oldest.fileno())
+                oldest.close()
+            except OSError as e:
+                print(f"Erreur d'écriture du log {oldest_path} : {e}")
+        f = self._files[path] = open(path, "a", encoding="utf-8")
+        return f
+
+    def close(self, timeout=5):
+        """Écrit tout ce qui reste en file et ferme les fichiers ouverts (arrêt du serveur)"""
+        self.flush(timeout)
+        for f in list(self._files.values()):
+            try:
+                f.flush()
+                if self.fsync != "never":
+                    os.fsync(f.fileno())
+                f.close()
+            except OSError:
+                pass
+        self._files.clear()
+
+
+_writer = LogWriter()
+
+# Nombre maximal de parties suivies en même temps, et inactivité (s) après laquelle
+# une partie est finalisée automatiquement
+MAX_SESSIONS = int(os.getenv("OTHELLO_MAX_SESSIONS", "1000"))
+SESSION_IDLE_TIMEOUT = float(os.getenv("OTHELLO_SESSION_IDLE_S", "1800"))
+
+# Durée (s) pendant laquelle une partie terminée est mémorisée : les écritures qui arrivent
+# après sa fin (réponse en flux tardive, requête en retard) sont ignorées au lieu de
+# rouvrir son fichier déjà finalisé
+ENDED_SESSION_TTL = float(os.getenv("OTHELLO_ENDED_SESSION_S", "600"))
+
+# Identifiants acceptés : ils servent aussi de nom de fichier
+_SESSION_ID_RE = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+def new_session_id():
+    """Identifiant horodaté (suffixe aléatoire : deux parties créées à la même microseconde restent distinctes)"""
+    return f"{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{secrets.token_hex(3)}"
+
+
+def is_valid_session_id(session_id):
+    return isinstance(session_id, str) and _SESSION_ID_RE.match(session_id) is not None
+
 
 class GameSession:
     """Représente une partie complète avec tous ses logs"""
     
-    def __init__(self):
-        self.session_id = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    def __init__(self, session_id=None):
+        self.session_id = session_id or new_session_id()
         self.start_time = datetime.now().isoformat()
-        self.interactions = []
+        self.interaction_count = 0
+        # Verrou propre à la partie : les coups de parties différentes ne se bloquent pas
+        self.lock = threading.Lock()
+        self.last_active = time.monotonic()
         self.game_metadata = {
             "game_mode": None,
             "winner": None,
             "final_scores": None,
             "total_moves": 0
         }
-        self.file_path = LOG_DIR / f"game_{self.session_id}.json"
+        self.file_path = LOG_DIR / f"game_{self.session_id}.jsonl"
         
         self._save_initial()
         
     def _save_initial(self):
         """Crée le fichier de log initial"""
-        log_data = {
+        _writer.write(self.file_path, {
+            "type": "session_start",
             "session_id": self.session_id,
             "start_time": self.start_time,
-            "end_time": None,
-            "game_metadata": self.game_metadata,
-            "total_interactions": 0,
-            "interactions": []
-        }
-        
-        with open(self.file_path, "w", encoding="utf-8") as f:
-            json.dump(log_data, f, indent=2, ensure_ascii=False)
+            "game_metadata": self.game_metadata
+        })
         
         print(f"Nouvelle session créée : {self.file_path}")
         
-    def add_interaction(self, prompt, raw_response, final_json, params, latency):
+    def add_interaction(self, prompt, raw_response, final_json, params, latency, cached=False, field_latency=None):
         """Ajoute une interaction (un coup du LLM) à la session"""
+        with self.lock:
+            self.interaction_count += 1
+            move_number = self.interaction_count
         interaction = {
-            "move_number": len(self.interactions) + 1,
+            "move_number": move_number,
             "timestamp": datetime.now().isoformat(),
             "prompt": prompt,
             "raw_response": raw_response,
             "final_json": final_json,
             "latency_seconds": round(latency, 3),
-            "parameters": params
+            "parameters": params,
+            "cached": cached
         }
-        self.interactions.append(interaction)
+        if field_latency:
+            # Réponse en flux : délai d'arrivée de chaque champ du JSON (ex. "move")
+            interaction["field_latency_seconds"] = field_latency
         
-        # Sauvegarder immédiatement après chaque coup
-        self.save()
+        # Une seule ligne ajoutée, écrite en arrière-plan
+        _writer.write(self.file_path, {"type": "interaction", **interaction})
         
     def set_metadata(self, **kwargs):
         """Met à jour les métadonnées de la partie"""
-        self.game_metadata.update(kwargs)
+        with self.lock:
+            self.game_metadata.update(kwargs)
         
     def save(self):
-        """Sauvegarde la session complète dans un fichier JSON"""
-        log_data = {
-            "session_id": self.session_id,
-            "start_time": self.start_time,
-            "end_time": datetime.now().isoformat(),
-            "game_metadata": self.game_metadata,
-            "total_interactions": len(self.interactions),
-            "interactions": self.interactions
-        }
-        
-        with open(self.file_path, "w", encoding="utf-8") as f:
-            json.dump(log_data, f, indent=2, ensure_ascii=False)
+        """Enregistre les métadonnées courantes de la partie"""
+        with self.lock:
+            _writer.write(self.file_path, {
+                "type": "metadata",
+                "timestamp": datetime.now().isoformat(),
+                "game_metadata": self.game_metadata
+            })
         
         return str(self.file_path)
     
     def finalize(self):
-        """Finalise la session (appelé à la fin de la partie)"""
-        self.game_metadata["total_moves"] = len(self.interactions)
-        file_path = self.save()
+        """
+        Finalise la session (appelé à la fin de la partie) : la ligne de fin est écrite
+        et synchronisée avant le retour, le fichier est alors complet sur disque.
+        """
+        with self.lock:
+            self.game_metadata["total_moves"] = self.interaction_count
+            _writer.write(self.file_path, {
+                "type": "session_end",
+                "end_time": datetime.now().isoformat(),
+                "game_metadata": self.game_metadata
+            }, close=True)
+        _writer.flush()
+        file_path = str(self.file_path)
         print(f"Session de jeu terminée et sauvegardée : {file_path}")
         return file_path
 
 
-def start_game_session(game_mode=None):
+class SessionRegistry:
+    """
+    Parties en cours, indexées par l'identifiant transmis par le client.
+
+    Les sessions sont rangées de la moins à la plus récemment utilisée : les sessions
+    inactives depuis `idle_timeout` et celles qui dépassent `max_sessions` sont
+    retirées par l'avant (coût O(1) amorti) puis finalisées hors du verrou global.
+    Un appel sans identifiant vise la session "par défaut" (comportement mono-joueur).
+    """
+
+    def __init__(self, max_sessions=MAX_SESSIONS, idle_timeout=SESSION_IDLE_TIMEOUT, ended_ttl=ENDED_SESSION_TTL):
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.ended_ttl = ended_ttl
+        self._sessions = OrderedDict()
+        # Parties terminées récemment (identifiant -> instant de fin), les plus anciennes devant
+        self._ended = OrderedDict()
+        self._lock = threading.Lock()
+        self.default_id = None
+        self.expired = 0
+        self.evicted = 0
+        self.late_writes = 0
+
+    def _resolve(self, session_id):
+        return session_id if session_id is not None else self.default_id
+
+    def get(self, session_id=None):
+        """
+        Returns:
+            GameSession: la session (marquée active) ou None si elle n'existe pas / a expiré
+        """
+        with self._lock:
+            session = self._sessions.get(self._resolve(session_id))
+            if session is not None:
+                session.last_active = time.monotonic()
+                self._sessions.move_to_end(session.session_id)
+            stale = self._collect_locked()
+        self._finalize_all(stale)
+        return session
+
+    def create(self, session_id=None, game_mode=None):
+        """
+        Crée une session ; sans identifiant, elle devient la session par défaut.
+        Une session existante portant le même identifiant est d'abord terminée.
+        """
+        if session_id is not None and not is_valid_session_id(session_id):
+            raise ValueError(f"Invalid session id '{session_id}'")
+        session = GameSession(session_id)
+        if game_mode:
+            session.set_metadata(game_mode=game_mode)
+            session.save()
+        with self._lock:
+            replaced = self._sessions.pop(self._resolve(session_id), None)
+            self._sessions[session.session_id] = session
+            self._ended.pop(session.session_id, None)
+            if session_id is None:
+                self.default_id = session.session_id
+            stale = self._collect_locked()
+        if replaced is not None:
+            print("Session précédente détectée, fermeture automatique...")
+            replaced.finalize()
+        self._finalize_all(stale)
+        return session
+
+    def pop(self, session_id=None):
+        """Retire la session du registre (sans la finaliser) et la marque terminée (voir is_ended)"""
+        with self._lock:
+            key = self._resolve(session_id)
+            if key == self.default_id:
+                self.default_id = None
+            session = self._sessions.pop(key, None)
+            if session is not None:
+                self._mark_ended_locked(key)
+            return session
+
+    def is_ended(self, session_id):
+        """Vrai si la partie `session_id` a été terminée il y a moins de `ended_ttl` secondes"""
+        if session_id is None:
+            return False
+        with self._lock:
+            self._collect_ended_locked()
+            return session_id in self._ended
+
+    def drop_late_write(self, session_id):
+        """Vrai (et compté) si une écriture pour `session_id` arrive après la fin de la partie"""
+        if not self.is_ended(session_id):
+            return False
+        with self._lock:
+            self.late_writes += 1
+        return True
+
+    def _mark_ended_locked(self, session_id):
+        """Marque la partie terminée, quelle que soit la cause (fin normale, inactivité, éviction)"""
+        self._ended[session_id] = time.monotonic()
+        self._ended.move_to_end(session_id)
+        self._collect_ended_locked()
+
+    def _collect_ended_locked(self):
+        now = time.monotonic()
+        while self._ended:
+            oldest_id, ended_at = next(iter(self._ended.items()))
+            if now - ended_at <= self.ended_ttl and len(self._ended) <= self.max_sessions:
+                break
+            del self._ended[oldest_id]
+
+    def _collect_locked(self):
+        """Retire les sessions inactives ou en surnombre (à finaliser hors du verrou)"""
+        stale = []
+        now = time.monotonic()
+        while self._sessions:
+            oldest = next(iter(self._sessions.values()))
+            if now - oldest.last_active > self.idle_timeout:
+                oldest.set_metadata(end_reason="idle")
+                self.expired += 1
+            elif len(self._sessions) > self.max_sessions:
+                oldest.set_metadata(end_reason="evicted")
+                self.evicted += 1
+            else:
+                break
+            del self._sessions[oldest.session_id]
+            if oldest.session_id == self.default_id:
+                self.default_id = None
+            self._mark_ended_locked(oldest.session_id)
+            stale.append(oldest)
+        return stale
+
+    @staticmethod
+    def _finalize_all(sessions):
+        for session in sessions:
+            print(f"Session {session.session_id} retirée ({session.game_metadata.get('end_reason')})")
+            session.finalize()
+
+    def close_all(self):
+        """Finalise toutes les sessions en cours (arrêt du serveur)"""
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+            self.default_id = None
+        for session in sessions:
+            session.finalize()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "active": len(self._sessions),
+                "maxSessions": self.max_sessions,
+                "idleTimeoutSeconds": self.idle_timeout,
+                "expired": self.expired,
+                "evicted": self.evicted,
+                "recentlyEnded": len(self._ended),
+                "lateWritesDropped": self.late_writes
+            }
+
+
+# Registre partagé par toutes les requêtes du serveur
+_sessions = SessionRegistry()
+
+
+def _close_sessions():
+    _sessions.close_all()
+    _writer.close()
+
+
+atexit.register(_close_sessions)
+
+
+def start_game_session(game_mode=None, session_id=None):
     """
     Démarre une nouvelle session de jeu
     
     Args:
         game_mode (str, optionnel): Mode de jeu ("human_vs_llm", "llm_vs_llm", etc.)
+        session_id (str, optionnel): identifiant choisi par l'appelant ; sans identifiant,
+            la session remplace la session par défaut
     
     Returns:
         GameSession: La nouvelle session créée
     """
-    global _current_game_session
-    
-    # Si une session est déjà active, la terminer proprement
-    if _current_game_session is not None:
-        print("Session précédente détectée, fermeture automatique...")
-        end_game_session()
-    
-    # Créer la nouvelle session
-    _current_game_session = GameSession()
-    
-    # Définir le mode de jeu si fourni
-    if game_mode:
-        _current_game_session.set_metadata(game_mode=game_mode)
-        _current_game_session.save()
-    
-    print(f"Nouvelle session démarrée : {_current_game_session.session_id}")
-    return _current_game_session
+    session = _sessions.create(session_id, game_mode)
+    print(f"Nouvelle session démarrée : {session.session_id}")
+    return session
 
 
-def end_game_session(winner=None, final_scores=None):
+def end_game_session(winner=None, final_scores=None, session_id=None):
     """
-    Termine la session de jeu actuelle et sauvegarde les logs
+    Termine une session de jeu et sauvegarde les logs
     
     Args:
         winner (str, optionnel): "black", "white", ou "draw"
         final_scores (dict, optionnel): {"black": 28, "white": 36}
+        session_id (str, optionnel): session visée (par défaut : la session par défaut)
     
     Returns:
         str: Chemin du fichier de log sauvegardé (ou None si pas de session)
     """
-    global _current_game_session
-    
-    if _current_game_session is None:
+    session = _sessions.pop(session_id)
+    if session is None:
         print("Aucune session de jeu en cours")
         return None
     
     # Mettre à jour les métadonnées finales
     if winner:
-        _current_game_session.set_metadata(winner=winner)
+        session.set_metadata(winner=winner)
     if final_scores:
-        _current_game_session.set_metadata(final_scores=final_scores)
+        session.set_metadata(final_scores=final_scores)
     
     # Finaliser et sauvegarder
-    log_path = _current_game_session.finalize()
-    
-    # Réinitialiser la session globale
-    _current_game_session = None
-    
-    return log_path
+    return session.finalize()
 
 
-def log_interaction(prompt, raw_response, final_json, params, latency):
+def log_interaction(prompt, raw_response, final_json, params, latency, cached=False, session_id=None,
+                    field_latency=None):
     """
-    Ajoute une interaction à la session de jeu en cours
+    Ajoute une interaction à une session de jeu
     
     Args:
         prompt: dict/messages envoyés au modèle
@@ -160,63 +499,167 @@ def log_interaction(prompt, raw_response, final_json, params, latency):
         final_json: JSON parsé (ou None si erreur)
         params: dict contenant model, temperature, top_p, max_tokens, seed
         latency: float en secondes
+        cached: True si la réponse provient du cache (aucun appel au modèle)
+        session_id (str, optionnel): session visée (par défaut : la session par défaut)
+        field_latency (dict, optionnel): réponse en flux, délai (s) d'arrivée de chaque champ
     
     Returns:
-        str: Chemin du fichier de log
+        str: Chemin du fichier de log (None si la partie est déjà terminée)
     """
-    global _current_game_session
+    session = _sessions.get(session_id)
     
-    # Si aucune session n'est active, en créer une automatiquement
-    if _current_game_session is None:
+    # Écriture tardive d'une partie terminée : son fichier est déjà finalisé
+    if session is None and _sessions.drop_late_write(session_id):
+        print(f"Session {session_id} déjà terminée : interaction ignorée")
+        return None
+
+    # Si la session n'existe pas (ou a expiré), en créer une automatiquement
+    if session is None:
         print("Aucune session active, création automatique d'une nouvelle session")
-        start_game_session()
+        session = start_game_session(session_id=session_id)
     
-    # Ajouter l'interaction (la sauvegarde est automatique)
-    _current_game_session.add_interaction(prompt, raw_response, final_json, params, latency)
+    # Ajouter l'interaction (l'écriture se fait en arrière-plan)
+    session.add_interaction(prompt, raw_response, final_json, params, latency, cached, field_latency)
     
-    return str(_current_game_session.file_path)
+    return str(session.file_path)
+
+
+def get_current_session(session_id=None):
+    """Retourne la session de jeu demandée (par défaut : la session par défaut)"""
+    return _sessions.get(session_id)
+
+
+def is_session_ended(session_id):
+    """Vrai si la partie `session_id` vient d'être terminée (ses écritures tardives sont ignorées)"""
+    return _sessions.is_ended(session_id)
 
 
-def get_current_session():
-    """Retourne la session de jeu actuelle"""
-    return _current_game_session
+def get_session_stats():
+    """Compteurs du registre de sessions"""
+    return _sessions.stats()
 
 
-def set_game_mode(mode):
+def set_game_mode(mode, session_id=None):
     """
-    Définit le mode de jeu pour la session actuelle
+    Définit le mode de jeu pour une session
     
     Args:
         mode (str): Mode de jeu ("human_vs_llm", "llm_vs_llm", "human_vs_human", etc.)
+        session_id (str, optionnel): session visée (par défaut : la session par défaut)
     """
-    global _current_game_session
-    if _current_game_session:
-        _current_game_session.set_metadata(game_mode=mode)
-        _current_game_session.save()
+    session = _sessions.get(session_id)
+    if session:
+        session.set_metadata(game_mode=mode)
+        session.save()
         print(f"Mode de jeu défini : {mode}")
 
 
-def reset_game():
+def reset_game(session_id=None, game_mode=None):
     """
-    Réinitialise la session actuelle (équivalent à terminer et en créer une nouvelle)
+    Réinitialise une session (équivalent à terminer et en créer une nouvelle)
     Utile lors d'un changement de mode de jeu ou reset du plateau
     
+    Args:
+        session_id (str, optionnel): session à terminer ; la nouvelle session reçoit un
+            nouvel identifiant (ou remplace la session par défaut si aucun n'est fourni)
+        game_mode (str, optionnel): mode de la nouvelle partie (par défaut : celui de l'ancienne)
+    
     Returns:
         GameSession: La nouvelle session créée
     """
-    global _current_game_session
-    
     # Sauvegarder le mode de jeu actuel si existant
-    old_mode = None
-    if _current_game_session:
-        old_mode = _current_game_session.game_metadata.get("game_mode")
+    old_session = _sessions.get(session_id)
+    if game_mode is None and old_session:
+        game_mode = old_session.game_metadata.get("game_mode")
     
     # Terminer la session actuelle
-    if _current_game_session is not None:
+    if old_session is not None:
         print("Réinitialisation de la partie...")
-        end_game_session()
+        end_game_session(session_id=session_id)
     
     # Créer une nouvelle session avec le même mode
-    new_session = start_game_session(game_mode=old_mode)
-    
-    return new_session
\ No newline at end of file
+    return start_game_session(game_mode=game_mode,
+                              session_id=new_session_id() if session_id is not None else None)
+
+
+def read_session(path):
+    """
+    Reconstruit la vue JSON d'une partie à partir de son fichier JSONL.
+    Une dernière ligne tronquée (arrêt brutal pendant une écriture) est ignorée.
+    Les anciens fichiers .json sont renvoyés tels quels.
+
+    Returns:
+        dict: session_id, start_time, end_time, game_metadata, total_interactions, interactions
+    """
+    path = Path(path)
+    if path.suffix == ".json":
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    session = {
+        "session_id": None,
+        "start_time": None,
+        "end_time": None,
+        "game_metadata": {},
+        "total_interactions": 0,
+        "interactions": []
+    }
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                print(f"Ligne illisible ignorée dans {path}")
+                continue
+            kind = record.pop("type", None)
+            if kind == "session_start":
+                session["session_id"] = record.get("session_id")
+                session["start_time"] = session["end_time"] = record.get("start_time")
+                session["game_metadata"] = record.get("game_metadata") or {}
+            elif kind == "interaction":
+                session["interactions"].append(record)
+                session["end_time"] = record.get("timestamp")
+            elif kind == "metadata":
+                session["game_metadata"] = record.get("game_metadata") or {}
+                session["end_time"] = record.get("timestamp")
+            elif kind == "session_end":
+                session["game_metadata"] = record.get("game_metadata") or {}
+                session["end_time"] = record.get("end_time")
+    session["total_interactions"] = len(session["interactions"])
+    return session
+
+
+def convert_logs(paths=None, out_dir=None):
+    """
+    Écrit la vue JSON (game_<session_id>.json) de chaque fichier JSONL.
+
+    Returns:
+        list: chemins des fichiers écrits
+    """
+    if paths is None:
+        paths = sorted(glob.glob(str(LOG_DIR / "game_*.jsonl")))
+    written = []
+    for path in paths:
+        target = Path(out_dir or Path(path).parent) / (Path(path).stem + ".json")
+        tmp = target.with_suffix(".json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(read_session(path), f, indent=2, ensure_ascii=False)
+        os.replace(tmp, target)
+        written.append(str(target))
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert JSONL game logs to per-game JSON files")
+    sub = parser.add_subparsers(dest="command", required=True)
+    convert = sub.add_parser("convert", help="rebuild game_<session_id>.json from the JSONL logs")
+    convert.add_argument("paths", nargs="*", help="JSONL files (default: every log in data/eval/logs)")
+    convert.add_argument("--out", help="output directory (default: next to each log)")
+    args = parser.parse_args()
+
+    for path in convert_logs(args.paths or None, args.out):
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
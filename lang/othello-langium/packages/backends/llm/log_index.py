@@ -0,0 +1,541 @@
+"""
+Index SQLite des logs de parties LLM, pour les statistiques agrégées.
+
+Les fichiers game_<session_id>.jsonl (et les anciens .json) de data/eval/logs sont
+indexés au fil de l'eau : chaque fichier est repéré par sa date de modification et
+sa taille, un fichier inchangé n'est jamais relu, et un JSONL qui a grandi n'est lu
+qu'à partir de la dernière ligne indexée. Seules les colonnes utiles aux statistiques
+sont conservées (ni prompts ni réponses) : une interaction par ligne, une partie par
+fichier. Les interactions sont en outre agrégées à l'ingestion (nombre d'appels par
+mode de jeu, modèle, statut du coup et latence à la milliseconde près, la précision
+des logs) : latences exactes par percentile et taux de coups illégaux se lisent dans
+quelques milliers de lignes, même avec des centaines de milliers de parties.
+
+    python log_index.py ingest
+    python log_index.py report [--mode ai_vs_llm] [--json]
+"""
+import argparse
+import glob
+import json
+import os
+import re
+import sqlite3
+import time
+from collections import Counter
+from pathlib import Path
+
+from llm_logger import LOG_DIR
+
+DEFAULT_DB_PATH = os.getenv("OTHELLO_LOG_INDEX_DB") or str(LOG_DIR.parent / "logs_index.sqlite")
+
+# Percentiles de latence rapportés par défaut
+DEFAULT_PERCENTILES = (50, 90, 95, 99)
+
+# Fichiers indexés entre deux commits de la base
+COMMIT_EVERY = 500
+
+# Version du schéma (PRAGMA user_version) : une base plus ancienne est reconstruite
+# 2 : statut "error" distinct de "invalid" pour les appels sans réponse
+SCHEMA_VERSION = 2
+
+_LEGAL_MOVES_RE = re.compile(r"Possible legal moves:\s*(.*)")
+_PLAYER_RE = re.compile(r"playing as (NOIR|BLANC)")
+_COLORS = {"NOIR": "black", "BLANC": "white"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    offset INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS games (
+    file_id INTEGER PRIMARY KEY REFERENCES files (id),
+    session_id TEXT,
+    game_mode TEXT,
+    model TEXT,
+    llm_colors TEXT,
+    start_time TEXT,
+    end_time TEXT,
+    finished INTEGER NOT NULL DEFAULT 0,
+    winner TEXT,
+    black_score INTEGER,
+    white_score INTEGER,
+    interactions INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS interactions (
+    file_id INTEGER NOT NULL REFERENCES files (id),
+    move_number INTEGER,
+    model TEXT,
+    latency REAL,
+    move_latency REAL,
+    cached INTEGER NOT NULL,
+    status TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS interactions_file ON interactions (file_id);
+CREATE INDEX IF NOT EXISTS games_mode ON games (game_mode, model);
+CREATE TABLE IF NOT EXISTS call_counts (
+    game_mode TEXT NOT NULL,
+    model TEXT NOT NULL,
+    cached INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    latency_ms INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (game_mode, model, cached, status, latency_ms)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS move_counts (
+    game_mode TEXT NOT NULL,
+    model TEXT NOT NULL,
+    move_ms INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (game_mode, model, move_ms)
+) WITHOUT ROWID;
+"""
+
+# Résultat de la partie du point de vue du LLM (NULL si inconnu ou si le LLM jouait les deux camps)
+_LLM_RESULT = """
+CASE WHEN winner IS NULL OR llm_colors IS NULL OR llm_colors NOT IN ('black', 'white') THEN NULL
+     WHEN winner = 'draw' THEN 'draw'
+     WHEN winner = llm_colors THEN 'win'
+     ELSE 'loss' END
+"""
+
+
+def move_status(prompt, final_json):
+    """
+    Validité du coup proposé, vérifiée contre la liste des coups légaux du prompt.
+
+    Returns:
+        str: "legal", "illegal" (case hors liste), "invalid" (pas de coup lisible dans la
+            réponse) ou "error" (pas de réponse : erreur réseau ou délai dépassé)
+    """
+    if final_json is None:
+        return "error"
+    move = final_json.get("move") if isinstance(final_json, dict) else None
+    if not isinstance(move, str) or not move.strip():
+        return "invalid"
+    legal = None
+    for message in (prompt or {}).get("messages") or []:
+        match = _LEGAL_MOVES_RE.search(message.get("content") or "")
+        if match:
+            legal = {m.strip().upper() for m in match.group(1).split(",")}
+    if legal is None:
+        return "legal"
+    return "legal" if move.strip().replace(".", "").upper() in legal else "illegal"
+
+
+def llm_color(prompt):
+    """Camp joué par le LLM, lu dans le prompt système (None s'il n'y figure pas)"""
+    for message in (prompt or {}).get("messages") or []:
+        match = _PLAYER_RE.search(message.get("content") or "")
+        if match:
+            return _COLORS[match.group(1)]
+    return None
+
+
+class _GameState:
+    """Champs d'une partie extraits d'une série d'enregistrements"""
+
+    def __init__(self):
+        self.fields = {}
+        self.colors = set()
+        self.rows = []
+
+    def metadata(self, metadata, finished=False):
+        metadata = metadata or {}
+        for key, column in (("game_mode", "game_mode"), ("winner", "winner")):
+            if metadata.get(key) is not None:
+                self.fields[column] = metadata[key]
+        scores = metadata.get("final_scores") or {}
+        if scores:
+            self.fields["black_score"] = scores.get("black")
+            self.fields["white_score"] = scores.get("white")
+        if finished:
+            self.fields["finished"] = 1
+
+    def interaction(self, file_id, record):
+        prompt = record.get("prompt") or {}
+        model = (record.get("parameters") or {}).get("model") or prompt.get("model")
+        color = llm_color(prompt)
+        if color:
+            self.colors.add(color)
+        if model and "model" not in self.fields:
+            self.fields["model"] = model
+        self.rows.append((file_id, record.get("move_number"), model, record.get("latency_seconds"),
+                          (record.get("field_latency_seconds") or {}).get("move"),
+                          1 if record.get("cached") else 0, move_status(prompt, record.get("final_json"))))
+
+
+class LogIndex:
+    """Base SQLite des statistiques de logs ; ingest() puis les requêtes d'agrégats"""
+
+    def __init__(self, db_path=DEFAULT_DB_PATH):
+        self.db_path = str(db_path)
+        if self.db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        self._db = sqlite3.connect(self.db_path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        if self._db.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            # Statuts calculés autrement : tout est relu au prochain ingest()
+            with self._db:
+                for table in ("files", "games", "interactions", "call_counts", "move_counts"):
+                    self._db.execute(f"DROP TABLE IF EXISTS {table}")
+                self._db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._db.executescript(_SCHEMA)
+
+    def close(self):
+        self._db.close()
+
+    def ingest(self, log_dir=LOG_DIR, prune=True):
+        """
+        Indexe les fichiers nouveaux ou modifiés de `log_dir`.
+
+        Args:
+            prune (bool): retirer de la base les fichiers qui n'existent plus
+
+        Returns:
+            dict: compteurs (fichiers vus, nouveaux, inchangés, complétés, relus, retirés)
+        """
+        start = time.perf_counter()
+        counts = {"files": 0, "new": 0, "unchanged": 0, "appended": 0, "reindexed": 0, "removed": 0,
+                  "newInteractions": 0}
+        known = {path: (file_id, mtime_ns, size, offset) for file_id, path, mtime_ns, size, offset
+                 in self._db.execute("SELECT id, path, mtime_ns, size, offset FROM files")}
+        paths = sorted(glob.glob(os.path.join(str(log_dir), "game_*.jsonl")))
+        jsonl_stems = {Path(p).stem for p in paths}
+        # Anciennes parties .json, sauf les vues reconstruites à partir d'un .jsonl (llm_logger convert)
+        paths += [p for p in sorted(glob.glob(os.path.join(str(log_dir), "game_*.json")))
+                  if Path(p).stem not in jsonl_stems]
+        seen = set()
+        pending = 0
+        with self._db:
+            for path in paths:
+                path = os.path.abspath(path)
+                seen.add(path)
+                counts["files"] += 1
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entry = known.get(path)
+                if entry is not None and entry[1] == stat.st_mtime_ns and entry[2] == stat.st_size:
+                    counts["unchanged"] += 1
+                    continue
+                # JSONL en ajout seul : seule la suite du fichier est lue
+                append = (entry is not None and path.endswith(".jsonl") and stat.st_size >= entry[3])
+                counts["new" if entry is None else "appended" if append else "reindexed"] += 1
+                counts["newInteractions"] += self._index_file(path, stat, entry, append)
+                pending += 1
+                if pending >= COMMIT_EVERY:
+                    self._db.commit()
+                    pending = 0
+            if prune:
+                for path, entry in known.items():
+                    if path not in seen and path.startswith(os.path.abspath(str(log_dir)) + os.sep):
+                        self._delete(entry[0], files=True)
+                        counts["removed"] += 1
+        counts["elapsedMs"] = round((time.perf_counter() - start) * 1000, 1)
+        return counts
+
+    def _delete(self, file_id, files=False):
+        row = self._db.execute("SELECT game_mode FROM games WHERE file_id = ?", (file_id,)).fetchone()
+        if row is not None:
+            self._rollup(self._file_rows(file_id), row[0], -1)
+        self._db.execute("DELETE FROM interactions WHERE file_id = ?", (file_id,))
+        self._db.execute("DELETE FROM games WHERE file_id = ?", (file_id,))
+        if files:
+            self._db.execute("DELETE FROM files WHERE id = ?", (file_id,))
+
+    def _index_file(self, path, stat, entry, append):
+        db = self._db
+        if entry is None:
+            file_id = db.execute("INSERT INTO files (path, mtime_ns, size, offset) VALUES (?, ?, ?, 0)",
+                                 (path, stat.st_mtime_ns, stat.st_size)).lastrowid
+            offset = 0
+        else:
+            file_id = entry[0]
+            offset = entry[3] if append else 0
+            if not append:
+                self._delete(file_id)
+
+        state = _GameState()
+        try:
+            if path.endswith(".jsonl"):
+                offset = self._read_jsonl(path, offset, file_id, state)
+            else:
+                offset = self._read_json(path, file_id, state)
+        except (OSError, ValueError) as e:
+            print(f"Log ignoré ({path}) : {e}")
+        self._store_game(file_id, state)
+        db.execute("UPDATE files SET mtime_ns = ?, size = ?, offset = ? WHERE id = ?",
+                   (stat.st_mtime_ns, stat.st_size, offset, file_id))
+        return len(state.rows)
+
+    @staticmethod
+    def _read_jsonl(path, offset, file_id, state):
+        """Lit les lignes complètes à partir de `offset` ; renvoie la position atteinte"""
+        with open(path, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                # Ligne en cours d'écriture : elle sera lue au prochain passage
+                if not line.endswith(b"\n"):
+                    break
+                offset += len(line)
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                kind = record.get("type")
+                if kind == "interaction":
+                    state.interaction(file_id, record)
+                elif kind == "session_start":
+                    state.fields["session_id"] = record.get("session_id")
+                    state.fields["start_time"] = record.get("start_time")
+                    state.metadata(record.get("game_metadata"))
+                elif kind == "metadata":
+                    state.metadata(record.get("game_metadata"))
+                elif kind == "session_end":
+                    state.fields["end_time"] = record.get("end_time")
+                    state.metadata(record.get("game_metadata"), finished=True)
+        return offset
+
+    @staticmethod
+    def _read_json(path, file_id, state):
+        with open(path, encoding="utf-8") as f:
+            session = json.load(f)
+        state.fields["session_id"] = session.get("session_id")
+        state.fields["start_time"] = session.get("start_time")
+        state.fields["end_time"] = session.get("end_time")
+        metadata = session.get("game_metadata") or {}
+        state.metadata(metadata, finished=metadata.get("winner") is not None)
+        for record in session.get("interactions") or []:
+            state.interaction(file_id, record)
+        return os.path.getsize(path)
+
+    def _store_game(self, file_id, state):
+        db = self._db
+        row = db.execute("SELECT game_mode, llm_colors FROM games WHERE file_id = ?", (file_id,)).fetchone()
+        if row is None:
+            db.execute("INSERT INTO games (file_id) VALUES (?)", (file_id,))
+        elif row[1]:
+            state.colors.update(row[1].split(","))
+        old_mode = row[0] if row is not None else None
+        mode = state.fields.get("game_mode", old_mode)
+        if row is not None and mode != old_mode:
+            # Mode de jeu changé en cours de partie : les appels déjà comptés changent de groupe
+            rows = self._file_rows(file_id)
+            self._rollup(rows, old_mode, -1)
+            self._rollup(rows, mode, 1)
+        fields = dict(state.fields)
+        if state.colors:
+            fields["llm_colors"] = ",".join(sorted(state.colors))
+        if fields:
+            columns = ", ".join(f"{column} = ?" for column in fields)
+            db.execute(f"UPDATE games SET {columns} WHERE file_id = ?", (*fields.values(), file_id))
+        if state.rows:
+            db.executemany("INSERT INTO interactions VALUES (?, ?, ?, ?, ?, ?, ?)", state.rows)
+            self._rollup(state.rows, mode, 1)
+            db.execute("UPDATE games SET interactions = interactions + ? WHERE file_id = ?",
+                       (len(state.rows), file_id))
+
+    def _file_rows(self, file_id):
+        return self._db.execute("SELECT * FROM interactions WHERE file_id = ?", (file_id,)).fetchall()
+
+    def _rollup(self, rows, game_mode, sign):
+        """Ajoute (sign = 1) ou retire (sign = -1) des interactions des tables d'agrégats"""
+        calls, moves = Counter(), Counter()
+        game_mode = game_mode or ""
+        for _, _, model, latency, move_latency, cached, status in rows:
+            model = model or ""
+            calls[(game_mode, model, cached, status, -1 if latency is None else round(latency * 1000))] += sign
+            if move_latency is not None and not cached:
+                moves[(game_mode, model, round(move_latency * 1000))] += sign
+        db = self._db
+        db.executemany("INSERT INTO call_counts VALUES (?, ?, ?, ?, ?, ?) "
+                       "ON CONFLICT (game_mode, model, cached, status, latency_ms) "
+                       "DO UPDATE SET count = count + excluded.count",
+                       [(*key, n) for key, n in calls.items()])
+        db.executemany("INSERT INTO move_counts VALUES (?, ?, ?, ?) "
+                       "ON CONFLICT (game_mode, model, move_ms) DO UPDATE SET count = count + excluded.count",
+                       [(*key, n) for key, n in moves.items()])
+        if sign < 0:
+            db.execute("DELETE FROM call_counts WHERE count <= 0")
+            db.execute("DELETE FROM move_counts WHERE count <= 0")
+
+    def _distributions(self, query, game_mode):
+        """{modèle: [(valeur en ms, nombre), ...] triées} à partir d'une table d'agrégats"""
+        where, args = ("AND game_mode = ?", (game_mode,)) if game_mode is not None else ("", ())
+        distributions = {}
+        for model, value, count in self._db.execute(query.format(where=where), args):
+            distributions.setdefault(model or None, []).append((value, count))
+        return distributions
+
+    @staticmethod
+    def _percentile(distribution, total, p):
+        rank = min(total - 1, int(p / 100 * total))
+        seen = 0
+        for value, count in distribution:
+            seen += count
+            if seen > rank:
+                return value / 1000
+        return None
+
+    def latency(self, percentiles=DEFAULT_PERCENTILES, game_mode=None):
+        """
+        Latence des appels au modèle (hors réponses servies par le cache), par modèle.
+        `moveP50` : délai médian d'arrivée du coup pour les réponses reçues en flux.
+
+        Returns:
+            list: [{"model", "calls", "cached", "meanSeconds", "p50", ..., "moveP50"}, ...]
+        """
+        where, args = ("WHERE game_mode = ?", (game_mode,)) if game_mode is not None else ("", ())
+        totals = self._db.execute(f"SELECT model, SUM(count), SUM(cached * count) FROM call_counts {where} "
+                                  f"GROUP BY model ORDER BY model", args).fetchall()
+        latencies = self._distributions(
+            "SELECT model, latency_ms, SUM(count) FROM call_counts WHERE cached = 0 AND latency_ms >= 0 {where} "
+            "GROUP BY model, latency_ms ORDER BY model, latency_ms", game_mode)
+        moves = self._distributions(
+            "SELECT model, move_ms, SUM(count) FROM move_counts WHERE 1 = 1 {where} "
+            "GROUP BY model, move_ms ORDER BY model, move_ms", game_mode)
+        stats = []
+        for model, calls, cached in totals:
+            model = model or None
+            distribution = latencies.get(model, [])
+            live = sum(count for _, count in distribution)
+            entry = {"model": model, "calls": calls, "cached": cached,
+                     "meanSeconds": round(sum(v * n for v, n in distribution) / live / 1000, 3) if live else None}
+            for p in percentiles:
+                entry[f"p{p}"] = self._percentile(distribution, live, p) if live else None
+            move = moves.get(model, [])
+            streamed = sum(count for _, count in move)
+            entry["moveP50"] = self._percentile(move, streamed, 50) if streamed else None
+            stats.append(entry)
+        return stats
+
+    def legality(self, game_mode=None):
+        """
+        Coups proposés par le LLM : légaux, illégaux (hors liste), sans coup lisible, et
+        appels restés sans réponse (erreur réseau, délai dépassé). Ces derniers ne disent
+        rien de la légalité des coups : ils sont exclus du dénominateur de `illegalRate`.
+
+        Returns:
+            list: [{"model", "calls", "legal", "illegal", "invalid", "error", "illegalRate"}, ...]
+        """
+        where, args = ("WHERE game_mode = ?", (game_mode,)) if game_mode is not None else ("", ())
+        by_model = {}
+        for model, status, count in self._db.execute(
+                f"SELECT model, status, SUM(count) FROM call_counts {where} GROUP BY model, status ORDER BY model",
+                args):
+            by_model.setdefault(model or None, Counter())[status] += count
+        stats = []
+        for model, counts in by_model.items():
+            calls = sum(counts.values())
+            answered = calls - counts["error"]
+            stats.append({
+                "model": model,
+                "calls": calls,
+                "legal": counts["legal"],
+                "illegal": counts["illegal"],
+                "invalid": counts["invalid"],
+                "error": counts["error"],
+                # Toute réponse inutilisable fait jouer le Minimax à la place du LLM
+                "illegalRate": round((counts["illegal"] + counts["invalid"]) / answered, 4) if answered else None
+            })
+        return stats
+
+    def outcomes(self, game_mode=None):
+        """
+        Résultats des parties terminées, du point de vue du LLM, par mode de jeu et modèle
+        (ai_vs_llm : LLM contre Minimax).
+
+        Returns:
+            list: [{"gameMode", "model", "games", "finished", "wins", "losses", "draws", "winRate"}, ...]
+        """
+        where, args = ("WHERE game_mode = ?", (game_mode,)) if game_mode is not None else ("", ())
+        rows = self._db.execute(
+            f"SELECT game_mode, model, COUNT(*), SUM(finished), "
+            f"SUM(result = 'win'), SUM(result = 'loss'), SUM(result = 'draw') "
+            f"FROM (SELECT *, {_LLM_RESULT} AS result FROM games {where}) "
+            f"GROUP BY game_mode, model ORDER BY game_mode, model", args).fetchall()
+        stats = []
+        for mode, model, games, finished, wins, losses, draws in rows:
+            decided = (wins or 0) + (losses or 0) + (draws or 0)
+            stats.append({
+                "gameMode": mode,
+                "model": model,
+                "games": games,
+                "finished": finished or 0,
+                "wins": wins or 0,
+                "losses": losses or 0,
+                "draws": draws or 0,
+                "winRate": round((wins or 0) / decided, 4) if decided else None
+            })
+        return stats
+
+    def report(self, game_mode=None, percentiles=DEFAULT_PERCENTILES):
+        """Les trois tableaux d'agrégats (latency, legality, outcomes)"""
+        return {
+            "latency": self.latency(percentiles, game_mode),
+            "legality": self.legality(game_mode),
+            "outcomes": self.outcomes(game_mode)
+        }
+
+    def stats(self):
+        db = self._db
+        return {
+            "files": db.execute("SELECT COUNT(*) FROM files").fetchone()[0],
+            "games": db.execute("SELECT COUNT(*) FROM games").fetchone()[0],
+            "interactions": db.execute("SELECT COUNT(*) FROM interactions").fetchone()[0],
+            "dbPath": self.db_path
+        }
+
+
+def _print_table(title, rows):
+    print(f"\n{title}")
+    if not rows:
+        print("  (no data)")
+        return
+    columns = list(rows[0])
+    cells = [[("-" if row[c] is None else str(row[c])) for c in columns] for row in rows]
+    widths = [max(len(c), *(len(r[i]) for r in cells)) for i, c in enumerate(columns)]
+    print("  " + "  ".join(c.ljust(w) for c, w in zip(columns, widths)))
+    for r in cells:
+        print("  " + "  ".join(v.ljust(w) for v, w in zip(r, widths)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index the LLM game logs and report aggregate statistics")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="SQLite index (default: data/eval/logs_index.sqlite)")
+    parser.add_argument("--logs", default=str(LOG_DIR), help="log directory (default: data/eval/logs)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("ingest", help="index new or changed log files")
+    report = sub.add_parser("report", help="latency percentiles, illegal-move rate and win rate per model")
+    report.add_argument("--mode", help="only games of this mode (e.g. ai_vs_llm, human_vs_llm)")
+    report.add_argument("--percentiles", default=",".join(map(str, DEFAULT_PERCENTILES)),
+                        help="comma-separated latency percentiles")
+    report.add_argument("--no-ingest", action="store_true", help="query the index without updating it first")
+    report.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    index = LogIndex(args.db)
+    try:
+        if args.command == "ingest" or not args.no_ingest:
+            counts = index.ingest(args.logs)
+            if args.command == "ingest":
+                print(json.dumps({**counts, **index.stats()}, indent=2))
+                return
+        result = index.report(args.mode, tuple(int(p) for p in args.percentiles.split(",")))
+        if args.json:
+            print(json.dumps(result, indent=2))
+            return
+        _print_table("LLM latency (seconds, excluding cached answers)", result["latency"])
+        _print_table("Move legality", result["legality"])
+        _print_table("Game outcomes (LLM side)", result["outcomes"])
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
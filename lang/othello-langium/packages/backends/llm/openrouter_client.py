@@ -1,27 +1,280 @@
 import os
 import json
 import time
+import threading
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
 from llm_logger import log_interaction
+from response_cache import ResponseCache, response_cache
 import re
 
 
 load_dotenv()
 
+# Réglages réseau (surchargés par les variables d'environnement)
+DEFAULT_BASE_URL = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1")
+DEFAULT_CONNECT_TIMEOUT = float(os.getenv("OPENROUTER_CONNECT_TIMEOUT", "5"))
+DEFAULT_READ_TIMEOUT = float(os.getenv("OPENROUTER_READ_TIMEOUT", "60"))
+DEFAULT_MAX_RETRIES = int(os.getenv("OPENROUTER_MAX_RETRIES", "2"))
+DEFAULT_MAX_CONCURRENCY = int(os.getenv("OPENROUTER_MAX_CONCURRENCY", "8"))
+
+# Réponses reçues en flux (SSE) : le coup est lu dès qu'il arrive, sans attendre la fin du texte
+DEFAULT_STREAM = os.getenv("OPENROUTER_STREAM", "0") == "1"
+
+# Codes HTTP pour lesquels une nouvelle tentative a du sens
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+
+def create_session(max_retries=DEFAULT_MAX_RETRIES, pool_size=DEFAULT_MAX_CONCURRENCY, backoff=0.5):
+    """
+    Session HTTP réutilisable : connexions (et handshakes TLS) conservées d'un appel
+    à l'autre, et nouvelles tentatives bornées avec backoff exponentiel.
+    """
+    retry = Retry(total=max_retries,
+                  connect=max_retries,
+                  read=max_retries,
+                  status=max_retries,
+                  backoff_factor=backoff,
+                  status_forcelist=RETRY_STATUS,
+                  allowed_methods=frozenset(["POST"]),
+                  respect_retry_after_header=True,
+                  raise_on_status=False)
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=1, pool_maxsize=pool_size)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def parse_json_text(raw_text):
+    """
+    JSON de la réponse du modèle, éventuellement entouré d'un bloc de code ```json.
+
+    Returns:
+        dict: JSON parsé, ou None si le texte n'en contient pas
+    """
+    clean_text = raw_text.strip()
+    match = re.search(r"```(?:json)?\s*(.*?)\s*```", clean_text, re.DOTALL)
+    if match:
+        clean_text = match.group(1)
+
+    # Essayer de parser en JSON
+    try:
+        return json.loads(clean_text)
+    except Exception:
+        return None
+
+
+class JSONFieldScanner:
+    """
+    Lecture incrémentale des champs de premier niveau d'un objet JSON reçu par morceaux.
+    Le texte qui précède l'objet (ex. ```json) est ignoré ; les valeurs imbriquées
+    (objets, tableaux) ne sont pas extraites.
+    """
+
+    def __init__(self):
+        self.fields = {}
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.scalar = False
+        self.expect_key = True
+        self.key = None
+        self.token = []
+        self.closed = False
+
+    def feed(self, text):
+        """
+        Returns:
+            list: [(clé, valeur), ...] des champs terminés dans ce morceau
+        """
+        found = []
+        for ch in text:
+            if self.closed:
+                break
+            if self.in_string:
+                if self.depth == 1:
+                    self.token.append(ch)
+                if self.escape:
+                    self.escape = False
+                elif ch == "\\":
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+                    if self.depth == 1:
+                        self._end_token(found)
+                continue
+            if self.depth == 0:
+                if ch == "{":
+                    self.depth = 1
+                continue
+            if ch == '"':
+                self.in_string = True
+                if self.depth == 1:
+                    self.token = [ch]
+                continue
+            if self.scalar:
+                # Nombre, booléen ou null de premier niveau : terminé au premier séparateur
+                if ch not in ",}" and not ch.isspace():
+                    self.token.append(ch)
+                    continue
+                self._end_token(found)
+            if ch in "{[":
+                self.depth += 1
+            elif ch in "}]":
+                self.depth -= 1
+                self.closed = self.depth == 0
+            elif self.depth == 1:
+                if ch == ",":
+                    self.expect_key = True
+                elif ch == ":":
+                    self.expect_key = False
+                elif not ch.isspace():
+                    self.scalar = True
+                    self.token = [ch]
+        return found
+
+    def _end_token(self, found):
+        text = "".join(self.token)
+        self.token = []
+        self.scalar = False
+        try:
+            value = json.loads(text)
+        except ValueError:
+            return
+        if self.expect_key:
+            self.key = value
+        else:
+            self.fields[self.key] = value
+            found.append((self.key, value))
+
+
+def iter_sse_content(response):
+    """
+    Morceaux de texte d'une réponse chat/completions en flux : lignes `data: {...}`
+    (les commentaires `: ...` envoyés pendant l'attente sont ignorés), fin sur `data: [DONE]`.
+    """
+    for line in response.iter_lines():
+        line = line.decode("utf-8") if isinstance(line, bytes) else line
+        if not line.startswith("data:"):
+            continue
+        data = line[5:].strip()
+        if data == "[DONE]":
+            break
+        event = json.loads(data)
+        if event.get("error"):
+            error = event["error"]
+            raise RuntimeError(error.get("message", str(error)) if isinstance(error, dict) else str(error))
+        choices = event.get("choices") or []
+        if choices:
+            text = (choices[0].get("delta") or {}).get("content")
+            if text:
+                yield text
+
+
+class StreamedChat:
+    """
+    Réponse du modèle en cours de réception (voir OpenRouterClient.chat_stream) :
+    les champs du JSON sont disponibles dès leur arrivée, le texte complet à la fin.
+    """
+
+    def __init__(self):
+        self.fields = {}
+        # Délai (s) d'arrivée de chaque champ depuis le début de la requête
+        self.field_latency = {}
+        self.raw_text = None
+        self.final_json = None
+        self.log_path = None
+        self.error = None
+        self.done = False
+        self._changed = threading.Condition()
+
+    def field(self, key, timeout=None):
+        """
+        Valeur du champ `key` dès qu'elle est reçue.
+
+        Raises:
+            Exception: l'erreur de la requête, si elle a échoué avant ce champ
+
+        Returns:
+            valeur du champ, ou None si la réponse s'est terminée sans lui (ou délai écoulé)
+        """
+        with self._changed:
+            self._changed.wait_for(lambda: key in self.fields or self.done, timeout)
+            if key not in self.fields and self.error is not None:
+                raise self.error
+            return self.fields.get(key)
+
+    def snapshot(self):
+        """Champs reçus jusqu'ici"""
+        with self._changed:
+            return dict(self.fields)
+
+    def result(self, timeout=None):
+        """
+        Attend la fin de la réponse.
+
+        Raises:
+            Exception: l'erreur de la requête
+            TimeoutError: réponse toujours en cours après `timeout` secondes
+
+        Returns:
+            tuple: (texte brut, JSON parsé ou None, chemin du log), comme chat()
+        """
+        with self._changed:
+            if not self._changed.wait_for(lambda: self.done, timeout):
+                raise TimeoutError("LLM response still streaming")
+            if self.error is not None:
+                raise self.error
+            return self.raw_text, self.final_json, self.log_path
+
+    def _set_field(self, key, value, latency):
+        with self._changed:
+            self.fields[key] = value
+            self.field_latency.setdefault(key, round(latency, 3))
+            self._changed.notify_all()
+
+    def _finish(self, raw_text=None, final_json=None, log_path=None, error=None):
+        with self._changed:
+            self.raw_text, self.final_json, self.log_path, self.error = raw_text, final_json, log_path, error
+            self.done = True
+            self._changed.notify_all()
+
+
 class OpenRouterClient:
+    """
+    Client OpenRouter prévu pour être créé une fois et réutilisé pour tous les coups.
+    Il est thread-safe : le nombre d'appels simultanés est limité par `max_concurrency`.
+    """
+
     def __init__(self, 
                  model="openai/gpt-4o",
                  temperature=0, # La température par défaut est 0 pour des réponses déterministes
                  top_p=1,
                  max_tokens=500,
-                 seed=None):
+                 seed=None,
+                 base_url=None,
+                 connect_timeout=DEFAULT_CONNECT_TIMEOUT,
+                 read_timeout=DEFAULT_READ_TIMEOUT,
+                 max_retries=DEFAULT_MAX_RETRIES,
+                 max_concurrency=DEFAULT_MAX_CONCURRENCY,
+                 cache=response_cache,
+                 stream=DEFAULT_STREAM):
 
         self.api_key = os.getenv("OPENROUTER_API_KEY")
         if not self.api_key:
             raise RuntimeError("OPENROUTER_API_KEY missing in .env")
 
-        self.url = "https://openrouter.ai/api/v1/chat/completions"
+        self.url = (base_url or DEFAULT_BASE_URL).rstrip("/") + "/chat/completions"
+        self.timeout = (connect_timeout, read_timeout)
+        self.session = create_session(max_retries=max_retries, pool_size=max_concurrency)
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        # Cache des réponses (None pour toujours interroger le modèle)
+        self.cache = cache
+        # Mode flux préféré par les appelants (voir chat_stream)
+        self.stream = stream
 
         self.params = {
             "model": model,
@@ -33,45 +286,155 @@ class OpenRouterClient:
         if seed is not None:
             self.params["seed"] = seed
 
-    def chat(self, messages):
-        headers = {
+    def close(self):
+        self.session.close()
+
+    def _headers(self):
+        return {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
 
-        payload = self.params | {"messages": messages}
+    def _acquire(self):
+        # Attendre une place libre au plus le temps d'une lecture : au-delà, la requête échoue
+        if not self._slots.acquire(timeout=self.timeout[1]):
+            raise RuntimeError("Too many concurrent LLM requests")
 
-        start = time.time()
-        response = requests.post(self.url, headers=headers, json=payload)
-        latency = time.time() - start
+    def _post(self, payload, headers):
+        """Envoie la requête en respectant la limite de concurrence"""
+        self._acquire()
+        try:
+            return self.session.post(self.url, headers=headers, json=payload, timeout=self.timeout)
+        finally:
+            self._slots.release()
 
-        # Vérifier les erreurs HTTP
+    def _request(self, payload, session_id=None):
+        """
+        Returns:
+            tuple: (texte brut, JSON parsé ou None)
+        """
+        headers = self._headers()
+
+        start = time.time()
+        # Vérifier les erreurs réseau (timeouts, connexion) et HTTP
         try:
+            response = self._post(payload, headers)
             response.raise_for_status()
         except Exception as e:
-            log_interaction(payload, str(e), None, self.params, latency)
+            latency = time.time() - start
+            log_interaction(payload, str(e), None, self.params, latency, session_id=session_id)
             raise e
         
         data = response.json()
         raw_text = data["choices"][0]["message"]["content"]
+        return raw_text, parse_json_text(raw_text)
 
-        clean_text = raw_text.strip()
-        match = re.search(r"```(?:json)?\s*(.*?)\s*```", clean_text, re.DOTALL)
-        if match:
-            clean_text = match.group(1)
+    def chat(self, messages, session_id=None):
+        """
+        Args:
+            messages: messages envoyés au modèle
+            session_id (str, optionnel): partie dans laquelle l'échange est journalisé
 
-        # Essayer de parser en JSON
-        try:
-            final_json = json.loads(clean_text)
-        except Exception:
-            final_json = None
+        Returns:
+            tuple: (texte brut, JSON parsé ou None, chemin du log)
+        """
+        payload = self.params | {"messages": messages}
+
+        start = time.time()
+        if self.cache is None:
+            (raw_text, final_json), cached = self._request(payload, session_id), False
+        else:
+            # Seules les réponses JSON exploitables sont mises en cache
+            key = ResponseCache.make_key(self.params, messages)
+            (raw_text, final_json), cached = self.cache.get_or_compute(
+                key, lambda: self._request(payload, session_id), cacheable=lambda value: value[1] is not None)
+        latency = time.time() - start
 
         log_path = log_interaction(
             prompt=payload,
             raw_response=raw_text,
             final_json=final_json,
             params=self.params,
-            latency=latency
+            latency=latency,
+            cached=cached,
+            session_id=session_id
         )
 
         return raw_text, final_json, log_path
+
+    def chat_stream(self, messages, session_id=None):
+        """
+        Variante en flux (SSE) de chat() : la réponse est lue par un thread en arrière-plan
+        et chaque champ du JSON est disponible dès qu'il est reçu (`reply.field("move")`),
+        sans attendre la fin du texte. Comme chat(), l'appel passe par le cache : une réponse
+        déjà en cache est servie sans requête, et des prompts identiques simultanés ne font
+        qu'un appel (les appels regroupés reçoivent leurs champs à la fin du flux). Le texte
+        complet est journalisé et mis en cache une fois reçu.
+
+        Args:
+            messages: messages envoyés au modèle
+            session_id (str, optionnel): partie dans laquelle l'échange est journalisé
+
+        Returns:
+            StreamedChat
+        """
+        payload = self.params | {"messages": messages}
+        reply = StreamedChat()
+        threading.Thread(target=self._stream, args=(payload, messages, reply, session_id),
+                         name="llm-stream", daemon=True).start()
+        return reply
+
+    def _stream(self, payload, messages, reply, session_id):
+        start = time.time()
+        try:
+            if self.cache is None:
+                (raw_text, final_json), cached = self._stream_request(payload, reply, start, session_id), False
+            else:
+                key = ResponseCache.make_key(self.params, messages)
+                (raw_text, final_json), cached = self.cache.get_or_compute(
+                    key, lambda: self._stream_request(payload, reply, start, session_id),
+                    cacheable=lambda value: value[1] is not None)
+        except Exception as e:
+            reply._finish(error=e)
+            return
+
+        if cached:
+            for field, value in (final_json or {}).items():
+                reply._set_field(field, value, time.time() - start)
+        log_path = None
+        try:
+            log_path = log_interaction(payload, raw_text, final_json, self.params, time.time() - start,
+                                       cached=cached, session_id=session_id,
+                                       field_latency=None if cached else reply.field_latency)
+        finally:
+            reply._finish(raw_text, final_json, log_path)
+
+    def _stream_request(self, payload, reply, start, session_id=None):
+        """
+        Requête en flux ; les champs sont transmis à `reply` au fil de la réception.
+
+        Returns:
+            tuple: (texte brut, JSON parsé ou None)
+        """
+        chunks = []
+        scanner = JSONFieldScanner()
+        try:
+            self._acquire()
+            try:
+                response = self.session.post(self.url, headers=self._headers(), json=payload | {"stream": True},
+                                             timeout=self.timeout, stream=True)
+                try:
+                    response.raise_for_status()
+                    for text in iter_sse_content(response):
+                        chunks.append(text)
+                        for field, value in scanner.feed(text):
+                            reply._set_field(field, value, time.time() - start)
+                finally:
+                    response.close()
+            finally:
+                self._slots.release()
+        except Exception as e:
+            log_interaction(payload, str(e), None, self.params, time.time() - start, session_id=session_id)
+            raise
+        raw_text = "".join(chunks)
+        return raw_text, parse_json_text(raw_text)
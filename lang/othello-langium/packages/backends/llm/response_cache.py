@@ -0,0 +1,242 @@
+"""
+Cache des réponses du LLM, adressé par contenu.
+
+La clé est l'empreinte SHA-256 du modèle, des paramètres d'échantillonnage et des
+messages envoyés : une position déjà vue (ouverture courante, partie rejouée) est
+servie sans nouvel appel à OpenRouter. Les entrées vivent en mémoire (LRU bornée
+en octets, durée de vie maximale) et, si un chemin est fourni, dans une base SQLite
+qui survit aux redémarrages du serveur. Les requêtes identiques simultanées sont
+regroupées : un seul appel part, les autres attendent son résultat.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_MAX_BYTES = int(float(os.getenv("OTHELLO_LLM_CACHE_MB", "16")) * 1024 * 1024)
+DEFAULT_MAX_AGE = float(os.getenv("OTHELLO_LLM_CACHE_TTL", "86400"))
+DEFAULT_DB_PATH = os.getenv("OTHELLO_LLM_CACHE_DB") or None
+
+# Nombre maximal de réponses conservées dans la base SQLite
+DEFAULT_MAX_ROWS = int(os.getenv("OTHELLO_LLM_CACHE_ROWS", "100000"))
+
+# Les entrées expirées de la base sont purgées toutes les PRUNE_EVERY écritures ; au-delà
+# de max_rows, la base est ramenée à max_rows moins 1 % pour ne pas purger à chaque écriture
+PRUNE_EVERY = 1000
+
+# Taille approximative d'une entrée hors texte de la réponse (clé, tuple, horodatage)
+ENTRY_OVERHEAD = 300
+
+
+class _InFlight:
+    """Requête en cours, attendue par les appels identiques arrivés entre-temps"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class ResponseCache:
+    """Cache thread-safe de réponses (texte brut, JSON parsé)"""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, max_age=DEFAULT_MAX_AGE,
+                 db_path=DEFAULT_DB_PATH, max_rows=DEFAULT_MAX_ROWS):
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.max_rows = max_rows
+        self._entries = OrderedDict()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+        self.db_path = db_path
+        self._db = None
+        if db_path:
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute("""CREATE TABLE IF NOT EXISTS responses (
+                                    key TEXT PRIMARY KEY,
+                                    raw_text TEXT NOT NULL,
+                                    final_json TEXT,
+                                    created REAL NOT NULL)""")
+            self._db.execute("CREATE INDEX IF NOT EXISTS responses_created ON responses (created)")
+            self._db.commit()
+        # Lignes de la base (majorant : un remplacement est compté comme un ajout) et
+        # écritures depuis la dernière purge
+        self._db_rows = self._count_rows() if self._db is not None else 0
+        self._puts_since_prune = 0
+
+    @staticmethod
+    def make_key(params, messages):
+        """Empreinte du modèle, des paramètres et du prompt"""
+        payload = json.dumps({"params": params, "messages": messages},
+                             sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """
+        Returns:
+            tuple: (texte brut, JSON parsé) ou None
+        """
+        now = time.time()
+        with self._lock:
+            value = self._get_locked(key, now)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._put_locked(key, value, time.time())
+
+    def get_or_compute(self, key, compute, cacheable=lambda value: True):
+        """
+        Renvoie la réponse en cache ou appelle `compute()` ; un seul appel par clé à la fois.
+
+        Args:
+            compute: fonction sans argument renvoyant (texte brut, JSON parsé)
+            cacheable: prédicat décidant si le résultat de `compute` est conservé
+
+        Raises:
+            Exception: l'erreur levée par `compute`, propagée à tous les appels regroupés
+
+        Returns:
+            tuple: (valeur, True si elle ne provient pas d'un nouvel appel)
+        """
+        now = time.time()
+        with self._lock:
+            value = self._get_locked(key, now)
+            if value is not None:
+                self.hits += 1
+                return value, True
+            waiting = self._in_flight.get(key)
+            if waiting is None:
+                leader = self._in_flight[key] = _InFlight()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if waiting is not None:
+            waiting.done.wait()
+            if waiting.error is not None:
+                raise waiting.error
+            return waiting.value, True
+
+        try:
+            leader.value = compute()
+            if cacheable(leader.value):
+                self.put(key, leader.value)
+            return leader.value, False
+        except Exception as e:
+            leader.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            leader.done.set()
+
+    def _get_locked(self, key, now):
+        entry = self._entries.get(key)
+        if entry is not None:
+            if now - entry[1] <= self.max_age:
+                self._entries.move_to_end(key)
+                return entry[0]
+            self._remove(key)
+
+        if self._db is not None:
+            row = self._db.execute("SELECT raw_text, final_json, created FROM responses WHERE key = ?",
+                                   (key,)).fetchone()
+            if row is not None and now - row[2] <= self.max_age:
+                value = (row[0], json.loads(row[1]) if row[1] is not None else None)
+                self._store_memory(key, value, row[2], now)
+                return value
+        return None
+
+    def _put_locked(self, key, value, now):
+        self._store_memory(key, value, now, now)
+        if self._db is not None:
+            raw_text, final_json = value
+            self._db.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                             (key, raw_text,
+                              json.dumps(final_json, ensure_ascii=False) if final_json is not None else None,
+                              now))
+            self._db_rows += 1
+            self._puts_since_prune += 1
+            if self._db_rows > self.max_rows or self._puts_since_prune >= PRUNE_EVERY:
+                self._prune_locked(now)
+            self._db.commit()
+
+    def _prune_locked(self, now):
+        """Purge de la base : entrées expirées, puis les plus anciennes au-delà de max_rows (index sur created)"""
+        self._db.execute("DELETE FROM responses WHERE created < ?", (now - self.max_age,))
+        rows = self._count_rows()
+        if rows > self.max_rows:
+            excess = rows - self.max_rows + self.max_rows // 100
+            self._db.execute("""DELETE FROM responses WHERE key IN
+                                    (SELECT key FROM responses ORDER BY created LIMIT ?)""", (excess,))
+            rows -= excess
+        self._db_rows = rows
+        self._puts_since_prune = 0
+
+    def _count_rows(self):
+        return self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def _store_memory(self, key, value, stored_at, now):
+        if key in self._entries:
+            self._remove(key)
+        size = ENTRY_OVERHEAD + len(value[0])
+        self._entries[key] = (value, stored_at, size)
+        self.bytes += size
+        # Les entrées expirées puis les moins récemment utilisées sortent en premier
+        while self._entries:
+            oldest_key, (_, oldest_at, _) = next(iter(self._entries.items()))
+            if self.bytes <= self.max_bytes and now - oldest_at <= self.max_age:
+                break
+            self._remove(oldest_key)
+            self.evictions += 1
+
+    def _remove(self, key):
+        _, _, size = self._entries.pop(key)
+        self.bytes -= size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+                self._db_rows = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            stats = {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "maxBytes": self.max_bytes,
+                "maxAgeSeconds": self.max_age,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "hitRate": round(self.hits / lookups, 4) if lookups else None,
+                "dbPath": self.db_path
+            }
+            if self._db is not None:
+                stats["dbEntries"] = self._count_rows()
+            return stats
+
+
+# Instance partagée par tous les clients du serveur
+response_cache = ResponseCache()
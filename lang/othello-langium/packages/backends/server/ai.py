@@ -1,6 +1,17 @@
-import copy
 import sys
 import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from bitboard import allow_diagonal, from_board, valid_moves_mask, flips_mask, iter_bits
+from search import Searcher, SearchResult, SearchTimeout, BLACK, WHITE
+from evaluation import make_evaluator
+from endgame import EndgameSolver, ENDGAME_EMPTIES
+from book import probe_book
+from cache import move_cache
+from parallel import get_search_pool, search_parallel
+from stats import InstrumentedSearcher, uninstrumented_stats
 
 sys.path.append(os.path.join(os.path.dirname(__file__), '../llm'))
 try:
@@ -13,54 +24,35 @@ except ImportError:
 # MINIMAX (VS IA)
 # =================
 
-DIRECTIONS = [(-1, -1), (-1, 0), (-1, 1),
-              (0, -1),          (0, 1),
-              (1, -1),  (1, 0), (1, 1)]
+# Profondeurs par défaut (plateaux <= 100 cases / plus grands) et plafond
+DEFAULT_DEPTH = 5
+DEFAULT_DEPTH_LARGE = 4
+MAX_DEPTH = 10
 
-def get_valid_moves(board, player):
-    opponent = "white" if player == "black" else "black"
-    valid_moves = []
-    
-    rows = len(board)
-    cols = len(board[0]) if rows > 0 else 0
+# Taille de plateau à partir de laquelle le pool de processus est utilisé par défaut
+PARALLEL_MIN_CELLS = 100
 
-    for r in range(rows):
-        for c in range(cols):
-            if board[r][c] is not None:
-                continue
-            flips = []
-            for dr, dc in DIRECTIONS:
-                rr, cc = r + dr, c + dc
-                line = []
-                while 0 <= rr < rows and 0 <= cc < cols and board[rr][cc] == opponent:
-                    line.append((rr, cc))
-                    rr += dr
-                    cc += dc
-                if line and 0 <= rr < rows and 0 <= cc < cols and board[rr][cc] == player:
-                    flips.extend(line)
-            if flips:
-                valid_moves.append((r, c))
-    return valid_moves
-
-def apply_move(board, move, player):
-    opponent = "white" if player == "black" else "black"
-    new_board = copy.deepcopy(board)
+# Bibliothèque d'ouvertures et résolution exacte des finales : seulement à partir de
+# cette profondeur, pour que les niveaux de difficulté les plus bas restent faibles.
+# La bibliothèque répond avec le coup calculé à la profondeur demandée (voir book.py)
+EXPERT_MIN_DEPTH = 3
+
+def get_valid_moves(board, player, config=None):
+    geom, own, opp, empty = from_board(board, player, allow_diagonal(config))
+    moves = valid_moves_mask(geom, own, opp, empty)
+    return [geom.coords(i) for i in iter_bits(moves)]
+
+def apply_move(board, move, player, config=None):
+    geom, own, opp, _ = from_board(board, player, allow_diagonal(config))
+    new_board = [list(row) for row in board]
     r, c = move
     new_board[r][c] = player
-    
-    rows = len(board)
-    cols = len(board[0])
 
-    for dr, dc in DIRECTIONS:
-        rr, cc = r + dr, c + dc
-        line = []
-        while 0 <= rr < rows and 0 <= cc < cols and new_board[rr][cc] == opponent:
-            line.append((rr, cc))
-            rr += dr
-            cc += dc
-        if line and 0 <= rr < rows and 0 <= cc < cols and new_board[rr][cc] == player:
-            for flip_r, flip_c in line:
-                new_board[flip_r][flip_c] = player
+    if 0 <= r < geom.rows and 0 <= c < geom.cols:
+        flips = flips_mask(geom, own, opp, geom.bit(r, c))
+        for i in iter_bits(flips):
+            flip_r, flip_c = geom.coords(i)
+            new_board[flip_r][flip_c] = player
     return new_board
 
 def evaluate(board, player):
@@ -69,42 +61,145 @@ def evaluate(board, player):
     opponent_count = sum(row.count(opponent) for row in board)
     return player_count - opponent_count
 
-def minimax(board, depth, player, maximizing):
-    valid_moves = get_valid_moves(board, player)
-    if depth == 0 or not valid_moves:
-        return evaluate(board, player), None
-
-    best_move = None
-    if maximizing:
-        max_eval = float("-inf")
-        for move in valid_moves:
-            new_board = apply_move(board, move, player)
-            eval_score, _ = minimax(new_board, depth - 1, "white" if player == "black" else "black", False)
-            if eval_score > max_eval:
-                max_eval = eval_score
-                best_move = move
-        return max_eval, best_move
-    else:
-        min_eval = float("inf")
-        for move in valid_moves:
-            new_board = apply_move(board, move, player)
-            eval_score, _ = minimax(new_board, depth - 1, "white" if player == "black" else "black", True)
-            if eval_score < min_eval:
-                min_eval = eval_score
-                best_move = move
-        return min_eval, best_move
-
-def get_minimax_move(board, player, depth=None):
+def minimax(board, depth, player, maximizing=True, config=None):
+    """
+    Recherche alpha-beta à profondeur fixe.
+
+    Returns:
+        tuple: (score du point de vue de `player`, meilleur coup ou None)
+    """
+    result = search_minimax(board, player, depth, workers=1, config=config)
+    return (result.score if maximizing else -result.score), result.move
+
+def get_search_config(board, config=None):
+    """
+    Configuration du variant utile à la recherche (boardType, scoreGoal, evaluator).
+    Sans boardType explicite, un plateau contenant des cases "wall" est considéré circulaire.
+    """
+    config = dict(config or {})
+    if not config.get("boardType"):
+        has_walls = any(cell == "wall" for row in board for cell in row)
+        config["boardType"] = "circle" if has_walls else "square"
+    return config
+
+def search_minimax(board, player, depth=None, time_ms=None, workers=None, config=None, stats=False,
+                   deadline=None):
+    """
+    Lance la recherche Minimax et renvoie le résultat complet (coup + statistiques).
+
+    Args:
+        depth (int, optionnel): profondeur maximale (par défaut selon la taille du plateau,
+            ou MAX_DEPTH si seul un budget de temps est fourni)
+        time_ms (int, optionnel): budget de temps en millisecondes
+        workers (int, optionnel): 1 force la recherche séquentielle (déterministe) ;
+            par défaut le pool de processus est utilisé sur les grands plateaux s'il existe
+        config (dict, optionnel): configuration du variant (boardType, scoreGoal, evaluator,
+            useBook, endgameEmpties, useCache)
+        stats (bool): joindre au résultat les statistiques détaillées de la recherche
+            alpha-beta séquentielle (result.stats, voir stats.py)
+        deadline (float, optionnel): échéance absolue (time.perf_counter()) de la requête ;
+            le budget de temps est réduit pour la respecter
+
+    Returns:
+        SearchResult
+    """
+    depth = resolve_depth(len(board) * len(board[0]), depth, time_ms)
+    geom, own, opp, empty = from_board(board, player, allow_diagonal(config))
+    side = BLACK if player == "black" else WHITE
+    config = get_search_config(board, config)
+    return search_position(geom, own, opp, empty, side, depth, time_ms, workers, config, stats=stats,
+                           deadline=deadline)
+
+def resolve_depth(cells, depth=None, time_ms=None):
+    """Profondeur par défaut selon la taille du plateau (ou MAX_DEPTH avec un budget de temps), plafonnée"""
     if depth is None:
-        depth = 3
-        if len(board) * len(board[0]) > 100:
-            depth = 2
+        if time_ms is not None:
+            depth = MAX_DEPTH
+        else:
+            depth = DEFAULT_DEPTH
+            if cells > 100:
+                depth = DEFAULT_DEPTH_LARGE
     
     # Limiter la profondeur maximale pour éviter les calculs trop longs
-    depth = min(depth, 6)
-        
-    _, move = minimax(board, depth=depth, player=player, maximizing=True)
-    return move
+    return min(depth, MAX_DEPTH)
+
+def search_position(geom, own, opp, empty, side, depth, time_ms=None, workers=None, config=None, searcher=None,
+                    stats=False, deadline=None):
+    """
+    Recherche sur des bitboards déjà construits (cache, bibliothèque, finale, puis alpha-beta).
+
+    Args:
+        searcher (Searcher, optionnel): moteur réutilisé d'un coup à l'autre (table de
+            transposition et historique conservés) ; un moteur neuf sinon
+        deadline (float, optionnel): échéance absolue (time.perf_counter()) ; une recherche
+            écourtée par l'échéance n'est pas mise en cache
+
+    Returns:
+        SearchResult
+    """
+    start = time.perf_counter()
+    config = config or {}
+
+    # Même position, même variant, même profondeur et même budget : réponse immédiate
+    use_cache = config.get("useCache", True)
+    if use_cache:
+        black, white = (own, opp) if side == BLACK else (opp, own)
+        cache_key = move_cache.make_key(geom, black, white, empty, side, depth, time_ms, config)
+        cached = move_cache.get(cache_key)
+        if cached is not None:
+            move, score, cached_depth, cached_source = cached
+            # "ponder" : réponse calculée pendant le tour de l'adversaire (voir ponder.py)
+            source = "ponder" if cached_source == "ponder" else "cache"
+            result = SearchResult(move, score, cached_depth, 0, start, source)
+            if stats:
+                result.stats = uninstrumented_stats(source)
+            return result
+
+    # L'échéance ne fait que borner le budget : la clé du cache garde le budget demandé
+    budget_ms = time_ms
+    if deadline is not None:
+        remaining_ms = max(0.0, (deadline - start) * 1000)
+        if budget_ms is None or remaining_ms < budget_ms:
+            budget_ms = remaining_ms
+    result = _run_search(geom, own, opp, empty, side, depth, budget_ms, workers, config, start, searcher, stats)
+    if stats and result.stats is None:
+        # Bibliothèque, finale ou pool de processus : seule la recherche séquentielle est instrumentée
+        result.stats = uninstrumented_stats(result.source if result.source != "search" else "parallel")
+    truncated = budget_ms != time_ms and result.depth < depth
+    if use_cache and result.move is not None and not truncated:
+        move_cache.put(cache_key, (result.move, result.score, result.depth, result.source))
+    return result
+
+def _run_search(geom, own, opp, empty, side, depth, time_ms, workers, config, start, searcher=None, stats=False):
+    if depth >= EXPERT_MIN_DEPTH:
+        if config.get("useBook", True):
+            entry = probe_book(geom, own, opp, empty, side, config, depth)
+            if entry:
+                r, c, score, book_depth = entry
+                return SearchResult((r, c), score, book_depth, 0, start, "book")
+
+        if empty.bit_count() <= config.get("endgameEmpties", ENDGAME_EMPTIES):
+            solver = EndgameSolver(geom, config.get("scoreGoal"))
+            try:
+                return solver.search(own, opp, empty, depth, side, time_ms=time_ms)
+            except SearchTimeout:
+                print("Endgame solver ran out of time. Fallback to Minimax.")
+                time_ms = max(0, time_ms - (time.perf_counter() - start) * 1000)
+
+    pool, pool_workers = get_search_pool()
+    if workers is None:
+        workers = pool_workers if geom.size > PARALLEL_MIN_CELLS else 1
+    if workers > 1 and pool is not None:
+        return search_parallel(geom, own, opp, empty, depth, side, time_ms=time_ms, config=config)
+
+    if searcher is None:
+        searcher = Searcher(geom, make_evaluator(geom, config))
+    if stats:
+        searcher = InstrumentedSearcher.from_searcher(searcher)
+    return searcher.search(own, opp, empty, depth, side, time_ms=time_ms)
+
+def get_minimax_move(board, player, depth=None, time_ms=None, workers=None, config=None):
+    return search_minimax(board, player, depth, time_ms, workers, config).move
 
 # =================
 # LLM
@@ -147,21 +242,43 @@ def parse_llm_move(move_str):
 def to_algebraic(r, c):
     return f"{chr(ord('A') + c)}{r + 1}"
 
+LLM_MODEL = "openai/gpt-4o"
+LLM_TEMPERATURE = 0.2
+
+_llm_client = None
+_llm_client_lock = threading.Lock()
+
+def get_llm_client():
+    """
+    Client LLM partagé par toutes les requêtes : la session HTTP (et ses connexions
+    TLS) est créée une seule fois, au premier coup joué en mode LLM.
+    """
+    global _llm_client
+    if _llm_client is None:
+        with _llm_client_lock:
+            if _llm_client is None:
+                _llm_client = OpenRouterClient(model=LLM_MODEL, temperature=LLM_TEMPERATURE)
+    return _llm_client
+
+def set_llm_client(client):
+    """Remplace le client LLM partagé (ex. client factice pour jouer hors ligne) ; None le réinitialise"""
+    global _llm_client
+    with _llm_client_lock:
+        _llm_client = client
+
 # Interroge le LLM
-def get_llm_move(board, player, config):
-    if not OpenRouterClient:
+def get_llm_move(board, player, config, session_id=None):
+    if not OpenRouterClient and _llm_client is None:
         print("Error: OpenRouterClient not available.")
         return None
 
     # Calculer les coups valides pour guider le LLM
-    valid_moves = get_valid_moves(board, player)
+    valid_moves = get_valid_moves(board, player, config)
     if not valid_moves:
         return None
     
     valid_moves_str = ", ".join([to_algebraic(r, c) for r, c in valid_moves])
 
-    client = OpenRouterClient(model="openai/gpt-4o", temperature=0.2)
-    
     board_str = board_to_string(board)
     player_name = "NOIR (B)" if player == "black" else "BLANC (W)"
     
@@ -191,10 +308,19 @@ def get_llm_move(board, player, config):
 
     print(f"--- [LLM] Thinking for {player} (Choices: {valid_moves_str}) ---")
     try:
-        _, json_resp, _ = client.chat([
+        messages = [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_prompt}
-        ])
+        ]
+        client = get_llm_client()
+        if getattr(client, "stream", False):
+            # Le coup arrive après le raisonnement : il est validé dès sa réception, le reste
+            # du texte est reçu et journalisé en arrière-plan
+            reply = client.chat_stream(messages, session_id=session_id)
+            move = reply.field("move")
+            json_resp = reply.result()[1] if move is None else dict(reply.snapshot(), move=move)
+        else:
+            _, json_resp, _ = client.chat(messages, session_id=session_id)
         
         if json_resp and 'move' in json_resp:
             move_str = json_resp['move']
@@ -212,4 +338,73 @@ def get_llm_move(board, player, config):
     except Exception as e:
         print(f"--- [LLM] Error: {e} ---")
         
-    return None
\ No newline at end of file
+    return None
+
+# =================
+# COURSE LLM / MINIMAX
+# =================
+
+# Délai d'attente du LLM par défaut, compté depuis le début de la requête (le timeout
+# de lecture HTTP, bien plus long, ne doit pas décider de la durée d'un tour)
+LLM_DEADLINE_MS = float(os.getenv("OTHELLO_LLM_DEADLINE_MS", "10000"))
+
+# Threads dédiés aux appels LLM (bloqués sur le réseau, ils ne concurrencent pas la recherche)
+_llm_executor = ThreadPoolExecutor(max_workers=int(os.getenv("OPENROUTER_MAX_CONCURRENCY", "8")),
+                                   thread_name_prefix="llm")
+
+def llm_deadline(config):
+    """Délai accordé par défaut au LLM : LLM_DEADLINE_MS, borné par le timer DSL du variant"""
+    timer = (config or {}).get("timer")
+    return min(LLM_DEADLINE_MS, float(timer) * 1000) if timer else LLM_DEADLINE_MS
+
+def race_llm_minimax(board, player, config, depth=None, time_ms=None, workers=None, deadline_ms=None,
+                     session_id=None, minimax=None):
+    """
+    Interroge le LLM et lance le Minimax en même temps.
+
+    Le coup du LLM est retenu s'il est validé avant `deadline_ms` (compté depuis le début
+    de la requête) ; sinon le résultat du Minimax, déjà calculé, est joué sans attendre.
+    Un appel LLM hors délai se termine en arrière-plan (et reste journalisé).
+
+    Args:
+        deadline_ms (float, optionnel): délai du LLM (llm_deadline(config) par défaut)
+        minimax (callable, optionnel): recherche à lancer à la place de search_minimax
+            (ex. celle d'une partie gérée côté serveur) ; renvoie un SearchResult
+
+    Returns:
+        tuple: (coup, SearchResult du Minimax, infos de la course)
+    """
+    start = time.perf_counter()
+    if deadline_ms is None:
+        deadline_ms = llm_deadline(config)
+    llm_elapsed = []
+
+    def timed_llm_move():
+        try:
+            return get_llm_move(board, player, config, session_id)
+        finally:
+            llm_elapsed.append(time.perf_counter() - start)
+
+    future = _llm_executor.submit(timed_llm_move)
+    if minimax is not None:
+        result = minimax()
+    else:
+        result = search_minimax(board, player, depth, time_ms, workers, config)
+
+    remaining = max(0.0, deadline_ms / 1000 - (time.perf_counter() - start))
+    try:
+        llm_move = future.result(timeout=remaining)
+        llm_status = "move" if llm_move is not None else "invalid"
+    except FutureTimeout:
+        llm_move, llm_status = None, "timeout"
+        print(f"--- [LLM] No answer after {deadline_ms} ms. Playing the Minimax move. ---")
+
+    winner = "llm" if llm_move is not None else "minimax"
+    race = {
+        "winner": winner,
+        "llmStatus": llm_status,
+        "llmLatencyMs": round(llm_elapsed[0] * 1000, 2) if llm_elapsed else None,
+        "minimaxLatencyMs": round(result.elapsed * 1000, 2),
+        "deadlineMs": deadline_ms
+    }
+    return (llm_move if winner == "llm" else result.move), result, race
@@ -0,0 +1,223 @@
+"""
+Analyse multi-PV (API /analyze) : score et variante principale de chaque coup légal,
+ou des K meilleurs.
+
+Tous les coups de la racine sont cherchés par un même Analyzer, en approfondissement
+itératif : la table de transposition, les coups "killer" et l'historique servent d'un
+coup candidat à l'autre et d'une profondeur à la suivante. En mode top-K, les coups
+au-delà des K premiers ne sont sondés qu'en fenêtre nulle contre le K-ième score et
+re-cherchés seulement s'ils le dépassent. Un lot de positions partage un Analyzer par
+géométrie. La bibliothèque d'ouvertures, le solveur de finale et le cache de coups
+ne sont pas utilisés : ils ne donnent qu'un coup, pas un score par coup.
+"""
+import time
+
+from bitboard import allow_diagonal, from_board, iter_bits
+from search import Searcher, Position, SearchTimeout, INF, BLACK, WHITE
+from evaluation import make_evaluator
+from ai import get_search_config, resolve_depth
+from params import number_option, parse_search_options
+
+# Positions acceptées dans une même requête
+MAX_POSITIONS = 64
+
+
+class AnalysisCancelled(Exception):
+    """Analyse abandonnée par l'appelant (client déconnecté)"""
+
+
+class Analyzer(Searcher):
+    """Searcher qui score chaque coup de la racine au lieu du seul meilleur"""
+
+    def analyze(self, own, opp, empty, side, depth, top_k=None, time_ms=None, deadline=None,
+                on_depth=None):
+        """
+        Approfondissement itératif multi-PV de 1 à `depth`.
+
+        Args:
+            top_k (int, optionnel): nombre de coups à scorer exactement (tous par défaut)
+            time_ms (float, optionnel): budget de temps ; la profondeur 1 est toujours terminée
+            deadline (float, optionnel): échéance absolue (time.perf_counter()), comme time_ms
+            on_depth (callable, optionnel): appelé avec le rapport de chaque profondeur terminée ;
+                peut lever AnalysisCancelled pour arrêter l'analyse
+
+        Returns:
+            dict: rapport de la dernière profondeur terminée (voir _report)
+        """
+        start = time.perf_counter()
+        self.nodes = 0
+        self.deadline = None
+        pos = Position.from_sides(self.geom, own, opp, empty, side)
+        moves = pos.valid_moves()
+        if not moves:
+            return {"depth": 0, "nodes": 0, "elapsedMs": 0.0, "moves": [],
+                    "pass": bool(pos.opponent_moves()), "gameOver": not pos.opponent_moves(),
+                    "score": self.evaluate(pos)}
+
+        end = start + time_ms / 1000 if time_ms is not None else None
+        if deadline is not None and (end is None or deadline < end):
+            end = deadline
+        self.tt.new_search()
+        self.killers = []
+        order = list(iter_bits(moves))
+        k = len(order) if not top_k else max(1, min(top_k, len(order)))
+        depth = max(1, min(depth, empty.bit_count() + 1))
+        report = None
+        for d in range(1, depth + 1):
+            if end is not None and d > 1:
+                # Même règle que Searcher.search : pas d'itération entamée sans la moitié du budget
+                now = time.perf_counter()
+                if now >= end or now - start >= (end - start) / 2:
+                    break
+                self.deadline = end
+            try:
+                scores = self._score_root(pos, d, order, k)
+            except SearchTimeout:
+                break
+            # Tri stable : à score égal, l'ordre de l'itération précédente est conservé
+            order.sort(key=lambda i: -scores.get(i, -INF))
+            report = self._report(pos, d, order[:k], scores, start)
+            if on_depth is not None:
+                on_depth(report)
+        self.deadline = None
+        return report
+
+    def _score_root(self, pos, depth, order, k):
+        """
+        Scores exacts des coups de la racine à profondeur fixe (les K meilleurs au moins).
+
+        Returns:
+            dict: {index: score} ; les coups prouvés hors des K meilleurs en sont absents
+        """
+        scores = {}
+        threshold = -INF
+        for n, i in enumerate(order):
+            pos.make_move(i)
+            try:
+                if n < k:
+                    score = -self.negamax(pos, depth - 1, -INF, INF, 1)
+                else:
+                    # Fenêtre nulle : le coup n'entre dans les K meilleurs que s'il bat le K-ième
+                    score = -self.negamax(pos, depth - 1, -threshold - 1, -threshold, 1)
+                    if score > threshold:
+                        score = -self.negamax(pos, depth - 1, -INF, INF, 1)
+                    else:
+                        score = None
+            finally:
+                pos.unmake_move()
+            if score is not None:
+                scores[i] = score
+                if len(scores) >= k:
+                    threshold = sorted(scores.values(), reverse=True)[k - 1]
+        return scores
+
+    def _report(self, pos, depth, best, scores, start):
+        geom = self.geom
+        lines = []
+        for i in best:
+            pos.make_move(i)
+            try:
+                rest = self.principal_variation(pos, depth - 1)
+            finally:
+                pos.unmake_move()
+            lines.append({
+                "move": list(geom.coords(i)),
+                "score": scores[i],
+                "pv": [list(geom.coords(i))] + [None if j is None else list(geom.coords(j)) for j in rest]
+            })
+        return {
+            "depth": depth,
+            "nodes": self.nodes,
+            "elapsedMs": round((time.perf_counter() - start) * 1000, 3),
+            "moves": lines
+        }
+
+
+def parse_positions(data):
+    """
+    Positions d'une requête /analyze : `positions` ([{"board", "player"}, ...]) ou
+    `board` / `player` pour une seule position.
+
+    Raises:
+        ValueError: requête mal formée ou lot trop grand
+
+    Returns:
+        list: [(board, player), ...]
+    """
+    if data.get("positions") is not None:
+        items = data["positions"]
+        if not isinstance(items, list) or not items:
+            raise ValueError("'positions' must be a non-empty list")
+    elif data.get("board") is not None:
+        items = [{"board": data["board"], "player": data.get("player")}]
+    else:
+        raise ValueError("A board or a list of positions is required")
+    if len(items) > MAX_POSITIONS:
+        raise ValueError(f"At most {MAX_POSITIONS} positions per request")
+    positions = []
+    for item in items:
+        board = item.get("board") if isinstance(item, dict) else None
+        player = item.get("player") if isinstance(item, dict) else None
+        if not board or not isinstance(board, list) or not all(isinstance(row, list) and row for row in board):
+            raise ValueError("Each position needs a board (list of rows)")
+        if player not in ("black", "white"):
+            raise ValueError(f"Invalid player '{player}'")
+        positions.append((board, player))
+    return positions
+
+
+def parse_options(data):
+    """
+    Options d'une requête /analyze : `depth`, `timeMs`, `topK`, `deadlineMs` et `config`.
+
+    Raises:
+        ValueError: option mal typée ou hors bornes
+
+    Returns:
+        tuple: (depth, time_ms, top_k) tels que reçus (None si absents)
+    """
+    depth, time_ms, _ = parse_search_options(data)
+    return depth, time_ms, number_option(data, "topK", integer=True, minimum=1)
+
+
+def analyze_positions(positions, depth=None, time_ms=None, top_k=None, config=None, deadline=None,
+                      on_depth=None, on_result=None):
+    """
+    Analyse un lot de positions, l'une après l'autre.
+
+    Args:
+        positions (list): [(board, player), ...] (voir parse_positions)
+        depth, time_ms: par position, comme pour /move
+        on_depth (callable, optionnel): on_depth(index, report) à chaque profondeur terminée
+        on_result (callable, optionnel): on_result(result) à la fin de chaque position
+
+    Returns:
+        list: un rapport par position ("index" et "player" ajoutés) ; les positions
+            non commencées avant l'échéance ont "depth": 0 et "skipped": True
+    """
+    analyzers = {}
+    results = []
+
+    def add(result):
+        results.append(result)
+        if on_result is not None:
+            on_result(result)
+
+    for index, (board, player) in enumerate(positions):
+        if deadline is not None and time.perf_counter() >= deadline:
+            add({"index": index, "player": player, "depth": 0, "moves": [], "skipped": True})
+            continue
+        search_config = get_search_config(board, config)
+        geom, own, opp, empty = from_board(board, player, allow_diagonal(search_config))
+        analyzer = analyzers.get(geom)
+        if analyzer is None:
+            analyzer = analyzers[geom] = Analyzer(geom, make_evaluator(geom, search_config))
+        side = BLACK if player == "black" else WHITE
+        callback = None
+        if on_depth is not None:
+            def callback(report, index=index):
+                on_depth(index, report)
+        report = analyzer.analyze(own, opp, empty, side, resolve_depth(geom.size, depth, time_ms),
+                                  top_k, time_ms, deadline, callback)
+        add({"index": index, "player": player, **report})
+    return results
@@ -0,0 +1,141 @@
+"""
+Analyse vectorisée (NumPy) d'un grand nombre de plateaux en un seul appel.
+
+Les plateaux sont des tableaux int8 de forme N x rows x cols :
+    EMPTY = 0, BLACK = 1, WHITE = 2, WALL = -1 (case hors plateau)
+
+Utilisé pour l'auto-apprentissage et l'analyse hors ligne, là où
+get_valid_moves / evaluate traiteraient les plateaux un par un. Les règles du variant
+sont celles du moteur : directions de capture de bitboard.Geometry (`allowDiagonal`),
+cases jouables de evaluation.playable_cells (`boardType`) et sens du score (`scoreGoal`).
+"""
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from bitboard import allow_diagonal, get_geometry
+from evaluation import playable_cells
+
+EMPTY, BLACK, WHITE, WALL = 0, 1, 2, -1
+
+_CELL_CODES = {None: EMPTY, "black": BLACK, "white": WHITE}
+
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError("NumPy is required for batch analysis (pip install numpy)")
+
+
+def board_mask(rows, cols, board_type="square"):
+    """
+    Cases jouables d'un plateau (evaluation.playable_cells : cercle du générateur HTML
+    pour boardType = "circle").
+
+    Returns:
+        np.ndarray: booléens rows x cols
+    """
+    _require_numpy()
+    mask = np.zeros((rows, cols), dtype=bool)
+    for r, c in playable_cells(rows, cols, board_type):
+        mask[r, c] = True
+    return mask
+
+
+def boards_to_array(boards):
+    """
+    Convertit une liste de plateaux (format /move : "black"/"white"/None/"wall")
+    en tableau int8 N x rows x cols.
+    """
+    _require_numpy()
+    return np.array([[[_CELL_CODES.get(cell, WALL) for cell in row] for row in board]
+                     for board in boards], dtype=np.int8)
+
+
+def _shifted(padded, pad, rows, cols, dr, dc):
+    """Vue du tableau décalé : case (r, c) -> valeur en (r + dr, c + dc), False hors plateau"""
+    return padded[:, pad + dr:pad + dr + rows, pad + dc:pad + dc + cols]
+
+
+def _sides(boards, player, mask):
+    """(boards, own, opp, empty) en booléens N x rows x cols, cases masquées exclues"""
+    boards = np.asarray(boards, dtype=np.int8)
+    n = boards.shape[0]
+    player = np.broadcast_to(np.asarray(player, dtype=np.int8), (n,)).reshape(n, 1, 1)
+    own = (boards == player) & mask
+    opp = (boards == np.int8(BLACK + WHITE) - player) & mask
+    empty = (boards == EMPTY) & mask
+    return boards, own, opp, empty
+
+
+def _mask(rows, cols, config, mask):
+    if mask is not None:
+        return np.asarray(mask, dtype=bool)
+    return board_mask(rows, cols, (config or {}).get("boardType") or "square")
+
+
+def _scores(own, opp, config):
+    """Différence de pions du point de vue du joueur, de signe inversé si scoreGoal = "min" """
+    scores = own.sum(axis=(1, 2), dtype=np.int32) - opp.sum(axis=(1, 2), dtype=np.int32)
+    return -scores if (config or {}).get("scoreGoal") == "min" else scores
+
+
+def batch_analyze(boards, player, config=None, mask=None):
+    """
+    Coups légaux, nombre de pions retournés et évaluation pour N plateaux.
+
+    Args:
+        boards (np.ndarray): int8 N x rows x cols
+        player (int ou np.ndarray): BLACK / WHITE, ou un tableau de N valeurs (un camp par plateau)
+        config (dict, optionnel): configuration du variant (boardType, allowDiagonal, scoreGoal)
+        mask (np.ndarray, optionnel): cases jouables rows x cols ; par défaut celles de
+            `boardType` (voir board_mask)
+
+    Returns:
+        dict: {
+            "legal": bool N x rows x cols,
+            "flips": int16 N x rows x cols (0 pour les cases illégales),
+            "scores": int32 N (différence de pions du point de vue de `player`, négée si scoreGoal = "min")
+        }
+    """
+    _require_numpy()
+    n, rows, cols = np.shape(boards)
+    mask = _mask(rows, cols, config, mask)
+    boards, own, opp, empty = _sides(boards, player, mask)
+
+    # Mêmes directions de capture que le moteur (Geometry filtre selon allowDiagonal)
+    playable = sum(1 << int(i) for i in np.flatnonzero(mask))
+    directions = get_geometry(rows, cols, playable, allow_diagonal(config)).directions
+
+    pad = max(rows, cols)
+    own_p = np.pad(own, ((0, 0), (pad, pad), (pad, pad)))
+    opp_p = np.pad(opp, ((0, 0), (pad, pad), (pad, pad)))
+
+    flips = np.zeros((n, rows, cols), dtype=np.int16)
+    for dr, dc in directions:
+        # `alive` : les k-1 premières cases dans cette direction sont toutes adverses
+        alive = np.ones((n, rows, cols), dtype=bool)
+        for k in range(1, pad):
+            if k > 1:
+                closed = alive & _shifted(own_p, pad, rows, cols, k * dr, k * dc)
+                flips += closed * np.int16(k - 1)
+            alive &= _shifted(opp_p, pad, rows, cols, k * dr, k * dc)
+            if not alive.any():
+                break
+
+    legal = empty & (flips > 0)
+    flips = np.where(legal, flips, 0).astype(np.int16)
+    return {"legal": legal, "flips": flips, "scores": _scores(own, opp, config)}
+
+
+def batch_valid_moves(boards, player, config=None, mask=None):
+    """Masques des coups légaux (bool N x rows x cols)"""
+    return batch_analyze(boards, player, config, mask)["legal"]
+
+
+def batch_evaluate(boards, player, config=None, mask=None):
+    """Évaluation (différence de pions, signe selon scoreGoal) de N plateaux"""
+    _require_numpy()
+    _, rows, cols = np.shape(boards)
+    _, own, opp, _ = _sides(boards, player, _mask(rows, cols, config, mask))
+    return _scores(own, opp, config)
@@ -0,0 +1,170 @@
+"""
+Représentation compacte du plateau sous forme d'entiers (bitboards).
+
+Chaque camp est stocké dans un entier Python où le bit `r * cols + c`
+correspond à la case (r, c). Les entiers Python étant de taille arbitraire,
+la même logique fonctionne pour le 8x8, le 16x16 et les plateaux non carrés.
+Les cases hors plateau (ex: "wall" sur les plateaux circulaires) ne sont ni
+vides ni occupées : elles bloquent simplement les lignes de capture.
+
+La topologie d'un plateau (cases jouables, directions autorisées par `allowDiagonal`)
+est compilée une seule fois en tables de décalages et de rayons par case, mises en
+cache : la génération de coups ne fait plus aucun test de bornes.
+"""
+from functools import lru_cache
+
+DIRECTIONS = [(-1, -1), (-1, 0), (-1, 1),
+              (0, -1),          (0, 1),
+              (1, -1),  (1, 0), (1, 1)]
+
+# Directions restantes quand le variant interdit les captures en diagonale
+ORTHOGONAL_DIRECTIONS = [(dr, dc) for dr, dc in DIRECTIONS if dr == 0 or dc == 0]
+
+
+class Geometry:
+    """
+    Topologie compilée d'un plateau rows x cols : masques de décalage et rayons par case,
+    restreints aux cases jouables et aux directions autorisées
+    """
+
+    __slots__ = ("rows", "cols", "size", "full", "playable", "directions", "shifts", "rays")
+
+    def __init__(self, rows, cols, playable=None, allow_diagonal=True):
+        self.rows = rows
+        self.cols = cols
+        self.size = rows * cols
+        self.full = (1 << self.size) - 1
+        self.playable = self.full if playable is None else playable
+        self.directions = DIRECTIONS if allow_diagonal else ORTHOGONAL_DIRECTIONS
+
+        first_col = 0
+        last_col = 0
+        for r in range(rows):
+            first_col |= 1 << (r * cols)
+            last_col |= 1 << (r * cols + cols - 1)
+
+        # Pour chaque direction : (décalage signé, masque des cases d'arrivée).
+        # Le masque supprime les bits qui "débordent" d'une ligne à l'autre et les cases injouables.
+        self.shifts = []
+        for dr, dc in self.directions:
+            mask = self.playable
+            if dc == 1:
+                mask &= ~first_col
+            elif dc == -1:
+                mask &= ~last_col
+            self.shifts.append((dr * cols + dc, mask))
+
+        # Pour chaque case jouable : ses rayons, suites de cases jouables consécutives dans
+        # chaque direction (bits isolés, du plus proche au plus lointain). Un rayon de moins
+        # de deux cases ne peut rien capturer et n'est pas conservé.
+        self.rays = [()] * self.size
+        for index in iter_bits(self.playable):
+            r, c = divmod(index, cols)
+            rays = []
+            for dr, dc in self.directions:
+                ray = []
+                i, j = r + dr, c + dc
+                while 0 <= i < rows and 0 <= j < cols and self.playable >> (i * cols + j) & 1:
+                    ray.append(1 << (i * cols + j))
+                    i, j = i + dr, j + dc
+                if len(ray) >= 2:
+                    rays.append(tuple(ray))
+            self.rays[index] = tuple(rays)
+
+    def bit(self, r, c):
+        return 1 << (r * self.cols + c)
+
+    def coords(self, index):
+        return divmod(index, self.cols)
+
+
+def allow_diagonal(config):
+    """Captures en diagonale autorisées par le variant (`allowDiagonal`, vrai par défaut)"""
+    return (config or {}).get("allowDiagonal", True) is not False
+
+
+def get_geometry(rows, cols, playable=None, allow_diagonal=True):
+    """
+    Topologie compilée (mise en cache) d'un plateau.
+
+    Args:
+        playable (int, optionnel): cases jouables ; par défaut toutes
+        allow_diagonal (bool): captures en diagonale autorisées (`allowDiagonal` du variant)
+    """
+    if playable == (1 << (rows * cols)) - 1:
+        playable = None
+    return _compile_geometry(rows, cols, playable, bool(allow_diagonal))
+
+
+@lru_cache(maxsize=64)
+def _compile_geometry(rows, cols, playable, allow_diagonal):
+    return Geometry(rows, cols, playable, allow_diagonal)
+
+
+def iter_bits(bb):
+    """Itère sur les index des bits à 1, du plus faible au plus fort"""
+    while bb:
+        low = bb & -bb
+        yield low.bit_length() - 1
+        bb ^= low
+
+
+def from_board(board, player, allow_diagonal=True):
+    """
+    Convertit un plateau liste de listes en bitboards.
+    Les cases "wall" sont exclues de la topologie du plateau.
+
+    Returns:
+        tuple: (geometry, own, opp, empty) du point de vue de `player`
+    """
+    opponent = "white" if player == "black" else "black"
+    rows = len(board)
+    cols = len(board[0]) if rows > 0 else 0
+
+    own = opp = empty = 0
+    bit = 1
+    for row in board:
+        for cell in row:
+            if cell is None:
+                empty |= bit
+            elif cell == player:
+                own |= bit
+            elif cell == opponent:
+                opp |= bit
+            bit <<= 1
+    return get_geometry(rows, cols, own | opp | empty, allow_diagonal), own, opp, empty
+
+
+def valid_moves_mask(geom, own, opp, empty):
+    """Toutes les cases vides qui capturent au moins un pion adverse"""
+    moves = 0
+    for amount, mask in geom.shifts:
+        if amount > 0:
+            x = (own << amount) & mask & opp
+            while x:
+                x = (x << amount) & mask
+                moves |= x & empty
+                x &= opp
+        else:
+            amount = -amount
+            x = (own >> amount) & mask & opp
+            while x:
+                x = (x >> amount) & mask
+                moves |= x & empty
+                x &= opp
+    return moves
+
+
+def flips_mask(geom, own, opp, move):
+    """Pions adverses retournés en jouant le bit `move` (parcours des rayons précalculés)"""
+    flips = 0
+    for ray in geom.rays[move.bit_length() - 1]:
+        line = 0
+        for bit in ray:
+            if bit & opp:
+                line |= bit
+                continue
+            if bit & own:
+                flips |= line
+            break
+    return flips
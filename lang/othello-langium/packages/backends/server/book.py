@@ -0,0 +1,150 @@
+"""
+Bibliothèque d'ouvertures du mode Minimax.
+
+Le fichier est construit hors ligne à partir des positions `initial` de chaque
+variant livré (examples/variant*/), puis chargé paresseusement au premier coup :
+
+    python book.py build [--plies 5] [--depth 6] [--out data/opening_book.json]
+
+Chaque entrée associe une position (forme du plateau, objectif, camp au trait,
+pions) au meilleur coup trouvé à chaque profondeur de 1 à `--depth` : une requête
+de profondeur d reçoit le coup calculé à la profondeur d (ou à la plus grande
+disponible), jamais un coup plus fort que le niveau demandé.
+"""
+import argparse
+import json
+import os
+import threading
+import time
+
+from bitboard import allow_diagonal, from_board, iter_bits
+from search import Searcher, Position, BLACK, WHITE
+from evaluation import make_evaluator, DEFAULT_EVALUATOR
+
+BOOK_PATH = os.path.join(os.path.dirname(__file__), "data", "opening_book.json")
+
+_book = None
+_book_lock = threading.Lock()
+
+
+def position_key(geom, black, white, empty, side, config):
+    """Clé d'une position dans la bibliothèque (indépendante des clés de Zobrist)"""
+    playable = black | white | empty
+    parts = [
+        f"{geom.rows}x{geom.cols}",
+        config.get("evaluator") or DEFAULT_EVALUATOR,
+        config.get("scoreGoal") or "max",
+        f"{playable:x}", f"{black:x}", f"{white:x}",
+        "b" if side == BLACK else "w",
+    ]
+    # Sans diagonales les coups légaux diffèrent (suffixe absent pour garder les clés existantes)
+    if not allow_diagonal(config):
+        parts.append("nodiag")
+    return "/".join(parts)
+
+
+def load_book(path=BOOK_PATH):
+    """
+    Charge la bibliothèque (une seule fois, au premier appel).
+
+    Returns:
+        dict: {clé: [[r, c, score, profondeur], ...]} par profondeur croissante
+            (vide si le fichier n'existe pas)
+    """
+    global _book
+    if _book is None:
+        with _book_lock:
+            if _book is None:
+                try:
+                    with open(path, encoding="utf-8") as f:
+                        data = json.load(f)
+                    _book = data["entries"]
+                    if data.get("version", 1) < 2:
+                        # Format 1 : un seul coup par position, à la profondeur du livre
+                        _book = {key: [entry] for key, entry in _book.items()}
+                    print(f"Opening book loaded: {len(_book)} positions")
+                except FileNotFoundError:
+                    _book = {}
+    return _book
+
+
+def probe_book(geom, own, opp, empty, side, config, depth):
+    """
+    Returns:
+        list: [r, c, score, profondeur] du coup calculé à la profondeur `depth` (ou à la plus
+            grande profondeur du livre en dessous), None si la position n'y est pas
+    """
+    black, white = (own, opp) if side == BLACK else (opp, own)
+    entries = load_book().get(position_key(geom, black, white, empty, side, config))
+    if not entries:
+        return None
+    best = None
+    for entry in entries:
+        if entry[3] > depth:
+            break
+        best = entry
+    return best
+
+
+def build_book(variants, plies, depth, log=print):
+    """
+    Explore toutes les positions atteignables en `plies` demi-coups depuis la position
+    initiale de chaque variant, et calcule le meilleur coup de chacune à chaque
+    profondeur de 1 à `depth`.
+    """
+    from variants import initial_board
+
+    entries = {}
+    for name, config in variants.items():
+        board = initial_board(config)
+        geom, black, white, empty = from_board(board, "black", allow_diagonal(config))
+        searcher = Searcher(geom, make_evaluator(geom, config))
+        frontier = [Position(geom, black, white, empty, BLACK)]
+        start = time.time()
+        for ply in range(plies):
+            next_frontier = []
+            for pos in frontier:
+                key = position_key(geom, pos.discs[BLACK], pos.discs[WHITE], pos.empty, pos.side, config)
+                moves = pos.valid_moves()
+                if key in entries or not moves:
+                    continue
+                lines = []
+                for d in range(1, depth + 1):
+                    result = searcher.search(pos.own(), pos.opp(), pos.empty, d, pos.side)
+                    # Profondeur plafonnée par les cases vides : les suivantes donneraient le même coup
+                    if lines and result.depth == lines[-1][3]:
+                        break
+                    lines.append([*result.move, result.score, result.depth])
+                entries[key] = lines
+                for i in iter_bits(moves):
+                    child = Position(geom, *pos.discs, pos.empty, pos.side)
+                    child.make_move(i)
+                    next_frontier.append(child)
+            frontier = next_frontier
+            log(f"{name}: ply {ply + 1}/{plies}, {len(entries)} positions ({time.time() - start:.1f}s)")
+    return entries
+
+
+def main():
+    from variants import load_variants, EXAMPLES_DIR
+
+    parser = argparse.ArgumentParser(description="Build the Minimax opening book")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="search the opening positions of every shipped variant")
+    build.add_argument("--plies", type=int, default=5, help="number of half-moves covered")
+    build.add_argument("--depth", type=int, default=6, help="deepest search of each book position")
+    build.add_argument("--examples", default=EXAMPLES_DIR, help="directory holding variant*/variant*.othello")
+    build.add_argument("--out", default=BOOK_PATH)
+    args = parser.parse_args()
+
+    variants = load_variants(args.examples)
+    entries = build_book(variants, args.plies, args.depth)
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump({"version": 2, "plies": args.plies, "depth": args.depth, "entries": entries},
+                  f, separators=(",", ":"))
+    print(f"Opening book written: {args.out} ({len(entries)} positions)")
+
+
+if __name__ == "__main__":
+    main()
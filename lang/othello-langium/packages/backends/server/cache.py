@@ -0,0 +1,113 @@
+"""
+Cache des coups Minimax partagé entre les requêtes /move.
+
+Les parties IA vs IA et les ouvertures communes redemandent souvent exactement
+la même recherche : le résultat est gardé en mémoire, indexé par
+(configuration du variant, position, camp au trait, profondeur, budget de temps).
+Éviction LRU, bornée en mémoire, avec une durée de vie maximale par entrée.
+"""
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from bitboard import allow_diagonal
+from endgame import ENDGAME_EMPTIES
+from evaluation import DEFAULT_EVALUATOR
+
+DEFAULT_MAX_BYTES = int(float(os.getenv("OTHELLO_MOVE_CACHE_MB", "64")) * 1024 * 1024)
+DEFAULT_MAX_AGE = float(os.getenv("OTHELLO_MOVE_CACHE_TTL", "3600"))
+
+# Taille approximative d'une entrée hors entiers du plateau (tuples, résultat, horodatage)
+ENTRY_OVERHEAD = 400
+
+
+class MoveCache:
+    """Cache LRU thread-safe de résultats de recherche"""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, max_age=DEFAULT_MAX_AGE):
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(geom, black, white, empty, side, depth, time_ms, config):
+        """
+        Clé d'une recherche ; les cases jouables distinguent les formes de plateau.
+        Toutes les options qui changent le résultat y figurent, valeurs par défaut
+        appliquées (une option absente et sa valeur par défaut partagent l'entrée).
+        """
+        return (geom.rows, geom.cols, black | white | empty, black, white, side, depth, time_ms,
+                config.get("evaluator") or DEFAULT_EVALUATOR, config.get("boardType") or "square",
+                config.get("scoreGoal") or "max", allow_diagonal(config),
+                bool(config.get("useBook", True)), config.get("endgameEmpties", ENDGAME_EMPTIES))
+
+    @staticmethod
+    def _size(key):
+        return ENTRY_OVERHEAD + sum(sys.getsizeof(part) for part in key)
+
+    def get(self, key):
+        """
+        Returns:
+            tuple: (coup, score, profondeur, source) ou None
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or now - entry[1] > self.max_age:
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        size = self._size(key)
+        now = time.monotonic()
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, now, size)
+            self.bytes += size
+            # Les entrées expirées puis les moins récemment utilisées sortent en premier
+            while self._entries:
+                oldest_key, (_, stored_at, _) = next(iter(self._entries.items()))
+                if self.bytes <= self.max_bytes and now - stored_at <= self.max_age:
+                    break
+                self._remove(oldest_key)
+                self.evictions += 1
+
+    def _remove(self, key):
+        _, _, size = self._entries.pop(key)
+        self.bytes -= size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "maxBytes": self.max_bytes,
+                "maxAgeSeconds": self.max_age,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hitRate": round(self.hits / lookups, 4) if lookups else None
+            }
+
+
+# Instance partagée par toutes les requêtes du serveur
+move_cache = MoveCache()
@@ -0,0 +1,130 @@
+"""
+Résolution exacte des fins de partie.
+
+Quand il reste peu de cases vides, l'arbre complet jusqu'à la fin de la partie
+est exploré : le score renvoyé est la différence de pions finale exacte
+(du point de vue du camp au trait, inversée si scoreGoal = "min").
+"""
+import time
+
+from bitboard import iter_bits
+from search import Searcher, Position, SearchResult, SearchTimeout, INF, EXACT, LOWER, UPPER, TIME_CHECK_MASK
+
+# Nombre de cases vides à partir duquel le Minimax passe en résolution exacte
+ENDGAME_EMPTIES = 10
+
+# Au-delà de ce nombre de cases vides, les coups sont triés par mobilité adverse
+# croissante ("fastest first") ; en dessous, le tri coûte plus qu'il ne rapporte
+FASTEST_FIRST_EMPTIES = 5
+
+# Profondeur enregistrée dans la table de transposition : un score exact vaut pour toute profondeur
+SOLVED_DEPTH = 1 << 10
+
+
+class EndgameSolver(Searcher):
+    """Recherche alpha-beta jusqu'à la fin de la partie, sans évaluation heuristique"""
+
+    def __init__(self, geom, score_goal="max", tt_size_log2=16):
+        super().__init__(geom, tt_size_log2=tt_size_log2)
+        self.goal_sign = -1 if score_goal == "min" else 1
+
+    def _ordered(self, pos, moves, tt_move):
+        order = list(iter_bits(moves))
+        if pos.empty.bit_count() > FASTEST_FIRST_EMPTIES and len(order) > 1:
+            mobility = {}
+            for i in order:
+                pos.make_move(i)
+                mobility[i] = pos.valid_moves().bit_count()
+                pos.unmake_move()
+            order.sort(key=mobility.__getitem__)
+        if tt_move is not None and (moves >> tt_move) & 1:
+            order.remove(tt_move)
+            order.insert(0, tt_move)
+        return order
+
+    def solve(self, pos, alpha, beta):
+        self.nodes += 1
+        if self.deadline is not None and not self.nodes & TIME_CHECK_MASK:
+            if time.perf_counter() > self.deadline:
+                raise SearchTimeout()
+
+        moves = pos.valid_moves()
+        if not moves:
+            if not pos.opponent_moves():
+                return self.goal_sign * pos.disc_diff()
+            pos.make_pass()
+            score = -self.solve(pos, -beta, -alpha)
+            pos.unmake_move()
+            return score
+
+        alpha_orig, beta_orig = alpha, beta
+        h = pos.hash
+        entry = self.tt.probe(h)
+        tt_move = None
+        if entry is not None:
+            tt_move = entry[4]
+            value, flag = entry[2], entry[3]
+            if flag == EXACT:
+                return value
+            if flag == LOWER and value > alpha:
+                alpha = value
+            elif flag == UPPER and value < beta:
+                beta = value
+            if alpha >= beta:
+                return value
+
+        best, best_move = -INF, None
+        for i in self._ordered(pos, moves, tt_move):
+            pos.make_move(i)
+            try:
+                score = -self.solve(pos, -beta, -alpha)
+            finally:
+                pos.unmake_move()
+            if score > best:
+                best, best_move = score, i
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                break
+
+        if best <= alpha_orig:
+            flag = UPPER
+        elif best >= beta_orig:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.tt.store(h, SOLVED_DEPTH, best, flag, best_move)
+        return best
+
+    def search(self, own, opp, empty, depth, side, time_ms=None):
+        """
+        Résout la position (le paramètre `depth` est ignoré).
+
+        Raises:
+            SearchTimeout: si `time_ms` est fourni et que la résolution ne termine pas à temps
+
+        Returns:
+            SearchResult: score = différence de pions finale avec un jeu parfait des deux camps
+        """
+        start = time.perf_counter()
+        self.nodes = 0
+        self.deadline = start + time_ms / 1000 if time_ms is not None else None
+        self.tt.new_search()
+        pos = Position.from_sides(self.geom, own, opp, empty, side)
+        try:
+            moves = pos.valid_moves()
+            if not moves:
+                return SearchResult(None, self.solve(pos, -INF, INF), 0, self.nodes, start, "endgame")
+
+            alpha, best = -INF, None
+            for i in self._ordered(pos, moves, None):
+                pos.make_move(i)
+                try:
+                    score = -self.solve(pos, -INF, -alpha)
+                finally:
+                    pos.unmake_move()
+                if score > alpha:
+                    alpha, best = score, i
+        finally:
+            self.deadline = None
+        return SearchResult(self.geom.coords(best), alpha, empty.bit_count(), self.nodes, start, "endgame")
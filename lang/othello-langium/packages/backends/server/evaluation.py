@@ -0,0 +1,184 @@
+"""
+Fonctions d'évaluation du Minimax.
+
+Chaque évaluateur expose `evaluate(pos)` (position non terminale) et
+`final_score(pos)` (plus aucun coup possible), toujours du point de vue du camp
+qui a le trait. Le choix se fait par nom via EVALUATORS / make_evaluator,
+à partir de la configuration du variant (boardType, scoreGoal).
+"""
+from collections import OrderedDict
+from functools import lru_cache
+
+from bitboard import valid_moves_mask
+
+# Une victoire vaut toujours plus que n'importe quelle évaluation heuristique
+WIN_SCORE = 1 << 20
+
+# Poids des cases selon leur rôle sur le plateau
+CORNER_WEIGHT = 100
+X_SQUARE_WEIGHT = -50
+C_SQUARE_WEIGHT = -20
+EDGE_WEIGHT = 10
+INTERIOR_WEIGHT = 1
+
+MOBILITY_WEIGHT = 5
+FRONTIER_WEIGHT = 3
+# En fin de partie (moins de 20% de cases vides), chaque pion compte
+ENDGAME_EMPTY_RATIO = 0.2
+ENDGAME_DISC_WEIGHT = 4
+
+EVAL_CACHE_SIZE = 1 << 16
+
+AXES = [((0, -1), (0, 1)), ((-1, 0), (1, 0)), ((-1, -1), (1, 1)), ((-1, 1), (1, -1))]
+
+
+def playable_cells(rows, cols, board_type):
+    """Cases jouables, avec la même règle que le générateur HTML pour boardType = "circle" """
+    cells = set()
+    radius = min(rows, cols) / 2
+    for r in range(rows):
+        for c in range(cols):
+            dx = (c + 1) - (cols + 1) / 2
+            dy = (r + 1) - (rows + 1) / 2
+            if board_type != "circle" or (dx * dx + dy * dy) ** 0.5 <= radius - 0.3:
+                cells.add((r, c))
+    return cells
+
+
+@lru_cache(maxsize=None)
+def weight_masks(rows, cols, board_type):
+    """
+    Table de poids d'une forme de plateau, regroupée par valeur de poids.
+
+    Un "coin" est une case dont aucun axe n'est ouvert des deux côtés : elle ne peut
+    jamais être retournée. La définition vaut donc aussi pour les plateaux circulaires.
+
+    Returns:
+        tuple: ((poids, bitboard des cases ayant ce poids), ...)
+    """
+    cells = playable_cells(rows, cols, board_type)
+
+    def open_axes(r, c):
+        return sum(1 for (dr1, dc1), (dr2, dc2) in AXES
+                   if (r + dr1, c + dc1) in cells and (r + dr2, c + dc2) in cells)
+
+    corners = {cell for cell in cells if open_axes(*cell) == 0}
+    weights = {}
+    for r, c in cells:
+        if (r, c) in corners:
+            weight = CORNER_WEIGHT
+        elif any((r + dr, c + dc) in corners for dr, dc in ((-1, -1), (-1, 1), (1, -1), (1, 1))):
+            weight = X_SQUARE_WEIGHT
+        elif any((r + dr, c + dc) in corners for dr, dc in ((-1, 0), (1, 0), (0, -1), (0, 1))):
+            weight = C_SQUARE_WEIGHT
+        elif open_axes(r, c) < 4:
+            weight = EDGE_WEIGHT
+        else:
+            weight = INTERIOR_WEIGHT
+        weights[weight] = weights.get(weight, 0) | (1 << (r * cols + c))
+    return tuple(sorted(weights.items()))
+
+
+class DiscEvaluator:
+    """Différence de pions (l'évaluation historique du projet)"""
+
+    def __init__(self, geom, board_type="square", score_goal="max"):
+        self.geom = geom
+        # scoreGoal = "min" : le gagnant est celui qui a le moins de pions
+        self.goal_sign = -1 if score_goal == "min" else 1
+
+    def evaluate(self, pos):
+        return self.goal_sign * pos.disc_diff()
+
+    def final_score(self, pos):
+        diff = self.goal_sign * pos.disc_diff()
+        if diff > 0:
+            return WIN_SCORE + diff
+        if diff < 0:
+            return -WIN_SCORE + diff
+        return 0
+
+
+class PositionalEvaluator(DiscEvaluator):
+    """
+    Table de poids par case + mobilité + pions frontière (+ pions en fin de partie).
+    Les évaluations sont mises en cache par hash de position (LRU).
+
+    Mobilité et pions frontière sont recalculés à chaque feuille plutôt que tenus à jour
+    par Position.make_move : une mise à jour incrémentale coûterait à chaque nœud, feuilles
+    ou non, et les coups légaux ne se déduisent pas de ceux du parent. La mobilité fait
+    l'essentiel du coût d'une évaluation (bench.py --only eval).
+    """
+
+    def __init__(self, geom, board_type="square", score_goal="max", cache_size=EVAL_CACHE_SIZE):
+        super().__init__(geom, board_type, score_goal)
+        self.weights = weight_masks(geom.rows, geom.cols, board_type)
+        self.endgame_empties = int(geom.size * ENDGAME_EMPTY_RATIO)
+        self.cache = OrderedDict()
+        self.cache_size = cache_size
+
+    def _adjacent_to(self, bb):
+        """Cases voisines (directions de la topologie du plateau) d'au moins une case de `bb`"""
+        result = 0
+        for amount, mask in self.geom.shifts:
+            result |= ((bb << amount) if amount > 0 else (bb >> -amount)) & mask
+        return result
+
+    def evaluate(self, pos):
+        cache = self.cache
+        h = pos.hash
+        score = cache.get(h)
+        if score is not None:
+            cache.move_to_end(h)
+            return score
+
+        side = pos.side
+        own, opp, empty = pos.discs[side], pos.discs[1 - side], pos.empty
+
+        # Poids des cases et pions : inversés si l'objectif est d'avoir le moins de pions
+        material = 0
+        for weight, mask in self.weights:
+            material += weight * ((own & mask).bit_count() - (opp & mask).bit_count())
+        if empty.bit_count() <= self.endgame_empties:
+            material += ENDGAME_DISC_WEIGHT * pos.disc_diff()
+        score = self.goal_sign * material
+
+        geom = self.geom
+        own_moves = valid_moves_mask(geom, own, opp, empty).bit_count()
+        opp_moves = valid_moves_mask(geom, opp, own, empty).bit_count()
+        if not own_moves and not opp_moves:
+            # Feuille de l'arbre qui est en fait une fin de partie
+            score = self.final_score(pos)
+        else:
+            score += MOBILITY_WEIGHT * (own_moves - opp_moves)
+            frontier = self._adjacent_to(empty)
+            score -= FRONTIER_WEIGHT * ((own & frontier).bit_count() - (opp & frontier).bit_count())
+
+        cache[h] = score
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)
+        return score
+
+
+EVALUATORS = {
+    "disc": DiscEvaluator,
+    "positional": PositionalEvaluator,
+}
+
+DEFAULT_EVALUATOR = "positional"
+
+
+def make_evaluator(geom, config=None):
+    """
+    Crée l'évaluateur décrit par la configuration du variant.
+
+    Args:
+        config (dict, optionnel): clés "evaluator", "boardType", "scoreGoal"
+    """
+    config = config or {}
+    name = config.get("evaluator") or DEFAULT_EVALUATOR
+    if name not in EVALUATORS:
+        raise ValueError(f"Unknown evaluator '{name}' (available: {', '.join(EVALUATORS)})")
+    return EVALUATORS[name](geom,
+                            board_type=config.get("boardType") or "square",
+                            score_goal=config.get("scoreGoal") or "max")
@@ -0,0 +1,260 @@
+"""
+Parties gérées côté serveur (API /games).
+
+Le client crée une partie une seule fois à partir de la configuration du variant,
+puis n'envoie plus que ses coups. Le plateau est conservé sous forme de bitboards
+et chaque partie garde son moteur de recherche : la table de transposition et
+l'historique des coups restent "chauds" d'un demi-coup à l'autre.
+"""
+import os
+import re
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+from bitboard import allow_diagonal, from_board, valid_moves_mask, flips_mask, iter_bits
+from search import Searcher, BLACK, WHITE
+from evaluation import make_evaluator
+from variants import EXAMPLES_DIR, load_variant, initial_board
+from ai import get_search_config, resolve_depth, search_position
+from ponder import ponderer
+
+# Nombre maximal de parties conservées, et inactivité (s) après laquelle une partie est oubliée
+MAX_GAMES = int(os.getenv("OTHELLO_MAX_GAMES", "64"))
+GAME_IDLE_TIMEOUT = float(os.getenv("OTHELLO_GAME_IDLE_S", "1800"))
+
+# Table de transposition plus petite que celle d'une recherche isolée : elle est
+# conservée pendant toute la partie, pour chacune des parties en cours
+GAME_TT_SIZE_LOG2 = 16
+
+COLORS = ("black", "white")
+
+_VARIANT_RE = re.compile(r"^variant\d+$")
+
+
+def load_named_variant(name, examples_dir=EXAMPLES_DIR):
+    """Configuration d'un variant livré (examples/<name>/<name>.othello)"""
+    if not _VARIANT_RE.match(name or ""):
+        raise ValueError(f"Invalid variant name '{name}'")
+    path = os.path.join(examples_dir, name, f"{name}.othello")
+    if not os.path.exists(path):
+        raise ValueError(f"Unknown variant '{name}'")
+    return load_variant(path)
+
+
+class Game:
+    """Position courante d'une partie et moteur de recherche associé"""
+
+    def __init__(self, game_id, board, player="black", config=None):
+        if player not in COLORS:
+            raise ValueError(f"Invalid player '{player}'")
+        self.game_id = game_id
+        self.config = get_search_config(board, config)
+        self.geom, black, white, self.empty = from_board(board, "black", allow_diagonal(self.config))
+        self.discs = [black, white]
+        self.side = BLACK if player == "black" else WHITE
+        self.moves_played = 0
+        self.searcher = Searcher(self.geom, make_evaluator(self.geom, self.config), GAME_TT_SIZE_LOG2)
+        self.lock = threading.Lock()
+        self.last_active = time.monotonic()
+
+    @property
+    def player(self):
+        return COLORS[self.side]
+
+    def valid_moves(self, side=None):
+        side = self.side if side is None else side
+        return valid_moves_mask(self.geom, self.discs[side], self.discs[1 - side], self.empty)
+
+    def is_over(self):
+        return not self.valid_moves(BLACK) and not self.valid_moves(WHITE)
+
+    def play(self, move):
+        """
+        Joue `move` ([r, c]) pour le camp au trait, ou passe si `move` est None.
+
+        Raises:
+            ValueError: coup illégal, ou passe alors qu'un coup est possible
+
+        Returns:
+            list: cases retournées [[r, c], ...]
+        """
+        moves = self.valid_moves()
+        side = self.side
+        if move is None:
+            if moves:
+                raise ValueError(f"{self.player} cannot pass: a legal move exists")
+            self.side = 1 - side
+            return []
+
+        r, c = move
+        if not (0 <= r < self.geom.rows and 0 <= c < self.geom.cols) or not moves & self.geom.bit(r, c):
+            raise ValueError(f"Illegal move {[r, c]} for {self.player}")
+        bit = self.geom.bit(r, c)
+        flips = flips_mask(self.geom, self.discs[side], self.discs[1 - side], bit)
+        self.discs[side] |= flips | bit
+        self.discs[1 - side] ^= flips
+        self.empty ^= bit
+        self.side = 1 - side
+        self.moves_played += 1
+        return [list(self.geom.coords(i)) for i in iter_bits(flips)]
+
+    def snapshot(self):
+        """État de la position, pour annuler les coups joués par une requête refusée (voir restore)"""
+        return list(self.discs), self.empty, self.side, self.moves_played
+
+    def restore(self, snapshot):
+        discs, self.empty, self.side, self.moves_played = snapshot
+        self.discs = list(discs)
+
+    def search(self, depth=None, time_ms=None, workers=None, stats=False, deadline=None):
+        """Recherche Minimax depuis la position courante, avec le moteur de la partie"""
+        # Le pondering en cours utilise le même moteur : l'arrêter d'abord
+        ponderer.cancel(self.game_id)
+        depth = resolve_depth(self.geom.size, depth, time_ms)
+        side = self.side
+        return search_position(self.geom, self.discs[side], self.discs[1 - side], self.empty, side,
+                               depth, time_ms, workers, self.config, searcher=self.searcher, stats=stats,
+                               deadline=deadline)
+
+    def ponder(self, depth=None, time_ms=None):
+        """
+        Pondère la position courante (adversaire de l'IA au trait) avec le moteur de la
+        partie, pour la prochaine recherche de paramètres `depth` / `time_ms`.
+        """
+        depth = resolve_depth(self.geom.size, depth, time_ms)
+        side = self.side
+        return ponderer.start(self.game_id, self.geom, self.discs[side], self.discs[1 - side], self.empty,
+                              side, depth, time_ms, self.config, searcher=self.searcher)
+
+    def board(self):
+        """Plateau au format /move ("black" / "white" / None / "wall")"""
+        geom = self.geom
+        black, white = self.discs
+        board = []
+        for r in range(geom.rows):
+            row = []
+            for c in range(geom.cols):
+                bit = geom.bit(r, c)
+                if black & bit:
+                    row.append("black")
+                elif white & bit:
+                    row.append("white")
+                elif self.empty & bit:
+                    row.append(None)
+                else:
+                    row.append("wall")
+            board.append(row)
+        return board
+
+    def state(self):
+        """Résumé compact renvoyé après chaque coup"""
+        black, white = self.discs
+        return {
+            "gameId": self.game_id,
+            "toMove": self.player,
+            "scores": {"black": black.bit_count(), "white": white.bit_count()},
+            "validMoves": [list(self.geom.coords(i)) for i in iter_bits(self.valid_moves())],
+            "movesPlayed": self.moves_played,
+            "gameOver": self.is_over()
+        }
+
+
+class GameStore:
+    """
+    Parties en cours, indexées par identifiant (LRU bornée, avec expiration des
+    parties inactives). Même principe que le registre de sessions des logs LLM.
+    """
+
+    def __init__(self, max_games=MAX_GAMES, idle_timeout=GAME_IDLE_TIMEOUT):
+        self.max_games = max_games
+        self.idle_timeout = idle_timeout
+        self._games = OrderedDict()
+        self._lock = threading.Lock()
+        self.created = 0
+        self.expired = 0
+        self.evicted = 0
+
+    def create(self, board, player="black", config=None):
+        game = Game(secrets.token_hex(8), board, player, config)
+        with self._lock:
+            self._games[game.game_id] = game
+            self.created += 1
+            stale = self._collect_locked()
+        self._cancel_pondering(stale)
+        return game
+
+    def get(self, game_id):
+        """
+        Returns:
+            Game: la partie (marquée active) ou None si elle n'existe pas / a expiré
+        """
+        with self._lock:
+            stale = self._collect_locked()
+            game = self._games.get(game_id)
+            if game is not None:
+                game.last_active = time.monotonic()
+                self._games.move_to_end(game_id)
+        self._cancel_pondering(stale)
+        return game
+
+    def remove(self, game_id):
+        with self._lock:
+            return self._games.pop(game_id, None)
+
+    def _collect_locked(self):
+        """Retire les parties inactives ou en surnombre (leur pondering est arrêté hors du verrou)"""
+        stale = []
+        now = time.monotonic()
+        while self._games:
+            oldest = next(iter(self._games.values()))
+            if now - oldest.last_active > self.idle_timeout:
+                self.expired += 1
+            elif len(self._games) > self.max_games:
+                self.evicted += 1
+            else:
+                break
+            del self._games[oldest.game_id]
+            stale.append(oldest.game_id)
+        return stale
+
+    @staticmethod
+    def _cancel_pondering(game_ids):
+        # Comme DELETE /games/<id> : une partie retirée ne garde pas de pondering en file
+        for game_id in game_ids:
+            ponderer.cancel(game_id)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "active": len(self._games),
+                "maxGames": self.max_games,
+                "idleTimeoutSeconds": self.idle_timeout,
+                "created": self.created,
+                "expired": self.expired,
+                "evicted": self.evicted
+            }
+
+
+def create_game(data, store):
+    """
+    Crée une partie à partir du corps d'une requête POST /games.
+
+    Args:
+        data (dict): "variant" (ex. "variant3", lu dans examples/) et/ou "config" ;
+            "board" (optionnel, sinon la position initiale du variant) ; "player" (camp au trait)
+    """
+    config = dict(data.get("config") or {})
+    if data.get("variant"):
+        config = {**load_named_variant(data["variant"]), **config}
+    board = data.get("board")
+    if board is None:
+        if not config.get("rows") or not config.get("cols"):
+            raise ValueError("A board, a variant or a config with rows and cols is required")
+        board = initial_board(config)
+    return store.create(board, data.get("player", "black"), config)
+
+
+# Parties partagées par toutes les requêtes du serveur
+game_store = GameStore()
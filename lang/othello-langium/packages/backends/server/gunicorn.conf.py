@@ -0,0 +1,38 @@
+"""
+Configuration gunicorn du serveur (voir wsgi.py) :
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Les recherches Minimax sont confiées au pool borné de chaque processus : les threads
+HTTP restent disponibles pour les pages, les fichiers statiques et les réponses 503.
+"""
+import os
+
+bind = f"{os.getenv('OTHELLO_HOST', '127.0.0.1')}:{os.getenv('OTHELLO_PORT', '5000')}"
+
+# Un seul processus par défaut : les parties /games, les sessions de log LLM, le pondering
+# et le cache de coups vivent en mémoire dans chaque processus. Avec plusieurs processus,
+# toutes les requêtes d'une partie doivent arriver au même (routage collant en amont,
+# par session_id ou id de partie) ; le CPU des recherches vient sinon du pool de
+# processus de parallel.py (OTHELLO_SEARCH_WORKERS)
+workers = int(os.getenv("OTHELLO_HTTP_WORKERS", "1"))
+worker_class = "gthread"
+threads = int(os.getenv("OTHELLO_HTTP_THREADS", "8"))
+
+# Arrêt propre : le délai de gunicorn couvre celui accordé aux recherches en cours
+graceful_timeout = float(os.getenv("OTHELLO_SHUTDOWN_TIMEOUT_S", "30")) + 5
+timeout = 120
+keepalive = 5
+
+
+def post_worker_init(worker):
+    from wsgi import init_worker
+
+    init_worker()
+
+
+def worker_exit(server, worker):
+    from wsgi import shutdown_worker
+
+    if not shutdown_worker():
+        worker.log.warning("Some searches were still running at shutdown")
@@ -0,0 +1,187 @@
+"""
+File d'attente bornée des recherches Minimax du serveur.
+
+Les recherches ne tournent plus dans les threads de requête : elles sont confiées à
+un petit pool de threads précédé d'une file de taille fixe. Quand pool et file sont
+pleins, la requête est refusée immédiatement (ServerBusy, HTTP 503 avec Retry-After)
+au lieu de s'empiler ; les routes statiques et les templates restent servis pendant
+ce temps. Chaque recherche reçoit l'échéance de sa requête et s'arrête avant elle.
+"""
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+# Recherches exécutées en même temps par processus. Avec le GIL, plus de threads
+# n'apportent pas de CPU : pour utiliser plusieurs cœurs, multiplier les processus
+# du serveur d'application (voir wsgi.py)
+JOB_WORKERS = int(os.getenv("OTHELLO_JOB_WORKERS", "2"))
+
+# Recherches en attente au-delà desquelles les nouvelles requêtes reçoivent un 503
+JOB_QUEUE = int(os.getenv("OTHELLO_JOB_QUEUE", "16"))
+
+# Échéance par défaut d'une requête de coup (ms), recherche et attente comprises
+REQUEST_DEADLINE_MS = float(os.getenv("OTHELLO_REQUEST_DEADLINE_MS", "30000"))
+
+# Marge laissée à une recherche arrêtée par son échéance pour terminer sa profondeur 1
+DEADLINE_GRACE = 1.0
+
+
+class ServerBusy(Exception):
+    """Pool et file pleins (ou arrêt en cours) : la requête doit être réessayée plus tard"""
+
+    def __init__(self, retry_after):
+        super().__init__("Server busy, retry later")
+        self.retry_after = retry_after
+
+
+class DeadlineExceeded(Exception):
+    """La recherche n'a pas pu être menée à bien avant l'échéance de la requête"""
+
+    def __init__(self, retry_after):
+        super().__init__("Request deadline exceeded")
+        self.retry_after = retry_after
+
+
+class SearchJobs:
+    """Pool de threads borné, avec file d'attente de taille fixe et échéances"""
+
+    def __init__(self, workers=JOB_WORKERS, queue_size=JOB_QUEUE):
+        self.workers = max(1, workers)
+        self.queue_size = max(0, queue_size)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="search")
+        self._slots = threading.BoundedSemaphore(self.workers + self.queue_size)
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self.accepting = True
+        self.pending = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        # Durée moyenne (glissante) d'une recherche, pour estimer Retry-After
+        self.avg_seconds = 0.1
+
+    def submit(self, fn, deadline):
+        """
+        Programme `fn(deadline)` dans le pool sans attendre son résultat (réponses en flux).
+
+        Args:
+            fn (callable): recherche ; reçoit l'échéance (time.perf_counter()) à respecter
+            deadline (float): échéance de la requête (time.perf_counter())
+
+        Raises:
+            ServerBusy: pool et file pleins, ou serveur en cours d'arrêt
+
+        Returns:
+            Future: DeadlineExceeded si l'échéance est atteinte avant son lancement
+        """
+        if not self.accepting or not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise ServerBusy(self.retry_after())
+        with self._lock:
+            self.pending += 1
+        try:
+            future = self._executor.submit(self._call, fn, deadline)
+        except RuntimeError:
+            # Pool arrêté entre le test de `accepting` et la soumission
+            self._release()
+            raise ServerBusy(self.retry_after())
+        # Libère la place à la fin de la recherche, ou à son annulation si elle attendait encore
+        future.add_done_callback(lambda _: self._release())
+        return future
+
+    def run(self, fn, deadline):
+        """
+        Exécute `fn(deadline)` dans le pool et attend son résultat.
+
+        Args:
+            fn (callable): recherche ; reçoit l'échéance (time.perf_counter()) à respecter
+            deadline (float): échéance de la requête (time.perf_counter())
+
+        Raises:
+            ServerBusy: pool et file pleins, ou serveur en cours d'arrêt
+            DeadlineExceeded: échéance atteinte avant la fin de la recherche
+        """
+        future = self.submit(fn, deadline)
+        try:
+            return future.result(timeout=max(0.0, deadline - time.perf_counter()))
+        except FutureTimeout:
+            pass
+        # Encore en file à l'échéance : annulée sans attendre. Déjà lancée : elle s'arrête
+        # d'elle-même à l'échéance, il ne lui reste qu'à terminer sa profondeur en cours
+        if not future.cancel():
+            try:
+                return future.result(timeout=DEADLINE_GRACE)
+            except FutureTimeout:
+                pass
+        with self._lock:
+            self.timed_out += 1
+        raise DeadlineExceeded(self.retry_after())
+
+    def _call(self, fn, deadline):
+        if time.perf_counter() >= deadline:
+            with self._lock:
+                self.timed_out += 1
+            raise DeadlineExceeded(self.retry_after())
+        with self._lock:
+            self.running += 1
+        start = time.perf_counter()
+        try:
+            return fn(deadline)
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.running -= 1
+                self.completed += 1
+                self.avg_seconds += (elapsed - self.avg_seconds) * 0.2
+
+    def _release(self):
+        self._slots.release()
+        with self._lock:
+            self.pending -= 1
+            if not self.pending:
+                self._idle.notify_all()
+
+    def retry_after(self):
+        """Délai conseillé (s, entier) avant de réessayer : temps pour écouler la file actuelle"""
+        with self._lock:
+            waves = self.pending / self.workers
+            return max(1, math.ceil(waves * self.avg_seconds))
+
+    def shutdown(self, timeout=30.0):
+        """
+        Arrêt propre : refuse les nouvelles recherches, laisse jusqu'à `timeout` secondes
+        aux recherches en cours ou en attente, puis annule celles qui restent.
+
+        Returns:
+            bool: True si toutes les recherches se sont terminées à temps
+        """
+        self.accepting = False
+        end = time.monotonic() + timeout
+        with self._lock:
+            while self.pending and time.monotonic() < end:
+                self._idle.wait(end - time.monotonic())
+            drained = not self.pending
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        return drained
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queueSize": self.queue_size,
+                "accepting": self.accepting,
+                "running": self.running,
+                "queued": self.pending - self.running,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "timedOut": self.timed_out,
+                "avgSeconds": round(self.avg_seconds, 4)
+            }
+
+
+# Pool partagé par toutes les requêtes du processus
+search_jobs = SearchJobs()
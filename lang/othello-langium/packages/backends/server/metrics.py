@@ -0,0 +1,129 @@
+"""
+Agrégation des statistiques de recherche pour l'endpoint /metrics (format texte Prometheus).
+
+Chaque réponse de /move ajoute ses compteurs (coups par source, nœuds, durées) ;
+les compteurs détaillés (feuilles, coupures, accès à la table de transposition)
+ne sont alimentés que par les recherches instrumentées.
+"""
+import bisect
+import threading
+
+# Bornes (secondes) de l'histogramme des durées de coup
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Compteurs détaillés tirés de SearchResult.stats : (clé, nom de métrique, aide)
+STATS_COUNTERS = (
+    ("leafEvaluations", "othello_search_leaf_evaluations_total", "Leaf positions evaluated by instrumented searches"),
+    ("betaCutoffs", "othello_search_beta_cutoffs_total", "Beta cutoffs in instrumented searches"),
+    ("ttLowerBoundStores", "othello_search_tt_lower_bound_stores_total",
+     "Lower bounds (fail-high nodes) stored in the transposition table by instrumented searches"),
+    ("ttProbes", "othello_search_tt_probes_total", "Transposition table probes in instrumented searches"),
+    ("ttHits", "othello_search_tt_hits_total", "Transposition table hits in instrumented searches"),
+)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Metrics:
+    """Compteurs et histogrammes thread-safe, rendus au format d'exposition Prometheus"""
+
+    def __init__(self, buckets=DURATION_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._help = {}
+        self._histograms = {}
+
+    def inc(self, name, value=1, help_text="", **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._help.setdefault(name, ("counter", help_text))
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, help_text="", **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._help.setdefault(name, ("histogram", help_text))
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [[0] * len(self.buckets), 0.0, 0]
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                histogram[0][index] += 1
+            histogram[1] += value
+            histogram[2] += 1
+
+    def observe_move(self, ai_type, result, elapsed, winner=None):
+        """
+        Enregistre une réponse de /move.
+
+        Args:
+            ai_type (str): "minimax" ou "llm"
+            result (SearchResult): recherche Minimax (ou None)
+            elapsed (float): durée totale de la requête en secondes
+            winner (str, optionnel): source du coup joué en mode LLM ("llm" ou "minimax")
+        """
+        self.inc("othello_moves_total", help_text="AI moves served", ai=ai_type,
+                 source=winner if winner == "llm" else (result.source if result else "none"))
+        self.observe("othello_move_duration_seconds", elapsed, help_text="Time to answer a move request",
+                     ai=ai_type)
+        if result is None:
+            return
+        self.inc("othello_search_nodes_total", result.nodes, help_text="Nodes visited by Minimax searches",
+                 source=result.source)
+        self.observe("othello_search_duration_seconds", result.elapsed, help_text="Minimax search time",
+                     source=result.source)
+        if result.stats and result.stats.get("instrumented"):
+            for key, name, help_text in STATS_COUNTERS:
+                self.inc(name, result.stats[key], help_text=help_text)
+
+    def render(self, gauges=()):
+        """
+        Args:
+            gauges: [(nom, valeur, aide[, type]), ...] ajoutés tels quels (état courant des caches,
+                parties...) ; type "gauge" par défaut, "counter" pour un total lu ailleurs
+
+        Returns:
+            str: texte au format d'exposition Prometheus 0.0.4
+        """
+        lines = []
+        with self._lock:
+            names = sorted(self._help)
+            for name in names:
+                kind, help_text = self._help[name]
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                if kind == "counter":
+                    for (metric, labels), value in sorted(self._counters.items()):
+                        if metric == name:
+                            lines.append(f"{name}{self._labels(labels)} {value}")
+                    continue
+                for (metric, labels), (counts, total, count) in sorted(self._histograms.items()):
+                    if metric != name:
+                        continue
+                    cumulative = 0
+                    for bound, n in zip(self.buckets, counts):
+                        cumulative += n
+                        lines.append(f"{name}_bucket{self._labels(labels + (('le', bound),))} {cumulative}")
+                    lines.append(f"{name}_bucket{self._labels(labels + (('le', '+Inf'),))} {count}")
+                    lines.append(f"{name}_sum{self._labels(labels)} {total}")
+                    lines.append(f"{name}_count{self._labels(labels)} {count}")
+        for name, value, help_text, *kind in gauges:
+            if value is None:
+                continue
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind[0] if kind else 'gauge'}")
+            lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _labels(labels):
+        if not labels:
+            return ""
+        return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+# Instance partagée par toutes les requêtes du serveur
+metrics = Metrics()
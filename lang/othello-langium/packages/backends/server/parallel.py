@@ -0,0 +1,169 @@
+"""
+Recherche Minimax parallèle, découpée à la racine, sur un pool de processus.
+
+Le pool est créé une seule fois au démarrage du serveur (init_search_pool).
+À chaque itération de l'approfondissement itératif :
+  1. le meilleur coup de l'itération précédente est recherché avec une fenêtre complète ;
+  2. les autres coups sont testés en parallèle avec une fenêtre nulle autour de ce score ;
+  3. les coups qui la dépassent sont re-recherchés en parallèle pour obtenir leur score exact.
+Chaque processus garde sa propre table de transposition d'une tâche à l'autre.
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from bitboard import allow_diagonal, get_geometry, valid_moves_mask, iter_bits
+from search import Searcher, Position, SearchResult, SearchTimeout, INF
+from evaluation import make_evaluator
+
+# Clés de configuration du variant qui influencent l'évaluation (et les directions de capture)
+EVAL_CONFIG_KEYS = ("evaluator", "boardType", "scoreGoal", "allowDiagonal")
+
+_pool = None
+_workers = 1
+
+# Searchers conservés dans chaque processus, indexés par (rows, cols, cases jouables, évaluation)
+_worker_searchers = {}
+MAX_WORKER_SEARCHERS = 8
+
+
+def init_search_pool(workers=None):
+    """
+    Crée le pool de processus de recherche.
+
+    Args:
+        workers (int, optionnel): nombre de processus ; par défaut la variable
+            d'environnement OTHELLO_SEARCH_WORKERS (1 = pas de pool, recherche séquentielle)
+
+    Returns:
+        int: nombre de processus effectivement utilisés
+    """
+    global _pool, _workers
+
+    if workers is None:
+        workers = int(os.getenv("OTHELLO_SEARCH_WORKERS", "1"))
+    shutdown_search_pool()
+    _workers = max(1, workers)
+    if _workers > 1:
+        _pool = ProcessPoolExecutor(max_workers=_workers)
+    return _workers
+
+
+def shutdown_search_pool():
+    global _pool, _workers
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+    _pool = None
+    _workers = 1
+
+
+def get_search_pool():
+    """Retourne (pool, nombre de processus) ; pool vaut None en mode séquentiel"""
+    return _pool, _workers
+
+
+def _get_worker_searcher(rows, cols, playable, eval_config):
+    key = (rows, cols, playable, eval_config)
+    searcher = _worker_searchers.get(key)
+    if searcher is None:
+        if len(_worker_searchers) >= MAX_WORKER_SEARCHERS:
+            _worker_searchers.clear()
+        config = dict(eval_config)
+        geom = get_geometry(rows, cols, playable, allow_diagonal(config))
+        searcher = Searcher(geom, make_evaluator(geom, config))
+        _worker_searchers[key] = searcher
+    return searcher
+
+
+def _search_move(rows, cols, own, opp, empty, eval_config, depth, side, index, alpha, beta, deadline):
+    """
+    Tâche exécutée dans un processus du pool : score d'un coup racine dans la fenêtre (alpha, beta).
+    `eval_config` est la configuration de l'évaluateur sous forme de tuple de paires (hashable).
+    `deadline` est une heure absolue (time.time()), commune à tous les processus.
+
+    Returns:
+        tuple: (score ou None si le budget de temps est épuisé, noeuds visités)
+    """
+    searcher = _get_worker_searcher(rows, cols, own | opp | empty, eval_config)
+    searcher.tt.new_search()
+    searcher.nodes = 0
+    if deadline is not None:
+        searcher.deadline = time.perf_counter() + (deadline - time.time())
+
+    pos = Position.from_sides(searcher.geom, own, opp, empty, side)
+    pos.make_move(index)
+    try:
+        score = -searcher.negamax(pos, depth - 1, -beta, -alpha, 1)
+    except SearchTimeout:
+        score = None
+    finally:
+        searcher.deadline = None
+    return score, searcher.nodes
+
+
+def search_parallel(geom, own, opp, empty, depth, side, time_ms=None, config=None):
+    """
+    Équivalent parallèle de Searcher.search : même contrat et même score,
+    mais le coup choisi peut différer en cas d'égalité de score entre plusieurs coups.
+    `config` décrit l'évaluateur (voir evaluation.make_evaluator).
+
+    Returns:
+        SearchResult
+    """
+    start = time.perf_counter()
+    moves = valid_moves_mask(geom, own, opp, empty)
+    if not moves:
+        pos = Position.from_sides(geom, own, opp, empty, side)
+        return SearchResult(None, make_evaluator(geom, config).evaluate(pos), 0, 0, start)
+
+    root_order = list(iter_bits(moves))
+    depth = max(1, min(depth, empty.bit_count() + 1))
+    score, best, reached, nodes = 0, root_order[0], 0, 0
+    eval_config = tuple(sorted((key, (config or {}).get(key)) for key in EVAL_CONFIG_KEYS))
+    base = (geom.rows, geom.cols, own, opp, empty, eval_config)
+
+    def run(tasks, deadline):
+        nonlocal nodes
+        futures = [_pool.submit(_search_move, *base, depth_, side, i, a, b, deadline)
+                   for depth_, i, a, b in tasks]
+        results = []
+        for future in futures:
+            task_score, task_nodes = future.result()
+            nodes += task_nodes
+            results.append(task_score)
+        return results
+
+    for d in range(1, depth + 1):
+        deadline = None
+        if time_ms is not None and d > 1:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            if elapsed_ms * 2 >= time_ms:
+                break
+            deadline = time.time() + (time_ms - elapsed_ms) / 1000
+
+        first, rest = root_order[0], root_order[1:]
+        (alpha,) = run([(d, first, -INF, INF)], deadline)
+        if alpha is None:
+            break
+        iter_best = first
+
+        # Fenêtre nulle : un coup n'est intéressant que s'il bat le premier
+        probes = run([(d, i, alpha, alpha + 1) for i in rest], deadline)
+        timed_out = any(s is None for s in probes)
+        candidates = [i for i, s in zip(rest, probes) if s is not None and s > alpha]
+        if candidates:
+            exact = run([(d, i, alpha, INF) for i in candidates], deadline)
+            timed_out = timed_out or any(s is None for s in exact)
+            # Parcours dans l'ordre des coups : en cas d'égalité le premier l'emporte
+            for i, s in zip(candidates, exact):
+                if s is not None and s > alpha:
+                    alpha, iter_best = s, i
+
+        score, best = alpha, iter_best
+        if timed_out:
+            break
+        reached = d
+        root_order.remove(best)
+        root_order.insert(0, best)
+
+    return SearchResult(geom.coords(best), score, reached, nodes, start)
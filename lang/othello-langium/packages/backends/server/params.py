@@ -0,0 +1,39 @@
+"""
+Validation des options numériques des requêtes de recherche (/move, /games, /analyze).
+
+Une valeur mal typée ou hors bornes lève une ValueError dont le message est renvoyé
+au client avec un code 400, au lieu d'échouer plus loin dans la recherche.
+"""
+
+
+def number_option(data, key, integer=False, minimum=None):
+    """Option numérique facultative de la requête ; ValueError si elle est mal typée ou hors bornes"""
+    value = data.get(key)
+    if value is None:
+        return None
+    kind = int if integer else (int, float)
+    if isinstance(value, bool) or not isinstance(value, kind):
+        raise ValueError(f"'{key}' must be {'an integer' if integer else 'a number'}")
+    if minimum is not None and value < minimum:
+        raise ValueError(f"'{key}' must be at least {minimum}")
+    return value
+
+
+def parse_search_options(data):
+    """
+    Options communes des requêtes de coup : `config`, `depth`, `timeMs`, `workers`,
+    `deadlineMs` (vérifié ici, plafonné ensuite par server.request_deadline) et
+    `llmDeadlineMs`.
+
+    Raises:
+        ValueError: option mal typée ou hors bornes
+
+    Returns:
+        tuple: (depth, time_ms, workers) tels que reçus (None si absents)
+    """
+    if data.get("config") is not None and not isinstance(data["config"], dict):
+        raise ValueError("'config' must be an object")
+    number_option(data, "deadlineMs", minimum=0)
+    number_option(data, "llmDeadlineMs", minimum=0)
+    return (number_option(data, "depth", integer=True, minimum=1), number_option(data, "timeMs", minimum=0),
+            number_option(data, "workers", integer=True, minimum=1))
@@ -0,0 +1,239 @@
+"""
+Réflexion en arrière-plan pendant le tour de l'humain (pondering).
+
+Après avoir renvoyé son coup, le serveur cherche déjà sa réponse aux coups les plus
+probables de l'humain. Chaque résultat complet est rangé dans le cache de coups sous
+la clé exacte de la future requête : si l'humain joue un coup prévu, la réponse est
+immédiate (source "ponder"). Au coup suivant, le travail en cours pour le même
+propriétaire (session ou partie) est annulé ; il n'en reste que les entrées du cache
+et, pour une partie gérée côté serveur, une table de transposition déjà remplie.
+
+Coût borné : un seul thread par processus, un budget de temps par position pondérée,
+au plus OTHELLO_PONDER_MOVES réponses examinées et OTHELLO_PONDER_QUEUE positions en
+attente (les plus anciennes sont abandonnées).
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from bitboard import allow_diagonal, from_board, iter_bits
+from search import Searcher, Position, BLACK, WHITE
+from evaluation import make_evaluator
+from cache import move_cache
+from ai import apply_move, get_search_config, resolve_depth, search_position
+
+# Pondering actif pour toutes les requêtes (sinon seulement avec `ponder: true`)
+PONDER_DEFAULT = os.getenv("OTHELLO_PONDER", "0") == "1"
+
+# Réponses de l'humain examinées, dans l'ordre de vraisemblance
+PONDER_MOVES = int(os.getenv("OTHELLO_PONDER_MOVES", "6"))
+
+# Temps total (ms) consacré à une position ; les variants laissent 20 à 45 s à l'humain
+PONDER_BUDGET_MS = float(os.getenv("OTHELLO_PONDER_MS", "15000"))
+
+# Positions en attente au-delà desquelles la plus ancienne est abandonnée
+PONDER_QUEUE = int(os.getenv("OTHELLO_PONDER_QUEUE", "8"))
+
+# Table de transposition des positions pondérées sans moteur de partie
+PONDER_TT_SIZE_LOG2 = 16
+
+
+class PonderJob:
+    """Position où l'humain est au trait, et paramètres de la recherche attendue ensuite"""
+
+    def __init__(self, owner, geom, own, opp, empty, side, depth, time_ms, config, searcher=None):
+        self.owner = owner
+        self.geom = geom
+        self.own, self.opp, self.empty, self.side = own, opp, empty, side
+        self.depth = depth
+        self.time_ms = time_ms
+        self.config = config
+        self.searcher = searcher
+        self.cancelled = False
+        self.finished = threading.Event()
+        self.positions = 0
+
+
+class Ponderer:
+    """File de positions à pondérer, traitée par un unique thread en arrière-plan"""
+
+    def __init__(self, max_moves=PONDER_MOVES, budget_ms=PONDER_BUDGET_MS, max_queue=PONDER_QUEUE):
+        self.max_moves = max_moves
+        self.budget_ms = budget_ms
+        self.max_queue = max_queue
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._current = None
+        self._thread = None
+        self.started = 0
+        self.cancelled = 0
+        self.dropped = 0
+        self.positions = 0
+
+    def start(self, owner, geom, own, opp, empty, side, depth, time_ms, config, searcher=None):
+        """
+        Programme le pondering d'une position où l'humain (`side`) est au trait.
+        Remplace le travail encore en attente ou en cours du même propriétaire.
+
+        Args:
+            depth, time_ms, config: paramètres de la prochaine recherche de l'IA
+                (ceux de la requête qui vient d'être servie)
+            searcher (Searcher, optionnel): moteur de la partie ; il ne doit plus être
+                utilisé par quelqu'un d'autre avant cancel(owner)
+        """
+        job = PonderJob(owner, geom, own, opp, empty, side, depth, time_ms, config, searcher)
+        self.cancel(owner)
+        with self._lock:
+            self._jobs[owner] = job
+            self.started += 1
+            while len(self._jobs) > self.max_queue:
+                _, dropped = self._jobs.popitem(last=False)
+                dropped.cancelled = True
+                dropped.finished.set()
+                self.dropped += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="ponder", daemon=True)
+                self._thread.start()
+            self._wakeup.notify()
+        return job
+
+    def start_after_move(self, owner, board, player, move, depth, time_ms, config):
+        """
+        Pondering pour /move : position obtenue après le coup `move` de l'IA (`player`),
+        avec les paramètres de la requête qui vient d'être servie.
+        """
+        config = get_search_config(board, config)
+        board = apply_move(board, move, player, config)
+        human = "white" if player == "black" else "black"
+        geom, own, opp, empty = from_board(board, human, allow_diagonal(config))
+        depth = resolve_depth(geom.size, depth, time_ms)
+        side = BLACK if human == "black" else WHITE
+        return self.start(owner, geom, own, opp, empty, side, depth, time_ms, config)
+
+    def start_after_packed_move(self, owner, packed, player, move, depth, time_ms, config):
+        """start_after_move pour un plateau compact (wire.PackedBoard), sans liste de listes"""
+        config = packed.search_config(config)
+        human = "white" if player == "black" else "black"
+        geom, own, opp, empty = packed.play(move, player, config).sides(human, config)
+        depth = resolve_depth(geom.size, depth, time_ms)
+        side = BLACK if human == "black" else WHITE
+        return self.start(owner, geom, own, opp, empty, side, depth, time_ms, config)
+
+    def cancel(self, owner):
+        """
+        Arrête le pondering de `owner` et attend que son moteur soit libre.
+        Les positions déjà résolues restent dans le cache.
+
+        Returns:
+            int: positions pondérées jusque-là pour ce propriétaire (0 si aucun travail)
+        """
+        with self._lock:
+            job = self._jobs.pop(owner, None)
+            current = self._current if self._current is not None and self._current.owner == owner else None
+            job = job or current
+            if job is None:
+                return 0
+            job.cancelled = True
+            self.cancelled += 1
+            if job is not current:
+                job.finished.set()
+        # La recherche réinitialise son échéance au début de chaque appel : la forcer
+        # jusqu'à ce que le thread ait rendu la main
+        while not job.finished.wait(0.005):
+            searcher = job.searcher
+            if searcher is not None:
+                searcher.deadline = 0.0
+        return job.positions
+
+    def shutdown(self):
+        """Abandonne tout le pondering en attente ou en cours (arrêt du serveur)"""
+        with self._lock:
+            owners = list(self._jobs)
+            if self._current is not None:
+                owners.append(self._current.owner)
+        for owner in owners:
+            self.cancel(owner)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while not self._jobs:
+                    self._wakeup.wait()
+                _, job = self._jobs.popitem(last=False)
+                self._current = job
+            try:
+                self._ponder(job)
+            except Exception as e:
+                print(f"Pondering error: {e}")
+            finally:
+                with self._lock:
+                    self._current = None
+                job.finished.set()
+
+    def _ponder(self, job):
+        geom = job.geom
+        if job.searcher is None:
+            job.searcher = Searcher(geom, make_evaluator(geom, job.config), PONDER_TT_SIZE_LOG2)
+        searcher = job.searcher
+        deadline = time.perf_counter() + self.budget_ms / 1000
+        for own, opp, empty in self.likely_replies(job, searcher):
+            if job.cancelled:
+                return
+            remaining_ms = (deadline - time.perf_counter()) * 1000
+            if remaining_ms <= 0:
+                return
+            self._search_reply(job, searcher, own, opp, empty, remaining_ms)
+
+    def likely_replies(self, job, searcher):
+        """
+        Positions (camp de l'IA au trait) après les coups les plus probables de l'humain :
+        ceux qui laissent à l'IA la plus mauvaise évaluation statique, ou la passe.
+
+        Returns:
+            list: [(own, opp, empty), ...] du point de vue de l'IA
+        """
+        pos = Position.from_sides(job.geom, job.own, job.opp, job.empty, job.side)
+        moves = pos.valid_moves()
+        if not moves:
+            return [(job.opp, job.own, job.empty)] if pos.opponent_moves() else []
+        scored = []
+        for index in iter_bits(moves):
+            pos.make_move(index)
+            scored.append((searcher.evaluate(pos), pos.own(), pos.opp(), pos.empty))
+            pos.unmake_move()
+        scored.sort(key=lambda item: item[0])
+        return [(own, opp, empty) for _, own, opp, empty in scored[:self.max_moves]]
+
+    def _search_reply(self, job, searcher, own, opp, empty, remaining_ms):
+        side = 1 - job.side
+        budget_ms = job.time_ms if job.time_ms is not None and job.time_ms <= remaining_ms else remaining_ms
+        result = search_position(job.geom, own, opp, empty, side, job.depth, budget_ms, workers=1,
+                                 config=dict(job.config, useCache=False), searcher=searcher)
+        # Recherche annulée ou écourtée par le budget : rien à mettre en cache
+        if job.cancelled or result.move is None or (budget_ms != job.time_ms and result.depth < job.depth):
+            return
+        black, white = (own, opp) if side == BLACK else (opp, own)
+        key = move_cache.make_key(job.geom, black, white, empty, side, job.depth, job.time_ms, job.config)
+        move_cache.put(key, (result.move, result.score, result.depth, "ponder"))
+        job.positions += 1
+        with self._lock:
+            self.positions += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "queued": len(self._jobs),
+                "running": self._current is not None,
+                "maxMoves": self.max_moves,
+                "budgetMs": self.budget_ms,
+                "started": self.started,
+                "cancelled": self.cancelled,
+                "dropped": self.dropped,
+                "positions": self.positions
+            }
+
+
+# Pondering partagé par toutes les requêtes du processus
+ponderer = Ponderer()
@@ -0,0 +1,460 @@
+"""
+Moteur de recherche pour le mode Minimax.
+
+Negamax avec élagage alpha-beta (variante PVS), table de transposition
+indexée par hash de Zobrist, ordonnancement des coups (coup de la table,
+killer moves, heuristique d'historique) et approfondissement itératif.
+Toutes les positions sont manipulées sous forme de bitboards (voir bitboard.py).
+"""
+import random
+import time
+from functools import lru_cache
+
+from bitboard import valid_moves_mask, flips_mask, iter_bits
+from evaluation import make_evaluator
+
+INF = 1 << 30
+
+# Type de borne stockée dans la table de transposition
+EXACT, LOWER, UPPER = 0, 1, 2
+
+BLACK, WHITE = 0, 1
+
+# L'horloge n'est consultée qu'une fois tous les 1024 noeuds
+TIME_CHECK_MASK = 1023
+
+
+class SearchTimeout(Exception):
+    """Levée quand le budget de temps d'une recherche est épuisé"""
+
+
+class SearchResult:
+    """Résultat d'une recherche : coup joué et statistiques associées"""
+
+    __slots__ = ("move", "score", "depth", "nodes", "elapsed", "source", "stats")
+
+    def __init__(self, move, score, depth, nodes, start, source="search"):
+        self.move = move
+        self.score = score
+        self.depth = depth
+        self.nodes = nodes
+        self.elapsed = time.perf_counter() - start
+        # "search" (alpha-beta), "endgame" (résolution exacte) ou "book" (bibliothèque d'ouvertures)
+        self.source = source
+        # Statistiques détaillées (seulement avec InstrumentedSearcher, voir stats.py)
+        self.stats = None
+
+    def to_dict(self):
+        result = {
+            "source": self.source,
+            "score": self.score,
+            "depth": self.depth,
+            "nodes": self.nodes,
+            "elapsedMs": round(self.elapsed * 1000, 2)
+        }
+        if self.stats is not None:
+            result["stats"] = self.stats
+        return result
+
+
+@lru_cache(maxsize=None)
+def zobrist_keys(size):
+    """
+    Clés de Zobrist (64 bits) pour un plateau de `size` cases.
+    La graine est fixe afin que les hash soient reproductibles d'une exécution à l'autre.
+
+    Returns:
+        tuple: (clés noires, clés blanches, clés de retournement, clé du trait aux blancs)
+    """
+    rng = random.Random(0x0E11 + size)
+    black = [rng.getrandbits(64) for _ in range(size)]
+    white = [rng.getrandbits(64) for _ in range(size)]
+    flip = [b ^ w for b, w in zip(black, white)]
+    return black, white, flip, rng.getrandbits(64)
+
+
+def zobrist_hash(size, black, white, side):
+    black_keys, white_keys, _, side_key = zobrist_keys(size)
+    h = side_key if side == WHITE else 0
+    for i in iter_bits(black):
+        h ^= black_keys[i]
+    for i in iter_bits(white):
+        h ^= white_keys[i]
+    return h
+
+
+class TranspositionTable:
+    """
+    Table de transposition de taille fixe (puissance de 2), une entrée par slot.
+
+    Politique de remplacement : on écrase une entrée si elle date d'une recherche
+    précédente (génération différente), si c'est la même position, ou si la nouvelle
+    entrée a été calculée à une profondeur au moins égale.
+    """
+
+    def __init__(self, size_log2=18):
+        self.mask = (1 << size_log2) - 1
+        self.slots = [None] * (1 << size_log2)
+        self.generation = 0
+
+    def new_search(self):
+        self.generation += 1
+
+    def clear(self):
+        self.slots = [None] * len(self.slots)
+
+    def probe(self, key):
+        entry = self.slots[key & self.mask]
+        if entry is not None and entry[0] == key:
+            return entry
+        return None
+
+    def store(self, key, depth, value, flag, move):
+        index = key & self.mask
+        entry = self.slots[index]
+        if (entry is None or entry[0] == key or entry[5] != self.generation
+                or depth >= entry[1]):
+            self.slots[index] = (key, depth, value, flag, move, self.generation)
+
+
+class Position:
+    """
+    Position mutable utilisée pendant la recherche.
+
+    make_move / unmake_move modifient la position sur place et enregistrent ce qu'il
+    faut pour revenir en arrière dans des piles préallouées (une case par ply) :
+    aucune copie de plateau n'est faite pendant la recherche. Les nombres de pions
+    et le hash de Zobrist sont tenus à jour de façon incrémentale.
+    """
+
+    __slots__ = ("geom", "discs", "counts", "empty", "side", "hash", "ply",
+                 "_moves", "_flips", "_hashes", "_keys", "_flip_keys", "_side_key")
+
+    def __init__(self, geom, black, white, empty, side):
+        self.geom = geom
+        self.discs = [black, white]
+        self.counts = [black.bit_count(), white.bit_count()]
+        self.empty = empty
+        self.side = side
+        self.hash = zobrist_hash(geom.size, black, white, side)
+        self.ply = 0
+
+        black_keys, white_keys, self._flip_keys, self._side_key = zobrist_keys(geom.size)
+        self._keys = (black_keys, white_keys)
+        # Chaque coup remplit une case ; les passes ne peuvent pas s'enchaîner deux fois
+        stack_size = 2 * empty.bit_count() + 2
+        self._moves = [0] * stack_size
+        self._flips = [0] * stack_size
+        self._hashes = [0] * stack_size
+
+    @classmethod
+    def from_sides(cls, geom, own, opp, empty, side):
+        """Construit une position à partir des bitboards du camp au trait et de son adversaire"""
+        if side == BLACK:
+            return cls(geom, own, opp, empty, side)
+        return cls(geom, opp, own, empty, side)
+
+    def own(self):
+        return self.discs[self.side]
+
+    def opp(self):
+        return self.discs[1 - self.side]
+
+    def disc_diff(self):
+        """Différence de pions du point de vue du camp au trait"""
+        return self.counts[self.side] - self.counts[1 - self.side]
+
+    def valid_moves(self):
+        side = self.side
+        return valid_moves_mask(self.geom, self.discs[side], self.discs[1 - side], self.empty)
+
+    def opponent_moves(self):
+        side = self.side
+        return valid_moves_mask(self.geom, self.discs[1 - side], self.discs[side], self.empty)
+
+    def make_move(self, index):
+        """
+        Joue la case `index` pour le camp au trait (le coup doit être légal).
+
+        Returns:
+            int: bitboard des pions retournés
+        """
+        side = self.side
+        discs = self.discs
+        move = 1 << index
+        flips = flips_mask(self.geom, discs[side], discs[1 - side], move)
+
+        ply = self.ply
+        self._moves[ply] = index
+        self._flips[ply] = flips
+        self._hashes[ply] = self.hash
+        self.ply = ply + 1
+
+        discs[side] |= flips | move
+        discs[1 - side] ^= flips
+        self.empty ^= move
+        n = flips.bit_count()
+        self.counts[side] += n + 1
+        self.counts[1 - side] -= n
+
+        h = self.hash ^ self._side_key ^ self._keys[side][index]
+        flip_keys = self._flip_keys
+        while flips:
+            low = flips & -flips
+            h ^= flip_keys[low.bit_length() - 1]
+            flips ^= low
+        self.hash = h
+        self.side = 1 - side
+        return self._flips[ply]
+
+    def make_pass(self):
+        """Le camp au trait passe son tour"""
+        ply = self.ply
+        self._moves[ply] = -1
+        self._hashes[ply] = self.hash
+        self.ply = ply + 1
+        self.hash ^= self._side_key
+        self.side = 1 - self.side
+
+    def unmake_move(self):
+        """Annule le dernier make_move ou make_pass"""
+        ply = self.ply - 1
+        self.ply = ply
+        self.hash = self._hashes[ply]
+        side = 1 - self.side
+        self.side = side
+        index = self._moves[ply]
+        if index < 0:
+            return
+        move = 1 << index
+        flips = self._flips[ply]
+        discs = self.discs
+        discs[side] ^= flips | move
+        discs[1 - side] |= flips
+        self.empty |= move
+        n = flips.bit_count()
+        self.counts[side] -= n + 1
+        self.counts[1 - side] += n
+
+
+class Searcher:
+    """
+    Recherche alpha-beta sur une géométrie donnée.
+    Un même Searcher peut être réutilisé pour plusieurs coups : sa table de
+    transposition et son historique restent valides tant que la géométrie
+    et les cases jouables ne changent pas.
+    """
+
+    def __init__(self, geom, evaluator=None, tt_size_log2=18):
+        self.geom = geom
+        self.tt = TranspositionTable(tt_size_log2)
+        # Évaluation du point de vue du camp au trait (voir evaluation.py)
+        self.evaluator = evaluator or make_evaluator(geom)
+        self.evaluate = self.evaluator.evaluate
+        self.final_score = self.evaluator.final_score
+        self.history = [0] * geom.size
+        self.killers = []
+        self.nodes = 0
+        self.deadline = None
+        self.root_best = None
+
+    def _ordered_moves(self, moves, tt_move, ply):
+        killers = self.killers[ply]
+        history = self.history
+        scored = []
+        for i in iter_bits(moves):
+            if i == tt_move:
+                score = INF
+            elif i in killers:
+                score = INF >> 1
+            else:
+                score = history[i]
+            scored.append((score, i))
+        scored.sort(key=lambda item: -item[0])
+        return [i for _, i in scored]
+
+    def negamax(self, pos, depth, alpha, beta, ply):
+        self.nodes += 1
+        if self.deadline is not None and not self.nodes & TIME_CHECK_MASK:
+            if time.perf_counter() > self.deadline:
+                raise SearchTimeout()
+        alpha_orig, beta_orig = alpha, beta
+
+        h = pos.hash
+        entry = self.tt.probe(h)
+        tt_move = None
+        if entry is not None:
+            tt_move = entry[4]
+            if entry[1] >= depth:
+                value, flag = entry[2], entry[3]
+                if flag == EXACT:
+                    return value
+                if flag == LOWER and value > alpha:
+                    alpha = value
+                elif flag == UPPER and value < beta:
+                    beta = value
+                if alpha >= beta:
+                    return value
+
+        if depth == 0:
+            return self.evaluate(pos)
+
+        moves = pos.valid_moves()
+        if not moves:
+            if not pos.opponent_moves():
+                return self.final_score(pos)
+            # Passe : l'adversaire rejoue sur la même position
+            pos.make_pass()
+            score = -self.negamax(pos, depth, -beta, -alpha, ply + 1)
+            pos.unmake_move()
+            return score
+
+        while len(self.killers) <= ply:
+            self.killers.append([None, None])
+
+        best = -INF
+        best_move = None
+        first = True
+        for i in self._ordered_moves(moves, tt_move, ply):
+            pos.make_move(i)
+            try:
+                if first:
+                    score = -self.negamax(pos, depth - 1, -beta, -alpha, ply + 1)
+                    first = False
+                else:
+                    # Principal Variation Search : fenêtre nulle puis re-recherche si besoin
+                    score = -self.negamax(pos, depth - 1, -alpha - 1, -alpha, ply + 1)
+                    if alpha < score < beta:
+                        score = -self.negamax(pos, depth - 1, -beta, -score, ply + 1)
+            finally:
+                pos.unmake_move()
+            if score > best:
+                best = score
+                best_move = i
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                self.on_cutoff(i, depth, ply)
+                break
+
+        if best <= alpha_orig:
+            flag = UPPER
+        elif best >= beta_orig:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.tt.store(h, depth, best, flag, best_move)
+        return best
+
+    def on_cutoff(self, move, depth, ply):
+        """Coupure bêta sur le coup `move` : il devient "killer" de ce ply et gagne en historique"""
+        killers = self.killers[ply]
+        if move != killers[0]:
+            killers[1] = killers[0]
+            killers[0] = move
+        self.history[move] += depth * depth
+
+    def search_root(self, pos, depth, root_order):
+        """
+        Recherche à profondeur fixe depuis la racine.
+        Le meilleur coup courant est conservé dans `root_best` pour pouvoir
+        être utilisé si l'itération est interrompue par la limite de temps.
+
+        Returns:
+            tuple: (score, index du meilleur coup)
+        """
+        alpha, beta = -INF, INF
+        best_move = None
+        for i in root_order:
+            pos.make_move(i)
+            try:
+                score = -self.negamax(pos, depth - 1, -beta, -alpha, 1)
+            finally:
+                pos.unmake_move()
+            if score > alpha:
+                alpha = score
+                best_move = i
+                self.root_best = (alpha, i)
+        return alpha, best_move
+
+    def principal_variation(self, pos, max_length):
+        """
+        Variante principale lue dans la table de transposition à partir de `pos`
+        (au plus `max_length` demi-coups). La position est restaurée avant de rendre la main.
+
+        Returns:
+            list: index des cases jouées (None pour une passe)
+        """
+        pv = []
+        seen = {pos.hash}
+        played = 0
+        try:
+            while len(pv) < max_length:
+                moves = pos.valid_moves()
+                if not moves:
+                    if not pos.opponent_moves():
+                        break
+                    pos.make_pass()
+                    played += 1
+                    pv.append(None)
+                    continue
+                entry = self.tt.probe(pos.hash)
+                if entry is None or entry[4] is None or not (moves >> entry[4]) & 1:
+                    break
+                pos.make_move(entry[4])
+                played += 1
+                pv.append(entry[4])
+                if pos.hash in seen:
+                    break
+                seen.add(pos.hash)
+        finally:
+            for _ in range(played):
+                pos.unmake_move()
+        return pv
+
+    def search(self, own, opp, empty, depth, side, time_ms=None):
+        """
+        Approfondissement itératif de 1 à `depth`.
+        Le meilleur coup de chaque itération est examiné en premier à la suivante.
+
+        Si `time_ms` est fourni, la recherche s'arrête dès que le budget est écoulé
+        et renvoie le meilleur coup trouvé jusque-là. La profondeur 1 est toujours
+        terminée, pour ne jamais renvoyer un coup choisi au hasard.
+
+        Returns:
+            SearchResult: move vaut None si aucun coup n'est possible
+        """
+        start = time.perf_counter()
+        self.nodes = 0
+        self.deadline = None
+        pos = Position.from_sides(self.geom, own, opp, empty, side)
+        moves = pos.valid_moves()
+        if not moves:
+            return SearchResult(None, self.evaluate(pos), 0, 0, start)
+
+        self.tt.new_search()
+        self.killers = []
+        root_order = list(iter_bits(moves))
+        # Au-delà du nombre de cases vides (+1 pour atteindre le score final), approfondir ne change plus rien
+        depth = max(1, min(depth, empty.bit_count() + 1))
+        score, best, reached = 0, root_order[0], 0
+        for d in range(1, depth + 1):
+            if time_ms is not None and d > 1:
+                elapsed = time.perf_counter() - start
+                # L'itération suivante coûte plusieurs fois la précédente : inutile
+                # de la lancer s'il reste moins de la moitié du budget
+                if elapsed * 2000 >= time_ms:
+                    break
+                self.deadline = start + time_ms / 1000
+            self.root_best = None
+            try:
+                score, best = self.search_root(pos, d, root_order)
+            except SearchTimeout:
+                if self.root_best is not None:
+                    score, best = self.root_best
+                break
+            reached = d
+            root_order.remove(best)
+            root_order.insert(0, best)
+        self.deadline = None
+        return SearchResult(self.geom.coords(best), score, reached, self.nodes, start)
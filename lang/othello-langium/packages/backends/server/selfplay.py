@@ -0,0 +1,310 @@
+"""
+Parties IA contre IA sans navigateur (self-play, tournois).
+
+Les variants sont lus dans examples/variant*/ (taille, forme, scoreGoal, cases
+initiales) et les parties sont réparties sur un pool de processus. Chaque partie
+terminée est écrite immédiatement sur une ligne JSONL ; le bilan final donne les
+taux de victoire par paire de joueurs, les parties/s et les nœuds/s.
+
+    python selfplay.py --players minimax:3 random --games 1000 --out results.jsonl
+    python selfplay.py --players minimax:4:positional minimax:4:disc --variants variant1,variant4
+    python selfplay.py --players llm minimax:2 --llm-stub
+
+Joueurs : "random", "minimax[:profondeur[:évaluateur]]", "llm" (avec --llm-stub,
+un client factice remplace OpenRouter : aucun appel réseau).
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from ai import get_valid_moves, apply_move, search_minimax, get_llm_move, set_llm_client, to_algebraic
+from evaluation import EVALUATORS
+from variants import EXAMPLES_DIR, load_variants, initial_board
+
+# Profondeur Minimax par défaut d'un joueur "minimax" (et du repli d'un joueur "llm")
+DEFAULT_PLAYER_DEPTH = 3
+
+# Demi-coups joués au hasard en début de partie : sans eux, deux Minimax déterministes
+# rejoueraient toujours la même partie
+DEFAULT_RANDOM_PLIES = 4
+
+_LEGAL_MOVES_RE = re.compile(r"Possible legal moves:\s*(.*)")
+
+
+def parse_player(spec):
+    """
+    Returns:
+        dict: {"spec", "type", "depth", "evaluator"}
+
+    Raises:
+        ValueError: joueur inconnu
+    """
+    parts = spec.split(":")
+    kind = parts[0]
+    if kind == "random" and len(parts) == 1:
+        return {"spec": spec, "type": "random", "depth": None, "evaluator": None}
+    if kind in ("minimax", "llm") and len(parts) <= 3:
+        depth = int(parts[1]) if len(parts) > 1 and parts[1] else DEFAULT_PLAYER_DEPTH
+        evaluator = parts[2] if len(parts) > 2 else None
+        if evaluator is not None and evaluator not in EVALUATORS:
+            raise ValueError(f"Unknown evaluator '{evaluator}' in player '{spec}'")
+        return {"spec": spec, "type": kind, "depth": depth, "evaluator": evaluator}
+    raise ValueError(f"Unknown player '{spec}' (expected random, minimax[:depth[:evaluator]] or llm)")
+
+
+class StubLLMClient:
+    """
+    Client LLM factice : choisit un coup dans la liste des coups légaux du prompt.
+    `illegal_rate` permet de simuler des réponses invalides (repli sur Minimax).
+    """
+
+    def __init__(self, seed=None, illegal_rate=0.0):
+        self.rng = random.Random(seed)
+        self.illegal_rate = illegal_rate
+
+    def chat(self, messages, session_id=None):
+        match = _LEGAL_MOVES_RE.search(messages[-1]["content"])
+        moves = [m.strip() for m in match.group(1).split(",")] if match else []
+        move = "Z99" if not moves or self.rng.random() < self.illegal_rate else self.rng.choice(moves)
+        final_json = {"reasoning": "stub", "move": move}
+        return json.dumps(final_json), final_json, None
+
+
+def play_game(config, black, white, seed=0, random_plies=DEFAULT_RANDOM_PLIES):
+    """
+    Joue une partie complète entre deux joueurs (dicts renvoyés par parse_player).
+
+    Returns:
+        dict: résultat compact (vainqueur, score, coups joués, nœuds et temps de recherche)
+    """
+    rng = random.Random(seed)
+    board = initial_board(config)
+    base_config = {"boardType": config.get("boardType", "square"),
+                   "scoreGoal": config.get("scoreGoal", "max"),
+                   "allowDiagonal": config.get("allowDiagonal", True),
+                   "useCache": False}
+    players = {"black": black, "white": white}
+    player = "black"
+    moves = []
+    passes = 0
+    nodes = 0
+    search_time = 0.0
+    llm_fallbacks = 0
+    start = time.perf_counter()
+
+    while passes < 2:
+        valid = get_valid_moves(board, player, config)
+        opponent = "white" if player == "black" else "black"
+        if not valid:
+            passes += 1
+            moves.append("--")
+            player = opponent
+            continue
+        passes = 0
+
+        spec = players[player]
+        move = None
+        if len(moves) < random_plies or spec["type"] == "random":
+            move = rng.choice(valid)
+        else:
+            if spec["type"] == "llm":
+                llm_move = get_llm_move(board, player, config)
+                if llm_move is not None:
+                    move = tuple(llm_move)
+                else:
+                    llm_fallbacks += 1
+            if move is None:
+                search_config = dict(base_config, evaluator=spec["evaluator"])
+                result = search_minimax(board, player, spec["depth"], workers=1, config=search_config)
+                nodes += result.nodes
+                search_time += result.elapsed
+                move = result.move
+
+        board = apply_move(board, move, player, config)
+        moves.append(to_algebraic(*move))
+        player = opponent
+
+    black_discs = sum(row.count("black") for row in board)
+    white_discs = sum(row.count("white") for row in board)
+    diff = black_discs - white_discs
+    if config.get("scoreGoal") == "min":
+        diff = -diff
+    winner = "black" if diff > 0 else "white" if diff < 0 else "draw"
+    return {
+        "variant": config.get("variant"),
+        "black": black["spec"],
+        "white": white["spec"],
+        "winner": winner,
+        "score": [black_discs, white_discs],
+        "plies": len(moves),
+        "nodes": nodes,
+        "searchMs": round(search_time * 1000, 1),
+        "ms": round((time.perf_counter() - start) * 1000, 1),
+        "llmFallbacks": llm_fallbacks,
+        "moves": " ".join(moves)
+    }
+
+
+def _init_worker(llm_stub, quiet, seed):
+    if quiet:
+        sys.stdout = open(os.devnull, "w")
+    if llm_stub:
+        set_llm_client(StubLLMClient(seed=f"{seed}-{os.getpid()}"))
+
+
+def _play_task(task):
+    index, config, black, white, seed, random_plies = task
+    result = play_game(config, black, white, seed, random_plies)
+    result["game"] = index
+    return result
+
+
+def schedule(variants, players, games, seed=0, random_plies=DEFAULT_RANDOM_PLIES):
+    """
+    Parties à jouer : pour chaque variant et chaque paire de joueurs, `games` parties
+    en alternant les couleurs.
+
+    Returns:
+        list: tâches (indice, config, joueur noir, joueur blanc, graine, demi-coups aléatoires)
+    """
+    tasks = []
+    pairs = list(itertools.combinations(players, 2)) or [(players[0], players[0])]
+    for config in variants:
+        for a, b in pairs:
+            for g in range(games):
+                black, white = (a, b) if g % 2 == 0 else (b, a)
+                tasks.append((len(tasks), config, black, white, seed + len(tasks), random_plies))
+    return tasks
+
+
+def summarize(results, players, elapsed):
+    """Taux de victoire par variant et paire de joueurs, débit en parties et en nœuds"""
+    pairs = {}
+    for r in results:
+        a, b = sorted((r["black"], r["white"]), key=[p["spec"] for p in players].index)
+        stats = pairs.setdefault((r["variant"], a, b), {"variant": r["variant"], "a": a, "b": b,
+                                                        "games": 0, "aWins": 0, "bWins": 0, "draws": 0})
+        stats["games"] += 1
+        if r["winner"] == "draw":
+            stats["draws"] += 1
+        # Deux joueurs identiques : les victoires de noir sont comptées pour "a"
+        elif r[r["winner"]] == a and (a != b or r["winner"] == "black"):
+            stats["aWins"] += 1
+        else:
+            stats["bWins"] += 1
+    for stats in pairs.values():
+        # Une nulle compte pour une demi-victoire
+        stats["aWinRate"] = round((stats["aWins"] + stats["draws"] / 2) / stats["games"], 4)
+
+    nodes = sum(r["nodes"] for r in results)
+    search_seconds = sum(r["searchMs"] for r in results) / 1000
+    return {
+        "games": len(results),
+        "elapsedSeconds": round(elapsed, 3),
+        "gamesPerSecond": round(len(results) / elapsed, 3) if elapsed else None,
+        "nodes": nodes,
+        "nodesPerSecond": round(nodes / search_seconds) if search_seconds else None,
+        "nodesPerSecondWall": round(nodes / elapsed) if elapsed else None,
+        "llmFallbacks": sum(r["llmFallbacks"] for r in results),
+        "pairs": list(pairs.values())
+    }
+
+
+def run_tournament(variants, players, games, workers=None, out=None, seed=0,
+                   random_plies=DEFAULT_RANDOM_PLIES, llm_stub=False, quiet=True, progress=None):
+    """
+    Joue toutes les parties et écrit chaque résultat dès qu'il est connu.
+
+    Args:
+        variants (list): configurations de variants (voir variants.load_variants)
+        players (list): specs de joueurs ("minimax:3", "random", "llm")
+        workers (int, optionnel): processus utilisés (par défaut : tous les cœurs)
+        out (str, optionnel): fichier JSONL des résultats (une partie par ligne)
+        progress (callable, optionnel): appelé avec (parties terminées, total)
+
+    Returns:
+        dict: bilan (voir summarize)
+    """
+    players = [parse_player(p) for p in players]
+    tasks = schedule(variants, players, games, seed, random_plies)
+    workers = workers or os.cpu_count() or 1
+    results = []
+    out_file = open(out, "w", encoding="utf-8") if out else None
+    start = time.perf_counter()
+    try:
+        def record(result):
+            results.append(result)
+            if out_file:
+                out_file.write(json.dumps(result, separators=(",", ":")) + "\n")
+                out_file.flush()
+            if progress:
+                progress(len(results), len(tasks))
+
+        if workers == 1:
+            if llm_stub:
+                set_llm_client(StubLLMClient(seed=seed))
+            for task in tasks:
+                record(_play_task(task))
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(llm_stub, quiet, seed)) as pool:
+                futures = [pool.submit(_play_task, task) for task in tasks]
+                for future in as_completed(futures):
+                    record(future.result())
+    finally:
+        if out_file:
+            out_file.close()
+    return summarize(results, players, time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless AI vs AI games over a process pool")
+    parser.add_argument("--players", nargs="+", default=["minimax:3", "random"],
+                        help="random, minimax[:depth[:evaluator]] or llm; every pair plays every variant")
+    parser.add_argument("--variants", help="comma-separated variant names (default: all shipped variants)")
+    parser.add_argument("--examples", default=EXAMPLES_DIR, help="directory holding variant*/variant*.othello")
+    parser.add_argument("--games", type=int, default=100, help="games per variant and pair of players")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--random-plies", type=int, default=DEFAULT_RANDOM_PLIES,
+                        help="random opening half-moves, so that games differ")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="JSONL file receiving one line per finished game")
+    parser.add_argument("--summary", help="JSON file receiving the final report")
+    parser.add_argument("--llm-stub", action="store_true", help="answer LLM moves with an offline stub client")
+    args = parser.parse_args()
+
+    variants = load_variants(args.examples)
+    if args.variants:
+        names = args.variants.split(",")
+        missing = [n for n in names if n not in variants]
+        if missing:
+            parser.error(f"unknown variants: {', '.join(missing)}")
+        variants = {n: variants[n] for n in names}
+
+    def progress(done, total):
+        if done == total or done % max(1, total // 20) == 0:
+            print(f"\r{done}/{total} games", end="", file=sys.stderr, flush=True)
+
+    summary = run_tournament(list(variants.values()), args.players, args.games, args.workers, args.out,
+                             args.seed, args.random_plies, args.llm_stub, progress=progress)
+    print(file=sys.stderr)
+
+    for p in summary["pairs"]:
+        print(f"{p['variant']:<10} {p['a']:>20} vs {p['b']:<20} "
+              f"{p['aWins']:>5}-{p['draws']}-{p['bWins']:<5} win rate {p['aWinRate']:.1%}")
+    print(f"{summary['games']} games in {summary['elapsedSeconds']}s "
+          f"({summary['gamesPerSecond']} games/s, {summary['nodesPerSecond']} nodes/s per process, "
+          f"{summary['nodesPerSecondWall']} nodes/s overall)")
+    if args.summary:
+        with open(args.summary, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
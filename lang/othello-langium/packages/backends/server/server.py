@@ -1,18 +1,40 @@
-from flask import Flask, request, jsonify, render_template, send_from_directory
+from flask import Flask, Response, request, jsonify, render_template, send_from_directory
 from flask_cors import CORS
+import cProfile
+import io
+import json
 import os
+import pstats
+import queue
 import sys
-from ai import get_minimax_move, get_llm_move
+import threading
+import time
+from ai import search_minimax, race_llm_minimax, llm_deadline
+from analysis import AnalysisCancelled, analyze_positions, parse_options, parse_positions
+from parallel import init_search_pool
+from cache import move_cache
+from games import game_store, create_game
+from jobs import search_jobs, ServerBusy, DeadlineExceeded, REQUEST_DEADLINE_MS
+from metrics import metrics
+from ponder import ponderer, PONDER_DEFAULT
+from params import number_option, parse_search_options
+from wire import WireFormatError, decode_body, encode_body, search_packed
 from dotenv import load_dotenv
 
 sys.path.append(os.path.join(os.path.dirname(__file__), '../llm'))
 
 try:
-    from llm_logger import start_game_session, end_game_session, get_current_session, reset_game
+    from llm_logger import (start_game_session, end_game_session, get_current_session, get_session_stats,
+                            new_session_id, is_valid_session_id, is_session_ended)
     LOGGING_ENABLED = True
 except ImportError:
     LOGGING_ENABLED = False
 
+try:
+    from response_cache import response_cache
+except ImportError:
+    response_cache = None
+
 load_dotenv()
 
 BASE_DIR = os.path.dirname(__file__)
@@ -25,6 +47,89 @@ app = Flask(__name__,
 
 CORS(app, resources={r"/*": {"origins": "*"}})
 
+# Part du timer DSL (run-time `timer`, en secondes) accordée à l'IA quand le client
+# ne précise pas de budget `timeMs`
+TIMER_SHARE = 0.1
+
+# Statistiques détaillées de la recherche (nœuds par profondeur, coupures, variante
+# principale...) jointes à chaque réponse, même si le client ne demande pas `stats`
+SEARCH_STATS = os.getenv("OTHELLO_SEARCH_STATS", "0") == "1"
+
+# Profilage cProfile à la demande (`profile: true` dans /move) : désactivé par défaut,
+# les fichiers .prof sont écrits dans OTHELLO_PROFILE_DIR s'il est défini
+PROFILING_ENABLED = os.getenv("OTHELLO_PROFILING", "0") == "1"
+PROFILE_DIR = os.getenv("OTHELLO_PROFILE_DIR")
+PROFILE_TOP = int(os.getenv("OTHELLO_PROFILE_TOP", "25"))
+
+# Un seul profileur peut être actif à la fois dans l'interpréteur
+_profile_lock = threading.Lock()
+
+def get_time_budget(time_ms, config):
+    """
+    Calcule le budget de temps (ms) d'une recherche à partir de `timeMs` et du timer DSL.
+    Le timer du variant reste toujours une borne supérieure.
+    """
+    timer = config.get("timer")
+    if timer:
+        timer_ms = float(timer) * 1000
+        if time_ms is None:
+            return timer_ms * TIMER_SHARE
+        return min(float(time_ms), timer_ms)
+    return float(time_ms) if time_ms is not None else None
+
+def profiled(fn, reports):
+    """
+    Version de `fn` exécutée sous cProfile (dans le thread qui l'appelle). Le rapport,
+    fonctions les plus coûteuses triées par temps cumulé, est ajouté à `reports`.
+    """
+    def run(*args):
+        profiler = cProfile.Profile()
+        with _profile_lock:
+            result = profiler.runcall(fn, *args)
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(PROFILE_TOP)
+        if PROFILE_DIR:
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            name = f"move_{time.strftime('%Y%m%d_%H%M%S')}_{id(profiler):x}.prof"
+            profiler.dump_stats(os.path.join(PROFILE_DIR, name))
+        reports.append(out.getvalue())
+        return result
+    return run
+
+def request_deadline(data):
+    """
+    Échéance absolue (time.perf_counter()) d'une requête de coup : `deadlineMs` du
+    client, plafonné par OTHELLO_REQUEST_DEADLINE_MS. Appelée avant la mise en file.
+
+    Raises:
+        ValueError: `deadlineMs` non numérique ou négatif
+    """
+    deadline_ms = REQUEST_DEADLINE_MS
+    client_ms = number_option(data, "deadlineMs", minimum=0)
+    if client_ms is not None:
+        deadline_ms = min(client_ms, deadline_ms)
+    return time.perf_counter() + deadline_ms / 1000
+
+def llm_deadline_ms(data, deadline, config):
+    """
+    Délai accordé au LLM : `llmDeadlineMs`, sinon ai.llm_deadline (OTHELLO_LLM_DEADLINE_MS
+    borné par le timer DSL), jamais au-delà de l'échéance de la requête
+    """
+    remaining_ms = max(0.0, (deadline - time.perf_counter()) * 1000)
+    deadline_ms = data.get("llmDeadlineMs")
+    if deadline_ms is None:
+        deadline_ms = llm_deadline(config)
+    return min(deadline_ms, remaining_ms)
+
+@app.errorhandler(ServerBusy)
+@app.errorhandler(DeadlineExceeded)
+def search_unavailable(e):
+    """File des recherches pleine ou échéance dépassée : 503 immédiat, avec le délai conseillé"""
+    response = jsonify({"error": str(e), "retryAfter": e.retry_after})
+    response.status_code = 503
+    response.headers["Retry-After"] = str(e.retry_after)
+    return response
+
 @app.route("/", methods=["GET"])
 def home():
     return render_template("index.html")
@@ -53,9 +158,15 @@ def start_game():
     try:
         data = request.json or {}
         game_mode = data.get('game_mode', 'human_vs_llm')
+        previous_id = data.get('session_id')
+        if previous_id is not None and not is_valid_session_id(previous_id):
+            return jsonify({'status': 'error', 'message': 'Invalid session_id'}), 400
         
-        # Réinitialiser la session (termine l'ancienne si elle existe et en crée une nouvelle)
-        new_session = reset_game()
+        # Terminer la partie précédente de ce client, puis en créer une nouvelle ;
+        # le client renvoie le nouvel identifiant avec chaque requête /move et /end_game
+        if previous_id:
+            end_game_session(session_id=previous_id)
+        new_session = start_game_session(game_mode=game_mode, session_id=new_session_id())
         
         print(f"New session started: {new_session.session_id} (mode: {game_mode})") 
 
@@ -85,8 +196,11 @@ def end_game():
         data = request.json or {}
         winner = data.get('winner')  # 'black', 'white', ou 'draw'
         final_scores = data.get('final_scores')  # {'black': 28, 'white': 36}
+        session_id = data.get('session_id')
+        if session_id is not None and not is_valid_session_id(session_id):
+            return jsonify({'status': 'error', 'message': 'Invalid session_id'}), 400
         
-        log_path = end_game_session(winner=winner, final_scores=final_scores)
+        log_path = end_game_session(winner=winner, final_scores=final_scores, session_id=session_id)
         
         if log_path:
             print(f"Game finished and saved: {log_path}")
@@ -105,59 +219,437 @@ def end_game():
         print(f"Error end_game: {e}")
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
+@app.route("/sessions/stats", methods=["GET"])
+def sessions_stats():
+    """
+    Endpoint exposant l'état du registre des parties en cours (actives, expirées...).
+    """
+    if not LOGGING_ENABLED:
+        return jsonify({'status': 'disabled', 'message': 'Logging not available'})
+    return jsonify(get_session_stats())
+
+@app.route("/cache/stats", methods=["GET"])
+def cache_stats():
+    """
+    Endpoint exposant les compteurs du cache de coups Minimax (hits, misses, mémoire utilisée...).
+    """
+    return jsonify(move_cache.stats())
+
+@app.route("/cache/clear", methods=["POST"])
+def cache_clear():
+    """
+    Endpoint vidant le cache de coups Minimax.
+    """
+    move_cache.clear()
+    return jsonify({'status': 'success'})
+
+@app.route("/llm/cache/stats", methods=["GET"])
+def llm_cache_stats():
+    """
+    Endpoint exposant les compteurs du cache de réponses LLM (hits, requêtes regroupées...).
+    """
+    if response_cache is None:
+        return jsonify({'status': 'disabled', 'message': 'LLM cache not available'})
+    return jsonify(response_cache.stats())
+
+@app.route("/llm/cache/clear", methods=["POST"])
+def llm_cache_clear():
+    """
+    Endpoint vidant le cache de réponses LLM (mémoire et base SQLite).
+    """
+    if response_cache is None:
+        return jsonify({'status': 'disabled', 'message': 'LLM cache not available'})
+    response_cache.clear()
+    return jsonify({'status': 'success'})
+
+@app.route("/games", methods=["POST"])
+def games_create():
+    """
+    Endpoint créant une partie gérée côté serveur.
+    Le client n'envoie ensuite plus que ses coups (POST /games/<id>/move).
+    """
+    data = request.json or {}
+    try:
+        game = create_game(data, game_store)
+    except (ValueError, KeyError, TypeError, IndexError) as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({**game.state(), "board": game.board()}), 201
+
+@app.route("/games/stats", methods=["GET"])
+def games_stats():
+    """
+    Endpoint exposant le nombre de parties gérées côté serveur.
+    """
+    return jsonify(game_store.stats())
+
+@app.route("/games/<game_id>", methods=["GET"])
+def games_get(game_id):
+    """
+    Endpoint renvoyant la position complète d'une partie (ex. après un rechargement de page).
+    """
+    game = game_store.get(game_id)
+    if game is None:
+        return jsonify({"error": "Unknown game"}), 404
+    with game.lock:
+        return jsonify({**game.state(), "board": game.board()})
+
+@app.route("/games/<game_id>", methods=["DELETE"])
+def games_delete(game_id):
+    if game_store.remove(game_id) is None:
+        return jsonify({"error": "Unknown game"}), 404
+    ponderer.cancel(game_id)
+    return jsonify({"status": "success"})
+
+@app.route("/games/<game_id>/move", methods=["POST"])
+def games_move(game_id):
+    """
+    Endpoint jouant le coup du client (`move` = [r, c], ou null pour passer),
+    puis la réponse de l'IA si `reply` est vrai (par défaut).
+    Seules les cases retournées sont renvoyées, pas le plateau entier.
+    """
+    data = request.json or {}
+    game = game_store.get(game_id)
+    if game is None:
+        return jsonify({"error": "Unknown game"}), 404
+
+    try:
+        parse_search_options(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    with game.lock:
+        move = data.get("move")
+        # Un 503 (file pleine, échéance) doit laisser la partie inchangée : le client
+        # pourra renvoyer le même coup après Retry-After
+        snapshot = game.snapshot()
+        try:
+            flipped = game.play(move)
+        except (ValueError, TypeError) as e:
+            return jsonify({"error": str(e)}), 400
+        try:
+            reply = play_ai_turn(game, data) if data.get("reply", True) else None
+        except (ServerBusy, DeadlineExceeded):
+            game.restore(snapshot)
+            raise
+        return jsonify({"move": move, "flipped": flipped, "reply": reply, **game.state()})
+
+@app.route("/games/<game_id>/ai", methods=["POST"])
+def games_ai(game_id):
+    """
+    Endpoint faisant jouer l'IA pour le camp au trait (ouverture par l'IA, parties IA vs IA).
+    """
+    data = request.json or {}
+    game = game_store.get(game_id)
+    if game is None:
+        return jsonify({"error": "Unknown game"}), 404
+
+    try:
+        parse_search_options(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    with game.lock:
+        snapshot = game.snapshot()
+        try:
+            reply = play_ai_turn(game, data)
+        except (ServerBusy, DeadlineExceeded):
+            game.restore(snapshot)
+            raise
+        return jsonify({"reply": reply, **game.state()})
+
+def play_ai_turn(game, data):
+    """
+    Fait jouer l'IA (Minimax ou LLM) dans une partie gérée côté serveur.
+
+    Returns:
+        dict: coup joué (None pour une passe), cases retournées et statistiques,
+              ou None si la partie est terminée
+    """
+    if game.is_over():
+        return None
+    if not game.valid_moves():
+        game.play(None)
+        return {"player": game.player, "move": None, "flipped": [], "search": None, "race": None}
+
+    player = game.player
+    depth, time_ms, workers = parse_search_options(data)
+    time_ms = get_time_budget(time_ms, game.config)
+    if "depth" not in data and time_ms is None:
+        depth = 3
+    stats = data.get("stats", SEARCH_STATS)
+    ai_type = data.get("aiType", "minimax")
+    deadline = request_deadline(data)
+    race_info = None
+    start = time.perf_counter()
+
+    def minimax():
+        return search_jobs.run(lambda job_deadline: game.search(depth, time_ms, workers, stats, job_deadline),
+                               deadline)
+
+    if ai_type == "llm":
+        best_move, result, race_info = race_llm_minimax(
+            game.board(), player, game.config, depth, time_ms, workers,
+            llm_deadline_ms(data, deadline, game.config), data.get("session_id"), minimax=minimax)
+    else:
+        result = minimax()
+        best_move = result.move
+    metrics.observe_move(ai_type, result, time.perf_counter() - start, race_info and race_info["winner"])
+
+    flipped = game.play(list(best_move))
+    # Pendant que l'adversaire réfléchit, préparer les réponses à ses coups probables
+    if ai_type == "minimax" and data.get("ponder", PONDER_DEFAULT) and not game.is_over():
+        game.ponder(depth, time_ms)
+    return {
+        "player": player,
+        "move": list(best_move),
+        "flipped": flipped,
+        "search": result.to_dict(),
+        "race": race_info
+    }
+
 @app.route("/move", methods=["POST"])
 def move():
     """
     Endpoint pour demander un coup à l'IA (Minimax ou LLM).
     Pour le mode LLM, vérifie qu'une session est active.
+    `stats: true` joint les statistiques détaillées de la recherche, `profile: true`
+    (si OTHELLO_PROFILING=1) le profil cProfile de la recherche.
+    Le corps peut être en MessagePack et le plateau compact (voir wire.py) ; la réponse
+    suit alors le même format, avec le plateau après le coup dans `board`.
+    La recherche passe par la file bornée de jobs.py : 503 + Retry-After si elle est pleine.
     """
     try:
-        data = request.json
-        if not data:
-            return jsonify({"error": "No data provided"}), 400
+        try:
+            data, packed, wire_format = decode_body(request.mimetype, request.get_data())
+        except WireFormatError as e:
+            return jsonify({"error": str(e)}), e.status
+        try:
+            depth, time_ms, workers = parse_search_options(data)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        deadline = request_deadline(data)
 
         # Récupération des données envoyées par le frontend
         board = data.get("board")
         player = data.get("player")
         ai_type = data.get("aiType", "minimax")
-        depth = data.get("depth", 3)
-        config = data.get("config", {})
+        config = data.get("config") or {}
+        time_ms = get_time_budget(time_ms, config)
+        # Avec un budget de temps, la profondeur n'est qu'une borne (approfondissement itératif)
+        if "depth" not in data and time_ms is None:
+            depth = 3
+        session_id = data.get("session_id")
+        stats = data.get("stats", SEARCH_STATS)
+        profile = bool(data.get("profile")) and PROFILING_ENABLED
+        if LOGGING_ENABLED and session_id is not None and not is_valid_session_id(session_id):
+            return jsonify({"error": "Invalid session_id"}), 400
 
-        print(f"Move request: {player} | Mode: {ai_type} | Depth: {depth} | Config: {config}")
+        print(f"Move request: {player} | Mode: {ai_type} | Depth: {depth} | Time: {time_ms} | Config: {config}")
 
-        # Si c'est un coup du LLM et qu'aucune session n'est active, en créer une
+        # Le pondering lancé après le coup précédent de ce client est devenu inutile :
+        # ses réponses déjà calculées restent dans le cache de coups
+        ponder_owner = session_id or f"addr:{request.remote_addr}"
+        ponderer.cancel(ponder_owner)
+
+        # Si c'est un coup du LLM et que la session du client n'existe pas, la créer
+        # (sauf si elle vient d'être terminée : son fichier de log est déjà finalisé)
         if ai_type == "llm" and LOGGING_ENABLED:
-            if get_current_session() is None:
+            if get_current_session(session_id) is None and not is_session_ended(session_id):
                 print("No active session, automatically creating a new session")
-                start_game_session(game_mode="human_vs_llm")
+                start_game_session(game_mode="human_vs_llm", session_id=session_id)
+
+        race_info = None
+        start = time.perf_counter()
+
+        def search(job_deadline):
+            if packed is not None:
+                return search_packed(packed, player, depth, time_ms, workers, config, stats, job_deadline)
+            return search_minimax(board, player, depth, time_ms, workers, config, stats, job_deadline)
 
-        best_move = None
+        profiles = []
+        if profile:
+            search = profiled(search, profiles)
+
+        def minimax():
+            # Exécutée par le pool de recherches, pas dans le thread de la requête
+            return search_jobs.run(search, deadline)
 
         # --- Choix de l'intelligence ---
         if ai_type == "llm":
-            # On essaie d'obtenir un coup via le LLM
-            best_move = get_llm_move(board, player, config)
-            
-            # Si le LLM échoue (erreur API ou réponse invalide), on se replie sur Minimax
-            if best_move is None:
-                print("LLM did not return a valid move. Fallback to Minimax.")
-                best_move = get_minimax_move(board, player, depth)
+            # Le Minimax tourne pendant que le LLM réfléchit : si le LLM échoue (erreur API,
+            # réponse invalide ou délai `llmDeadlineMs` dépassé), son coup est déjà prêt
+            # Le LLM a besoin du plateau en texte : le plateau compact est déplié
+            llm_board = packed.to_board() if packed is not None else board
+            best_move, result, race_info = race_llm_minimax(llm_board, player, config, depth, time_ms, workers,
+                                                            llm_deadline_ms(data, deadline, config), session_id,
+                                                            minimax=minimax)
+            if race_info["winner"] == "minimax":
+                print("LLM did not return a valid move in time. Fallback to Minimax.")
         else:
-            best_move = get_minimax_move(board, player, depth)
+            result = minimax()
+            best_move = result.move
+        metrics.observe_move(ai_type, result, time.perf_counter() - start, race_info and race_info["winner"])
+        if (best_move is not None and ai_type == "minimax" and data.get("ponder", PONDER_DEFAULT)
+                and config.get("useCache", True)):
+            if packed is not None:
+                ponderer.start_after_packed_move(ponder_owner, packed, player, best_move, depth, time_ms, config)
+            else:
+                ponderer.start_after_move(ponder_owner, board, player, best_move, depth, time_ms, config)
         
         # Vérifier si le joueur peut jouer
         can_play = best_move is not None
         
-        return jsonify({
+        response = {
             "move": best_move,
             "canPlay": can_play,
-            "message": "No valid moves" if not can_play else None
-        })
+            "message": "No valid moves" if not can_play else None,
+            "search": result.to_dict(),
+            "race": race_info
+        }
+        if profiles:
+            response["profile"] = profiles[0]
+        if packed is not None:
+            after = packed.play(best_move, player, config)
+            response["board"] = after.encode(raw=wire_format == "msgpack")
+        if wire_format == "msgpack":
+            body, mimetype = encode_body(response, wire_format)
+            return Response(body, mimetype=mimetype)
+        return jsonify(response)
 
+    except (ServerBusy, DeadlineExceeded):
+        raise
     except Exception as e:
         print(f"SERVER ERROR: {e}")
         return jsonify({"error": str(e)}), 500
 
+@app.route("/analyze", methods=["POST"])
+def analyze():
+    """
+    Endpoint d'analyse multi-PV : score et variante principale de chaque coup légal
+    (ou des `topK` meilleurs) pour `board` / `player`, ou pour un lot `positions`.
+    `depth` et `timeMs` s'appliquent à chaque position ; `deadlineMs` à toute la requête.
+    `stream: true` renvoie les résultats partiels au fil des profondeurs (voir stream_analysis).
+    L'analyse passe par la file bornée de jobs.py : 503 + Retry-After si elle est pleine.
+    """
+    data = request.json
+    if not data:
+        return jsonify({"error": "No data provided"}), 400
+    try:
+        positions = parse_positions(data)
+        depth, time_ms, top_k = parse_options(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    deadline = request_deadline(data)
+    config = data.get("config") or {}
+    time_ms = get_time_budget(time_ms, config)
+    if "depth" not in data and time_ms is None:
+        depth = 3
+
+    def run(job_deadline, **callbacks):
+        return analyze_positions(positions, depth, time_ms, top_k, config, job_deadline, **callbacks)
+
+    if data.get("stream"):
+        return stream_analysis(run, len(positions), deadline)
+    start = time.perf_counter()
+    try:
+        results = search_jobs.run(run, deadline)
+    except (ServerBusy, DeadlineExceeded):
+        raise
+    except Exception as e:
+        print(f"ANALYSIS ERROR: {e}")
+        return jsonify({"error": str(e)}), 500
+    return jsonify({"results": results, "elapsedMs": round((time.perf_counter() - start) * 1000, 3)})
+
+def stream_analysis(run, count, deadline):
+    """
+    Réponse NDJSON d'une analyse, une ligne JSON par événement :
+    {"type": "depth", "index", ...} à chaque profondeur terminée d'une position,
+    {"type": "result", "index", ...} à la fin de chaque position, puis
+    {"type": "done", "positions", "elapsedMs"} (ou {"type": "error", "error"}).
+    Si le client se déconnecte, l'analyse s'arrête à la fin de la profondeur en cours.
+    """
+    events = queue.Queue()
+    disconnected = threading.Event()
+    start = time.perf_counter()
+
+    def on_depth(index, report):
+        if disconnected.is_set():
+            raise AnalysisCancelled()
+        events.put({"type": "depth", "index": index, **report})
+
+    def on_result(result):
+        events.put({"type": "result", **result})
+
+    def job(job_deadline):
+        run(job_deadline, on_depth=on_depth, on_result=on_result)
+        events.put({"type": "done", "positions": count,
+                    "elapsedMs": round((time.perf_counter() - start) * 1000, 3)})
+
+    # Refus immédiat (503) si la file est pleine, avant d'ouvrir le flux
+    future = search_jobs.submit(job, deadline)
+    future.add_done_callback(lambda _: events.put(None))
+
+    def generate():
+        try:
+            while True:
+                event = events.get()
+                if event is None:
+                    break
+                yield json.dumps(event) + "\n"
+            error = future.exception() if not future.cancelled() else None
+            if error is not None:
+                yield json.dumps({"type": "error", "error": str(error)}) + "\n"
+        finally:
+            disconnected.set()
+
+    return Response(generate(), mimetype="application/x-ndjson")
+
+@app.route("/metrics", methods=["GET"])
+def metrics_endpoint():
+    """
+    Endpoint exposant les compteurs agrégés des recherches et l'état des caches
+    au format texte Prometheus.
+    """
+    cache = move_cache.stats()
+    games = game_store.stats()
+    gauges = [
+        ("othello_move_cache_entries", cache["entries"], "Positions held by the Minimax move cache"),
+        ("othello_move_cache_hits_total", cache["hits"], "Minimax move cache hits", "counter"),
+        ("othello_move_cache_misses_total", cache["misses"], "Minimax move cache misses", "counter"),
+        ("othello_games_active", games["active"], "Server-side games in memory"),
+    ]
+    if LOGGING_ENABLED:
+        gauges.append(("othello_llm_sessions_active", get_session_stats()["active"], "Open LLM logging sessions"))
+    if response_cache is not None:
+        llm_cache = response_cache.stats()
+        gauges.append(("othello_llm_cache_hits_total", llm_cache["hits"], "LLM response cache hits", "counter"))
+        gauges.append(("othello_llm_cache_misses_total", llm_cache["misses"], "LLM response cache misses", "counter"))
+    jobs = search_jobs.stats()
+    gauges += [
+        ("othello_ponder_positions_total", ponderer.stats()["positions"],
+         "Replies prepared in the background during the opponent's turn", "counter"),
+        ("othello_search_jobs_running", jobs["running"], "Minimax searches running"),
+        ("othello_search_jobs_queued", jobs["queued"], "Minimax searches waiting for a worker"),
+        ("othello_search_jobs_rejected_total", jobs["rejected"], "Searches refused with a 503", "counter"),
+        ("othello_search_jobs_timed_out_total", jobs["timedOut"], "Searches past their request deadline",
+         "counter"),
+    ]
+    return Response(metrics.render(gauges), mimetype="text/plain; version=0.0.4")
+
+@app.route("/ponder/stats", methods=["GET"])
+def ponder_stats():
+    """
+    Endpoint exposant les compteurs du pondering (positions préparées, travaux annulés...).
+    """
+    return jsonify(ponderer.stats())
+
+@app.route("/jobs/stats", methods=["GET"])
+def jobs_stats():
+    """
+    Endpoint exposant l'état de la file des recherches (en cours, en attente, refusées...).
+    """
+    return jsonify(search_jobs.stats())
+
 
 if __name__ == "__main__":
     print("Starting Flask server...")
@@ -165,4 +657,10 @@ if __name__ == "__main__":
         print("LLM Logging enabled")
     else:
         print("LLM Logging disabled")
+    # Avec le rechargeur de Werkzeug (debug), ce script tourne deux fois : le parent ne fait
+    # que surveiller les fichiers, seul l'enfant (WERKZEUG_RUN_MAIN) sert les requêtes.
+    # Le pool est créé dans l'enfant, avant que le serveur n'y démarre ses threads
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        workers = init_search_pool()
+        print(f"Minimax search workers: {workers}")
     app.run(debug=True)
\ No newline at end of file
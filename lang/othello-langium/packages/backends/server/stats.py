@@ -0,0 +1,168 @@
+"""
+Instrumentation de la recherche Minimax.
+
+InstrumentedSearcher compte les feuilles évaluées, les coupures bêta (via le point
+d'extension Searcher.on_cutoff), les bornes inférieures rangées dans la table de
+transposition, les accès à cette table, les nœuds de chaque ply et le temps de chaque
+itération, puis reconstruit la variante principale. Le Searcher ordinaire n'est pas
+modifié : désactivée, l'instrumentation ne coûte rien. Une réponse qui ne vient pas de la recherche
+séquentielle (cache, bibliothèque, finale, pool de processus) reçoit à la place
+`uninstrumented_stats`, qui en donne la raison.
+"""
+import time
+
+from search import Searcher, Position, LOWER
+
+
+class CountingTable:
+    """Table de transposition qui compte ses accès (délègue tout le reste à la vraie table)"""
+
+    def __init__(self, table):
+        self.table = table
+        self.probes = 0
+        self.hits = 0
+        self.fail_high = 0
+
+    def probe(self, key):
+        self.probes += 1
+        entry = self.table.probe(key)
+        if entry is not None:
+            self.hits += 1
+        return entry
+
+    def store(self, key, depth, value, flag, move):
+        # Score rangé comme borne inférieure : nœud en échec haut
+        if flag == LOWER:
+            self.fail_high += 1
+        self.table.store(key, depth, value, flag, move)
+
+    def __getattr__(self, name):
+        return getattr(self.table, name)
+
+
+# Raison de l'absence de statistiques détaillées, selon l'origine du coup
+UNINSTRUMENTED_REASONS = {
+    "cache": "answered from the move cache",
+    "ponder": "answered from the move cache (computed while pondering)",
+    "book": "answered from the opening book",
+    "endgame": "solved exactly by the endgame solver",
+    "parallel": "searched by the process pool; only the sequential search is instrumented"
+}
+
+
+def uninstrumented_stats(source):
+    """Statistiques d'une réponse qui ne vient pas de la recherche séquentielle instrumentée"""
+    return {"instrumented": False, "source": source, "reason": UNINSTRUMENTED_REASONS.get(source)}
+
+
+class InstrumentedSearcher(Searcher):
+    """Searcher qui joint des statistiques détaillées à son SearchResult (`result.stats`)"""
+
+    def __init__(self, geom, evaluator=None, tt_size_log2=18):
+        super().__init__(geom, evaluator, tt_size_log2)
+        self._instrument()
+
+    @classmethod
+    def from_searcher(cls, searcher):
+        """
+        Version instrumentée d'un Searcher existant : table de transposition, historique
+        et évaluateur sont partagés, l'état "chaud" d'une partie est donc conservé.
+        """
+        instrumented = cls.__new__(cls)
+        instrumented.__dict__.update(searcher.__dict__)
+        instrumented._instrument()
+        return instrumented
+
+    def _instrument(self):
+        self.tt = CountingTable(self.tt.table if isinstance(self.tt, CountingTable) else self.tt)
+        self.cutoffs = 0
+        self.ply_nodes = []
+        self.leaf_evaluations = 0
+        self.iterations = []
+        evaluate, final_score = self.evaluator.evaluate, self.evaluator.final_score
+
+        def counting_evaluate(pos):
+            self.leaf_evaluations += 1
+            return evaluate(pos)
+
+        def counting_final_score(pos):
+            self.leaf_evaluations += 1
+            return final_score(pos)
+
+        self.evaluate = counting_evaluate
+        self.final_score = counting_final_score
+
+    def on_cutoff(self, move, depth, ply):
+        self.cutoffs += 1
+        super().on_cutoff(move, depth, ply)
+
+    def negamax(self, pos, depth, alpha, beta, ply):
+        ply_nodes = self.ply_nodes
+        while len(ply_nodes) <= ply:
+            ply_nodes.append(0)
+        ply_nodes[ply] += 1
+        return super().negamax(pos, depth, alpha, beta, ply)
+
+    def search_root(self, pos, depth, root_order):
+        nodes, start = self.nodes, time.perf_counter()
+        # La racine (ply 0) est cherchée par search_root, les plies suivants par negamax
+        self.ply_nodes = [1]
+        completed = False
+        try:
+            result = super().search_root(pos, depth, root_order)
+            completed = True
+            return result
+        finally:
+            ply_nodes = self.ply_nodes
+            self.iterations.append({
+                "depth": depth,
+                "nodes": self.nodes - nodes,
+                "timeMs": round((time.perf_counter() - start) * 1000, 3),
+                "completed": completed,
+                "nodesPerPly": ply_nodes,
+                # Facteur de branchement effectif de chaque ply : nœuds du ply suivant / nœuds du ply
+                "branchingFactors": [round(ply_nodes[d + 1] / ply_nodes[d], 2) for d in range(len(ply_nodes) - 1)]
+            })
+
+    def search(self, own, opp, empty, depth, side, time_ms=None):
+        tt = self.tt
+        tt.probes = tt.hits = tt.fail_high = 0
+        self.cutoffs = 0
+        self.leaf_evaluations = 0
+        self.iterations = []
+        result = super().search(own, opp, empty, depth, side, time_ms)
+        result.stats = {
+            "instrumented": True,
+            "nodes": self.nodes,
+            "leafEvaluations": self.leaf_evaluations,
+            "betaCutoffs": self.cutoffs,
+            "ttLowerBoundStores": tt.fail_high,
+            "ttProbes": tt.probes,
+            "ttHits": tt.hits,
+            "ttHitRate": round(tt.hits / tt.probes, 4) if tt.probes else None,
+            "iterations": self.iterations,
+            "pv": self.result_variation(own, opp, empty, side, result)
+        }
+        return result
+
+    def result_variation(self, own, opp, empty, side, result):
+        """
+        Variante principale lue dans la table de transposition après la recherche.
+
+        Returns:
+            list: [[r, c], ...] (None pour une passe)
+        """
+        if result.move is None:
+            return []
+        geom = self.geom
+        pos = Position.from_sides(geom, own, opp, empty, side)
+        r, c = result.move
+        index = r * geom.cols + c
+        pos.make_move(index)
+        # Lecture de la table sans fausser les compteurs d'accès
+        counting, self.tt = self.tt, self.tt.table
+        try:
+            rest = self.principal_variation(pos, max(result.depth, 1) - 1)
+        finally:
+            self.tt = counting
+        return [[r, c]] + [None if i is None else list(geom.coords(i)) for i in rest]
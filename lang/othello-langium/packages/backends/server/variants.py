@@ -0,0 +1,102 @@
+"""
+Lecture des variants du DSL (examples/variant*/variant*.othello) côté Python.
+
+Seuls les éléments utiles au moteur sont extraits : taille du plateau,
+paramètres compile-time / run-time et cases initiales. Le format de sortie
+est celui du champ `config` de /move.
+"""
+import glob
+import os
+import re
+
+from evaluation import playable_cells
+
+EXAMPLES_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../../../examples"))
+
+_GAME_RE = re.compile(r"game\s+(\w+)")
+_BOARD_RE = re.compile(r"board\s+(\d+)\s*x\s*(\d+)")
+_BLOCK_RE = r"{}\s*{{(.*?)}}"
+_PARAM_RE = re.compile(r"(\w+)\s*=\s*(\"[^\"]*\"|\S+)")
+_CELL_RE = re.compile(r"cell\s+position\s*\(\s*(\d+)\s*,\s*(\d+)\s*\)\s*=\s*(black|white)")
+
+
+def _parse_value(raw):
+    if raw.startswith('"'):
+        return raw.strip('"')
+    if raw in ("true", "false"):
+        return raw == "true"
+    try:
+        return int(raw)
+    except ValueError:
+        return raw
+
+
+def _parse_block(source, name):
+    match = re.search(_BLOCK_RE.format(re.escape(name)), source, re.DOTALL)
+    if not match:
+        return {}
+    return {key: _parse_value(value) for key, value in _PARAM_RE.findall(match.group(1))}
+
+
+def parse_variant(source):
+    """
+    Analyse le texte d'un programme .othello.
+
+    Returns:
+        dict: name, rows, cols, boardType, scoreGoal, allowDiagonal, initialPosition,
+              timer (et autres paramètres run-time), initial = [[r, c, couleur], ...] (0-indexé)
+    """
+    board = _BOARD_RE.search(source)
+    if not board:
+        raise ValueError("Missing 'board <rows> x <cols>' declaration")
+
+    game = _GAME_RE.search(source)
+    config = {
+        "name": game.group(1) if game else None,
+        "rows": int(board.group(1)),
+        "cols": int(board.group(2)),
+        "boardType": "square",
+        "scoreGoal": "max",
+        "allowDiagonal": True,
+    }
+    config.update(_parse_block(source, "compile-time"))
+    config.update(_parse_block(source, "run-time"))
+
+    initial = re.search(_BLOCK_RE.format("initial"), source, re.DOTALL)
+    config["initial"] = [[int(r) - 1, int(c) - 1, color]
+                         for r, c, color in _CELL_RE.findall(initial.group(1) if initial else "")]
+    return config
+
+
+def load_variant(path):
+    with open(path, encoding="utf-8") as f:
+        config = parse_variant(f.read())
+    config["variant"] = os.path.splitext(os.path.basename(path))[0]
+    return config
+
+
+def load_variants(examples_dir=EXAMPLES_DIR):
+    """
+    Charge tous les variants livrés avec le projet.
+
+    Returns:
+        dict: {"variant1": config, ...}
+    """
+    variants = {}
+    for path in sorted(glob.glob(os.path.join(examples_dir, "variant*", "variant*.othello"))):
+        config = load_variant(path)
+        variants[config["variant"]] = config
+    return variants
+
+
+def initial_board(config):
+    """
+    Plateau initial au format /move ("black" / "white" / None / "wall"),
+    identique à celui que produit la page HTML générée.
+    """
+    rows, cols = config["rows"], config["cols"]
+    cells = playable_cells(rows, cols, config.get("boardType", "square"))
+    board = [[None if (r, c) in cells else "wall" for c in range(cols)] for r in range(rows)]
+    for r, c, color in config.get("initial", []):
+        board[r][c] = color
+    return board
@@ -0,0 +1,252 @@
+"""
+Format compact des plateaux pour /move (trafic IA contre IA à haut débit).
+
+Un plateau compact est un objet {"rows", "cols", "cells"} à la place de la liste de
+listes : 2 bits par case, ligne par ligne (0 vide, 1 noir, 2 blanc, 3 hors plateau),
+quatre cases par octet en commençant par les bits de poids faible. Dans un corps JSON,
+`cells` est encodé en base64 ; dans un corps MessagePack (Content-Type
+application/msgpack, si le module msgpack est installé), ce sont les octets bruts.
+Un plateau 16 x 16 tient en 64 octets (88 en base64) au lieu de plusieurs kilo-octets.
+
+Le plateau compact est décodé directement en bitboards, sans construire la liste de
+listes ; la réponse renvoie le plateau après le coup dans le même format, et dans le
+même type de corps que la requête.
+"""
+import base64
+import json
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+from bitboard import allow_diagonal, get_geometry, flips_mask
+from search import BLACK, WHITE
+from ai import resolve_depth, search_position
+
+JSON_TYPE = "application/json"
+MSGPACK_TYPES = ("application/msgpack", "application/x-msgpack")
+
+# Plus grand plateau accepté (rows x cols) : borne le travail fait avant toute validation
+MAX_CELLS = 64 * 64
+
+EMPTY, BLACK_CELL, WHITE_CELL, WALL = 0, 1, 2, 3
+_CELL_NAMES = (None, "black", "white", "wall")
+
+# Octet (4 cases) -> quartets (noir, blanc, hors plateau), une case par bit
+_UNPACK = []
+for _byte in range(256):
+    _sides = [0, 0, 0]
+    for _j in range(4):
+        _code = (_byte >> (2 * _j)) & 3
+        if _code:
+            _sides[_code - 1] |= 1 << _j
+    _UNPACK.append(tuple(_sides))
+
+# Quartet -> octet où chaque bit du quartet devient le bit bas de sa case
+_SPREAD = [sum(((n >> j) & 1) << (2 * j) for j in range(4)) for n in range(16)]
+
+
+class WireFormatError(ValueError):
+    """Corps de requête ou plateau compact illisible (`status` : code HTTP à renvoyer)"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class PackedBoard:
+    """Plateau compact décodé : bitboards noir, blanc, vide et cases hors plateau"""
+
+    __slots__ = ("rows", "cols", "black", "white", "empty", "walls")
+
+    def __init__(self, rows, cols, black, white, walls):
+        full = (1 << (rows * cols)) - 1
+        self.rows, self.cols = rows, cols
+        self.black, self.white, self.walls = black, white, walls
+        self.empty = full & ~(black | white | walls)
+
+    @classmethod
+    def is_packed(cls, board):
+        return isinstance(board, dict)
+
+    @classmethod
+    def decode(cls, data):
+        """
+        Args:
+            data (dict): {"rows", "cols", "cells"} (cells : base64 ou octets)
+
+        Raises:
+            WireFormatError: dimensions invalides ou `cells` de mauvaise taille
+        """
+        rows, cols, cells = data.get("rows"), data.get("cols"), data.get("cells")
+        if not isinstance(rows, int) or not isinstance(cols, int) or rows <= 0 or cols <= 0:
+            raise WireFormatError("A packed board needs positive integer 'rows' and 'cols'")
+        if rows * cols > MAX_CELLS:
+            raise WireFormatError(f"Packed boards are limited to {MAX_CELLS} cells")
+        if isinstance(cells, str):
+            try:
+                cells = base64.b64decode(cells, validate=True)
+            except ValueError:
+                raise WireFormatError("'cells' is not valid base64")
+        if not isinstance(cells, (bytes, bytearray)) or len(cells) != (rows * cols + 3) // 4:
+            raise WireFormatError(f"'cells' must hold {(rows * cols + 3) // 4} bytes (2 bits per cell)")
+        black = white = walls = 0
+        shift = 0
+        for byte in cells:
+            b, w, x = _UNPACK[byte]
+            black |= b << shift
+            white |= w << shift
+            walls |= x << shift
+            shift += 4
+        # Les bits qui complètent le dernier octet ne sont pas des cases
+        full = (1 << (rows * cols)) - 1
+        return cls(rows, cols, black & full, white & full, walls & full)
+
+    @classmethod
+    def from_board(cls, board):
+        """Plateau compact d'un plateau liste de listes (format /move)"""
+        rows = len(board)
+        cols = len(board[0]) if rows else 0
+        black = white = walls = 0
+        bit = 1
+        for row in board:
+            for cell in row:
+                if cell == "black":
+                    black |= bit
+                elif cell == "white":
+                    white |= bit
+                elif cell is not None:
+                    walls |= bit
+                bit <<= 1
+        return cls(rows, cols, black, white, walls)
+
+    def encode(self, raw=False):
+        """
+        Returns:
+            dict: {"rows", "cols", "cells"} ; `cells` en octets si `raw`, en base64 sinon
+        """
+        out = bytearray((self.rows * self.cols + 3) // 4)
+        b, w, x = self.black, self.white, self.walls
+        for k in range(len(out)):
+            out[k] = _SPREAD[b & 15] | _SPREAD[w & 15] << 1 | _SPREAD[x & 15] * 3
+            b >>= 4
+            w >>= 4
+            x >>= 4
+        cells = bytes(out) if raw else base64.b64encode(out).decode("ascii")
+        return {"rows": self.rows, "cols": self.cols, "cells": cells}
+
+    def to_board(self):
+        """Plateau liste de listes (mode LLM, qui a besoin du plateau en texte)"""
+        board = []
+        bit = 1
+        for _ in range(self.rows):
+            row = []
+            for _ in range(self.cols):
+                code = (BLACK_CELL if self.black & bit else WHITE_CELL if self.white & bit
+                        else WALL if self.walls & bit else EMPTY)
+                row.append(_CELL_NAMES[code])
+                bit <<= 1
+            board.append(row)
+        return board
+
+    def search_config(self, config=None):
+        """Comme ai.get_search_config : sans boardType, un plateau avec des cases hors plateau est circulaire"""
+        config = dict(config or {})
+        if not config.get("boardType"):
+            config["boardType"] = "circle" if self.walls else "square"
+        return config
+
+    def sides(self, player, config=None):
+        """
+        Returns:
+            tuple: (geometry, own, opp, empty) du point de vue de `player`, comme from_board
+        """
+        full = (1 << (self.rows * self.cols)) - 1
+        geom = get_geometry(self.rows, self.cols, full & ~self.walls, allow_diagonal(config))
+        own, opp = (self.black, self.white) if player == "black" else (self.white, self.black)
+        return geom, own, opp, self.empty
+
+    def play(self, move, player, config=None):
+        """Plateau compact après le coup `move` ([r, c]) de `player` (inchangé pour une passe)"""
+        if move is None:
+            return self
+        geom, own, opp, _ = self.sides(player, config)
+        bit = geom.bit(*move)
+        flips = flips_mask(geom, own, opp, bit)
+        own, opp = own | flips | bit, opp & ~flips
+        black, white = (own, opp) if player == "black" else (opp, own)
+        return PackedBoard(self.rows, self.cols, black, white, self.walls)
+
+
+def search_packed(packed, player, depth=None, time_ms=None, workers=None, config=None, stats=False,
+                  deadline=None):
+    """search_minimax pour un plateau compact : les bitboards sont utilisés tels quels"""
+    config = packed.search_config(config)
+    geom, own, opp, empty = packed.sides(player, config)
+    depth = resolve_depth(packed.rows * packed.cols, depth, time_ms)
+    side = BLACK if player == "black" else WHITE
+    return search_position(geom, own, opp, empty, side, depth, time_ms, workers, config, stats=stats,
+                           deadline=deadline)
+
+
+def check_board(board):
+    """
+    Vérifie la forme d'un plateau liste de listes : lignes non vides, toutes de même longueur.
+
+    Raises:
+        WireFormatError: plateau absent ou mal formé
+    """
+    if not isinstance(board, list) or not board:
+        raise WireFormatError("A board is required (list of rows, or packed {rows, cols, cells})")
+    cols = len(board[0]) if isinstance(board[0], list) else 0
+    if not cols or any(not isinstance(row, list) or len(row) != cols for row in board):
+        raise WireFormatError("Each board row must be a non-empty list, all of the same length")
+    if len(board) * cols > MAX_CELLS:
+        raise WireFormatError(f"Boards are limited to {MAX_CELLS} cells")
+
+
+def decode_body(mimetype, body):
+    """
+    Corps d'une requête /move, JSON ou MessagePack selon son Content-Type, et son
+    plateau (liste de listes vérifiée, ou plateau compact décodé).
+
+    Raises:
+        WireFormatError: corps ou plateau illisible (400), MessagePack indisponible (415)
+
+    Returns:
+        tuple: (dict, PackedBoard ou None, "json" ou "msgpack")
+    """
+    if mimetype in MSGPACK_TYPES:
+        if msgpack is None:
+            raise WireFormatError("MessagePack is not available on this server (pip install msgpack)", 415)
+        try:
+            data = msgpack.unpackb(body, raw=False)
+        except Exception as e:
+            raise WireFormatError(f"Invalid MessagePack body: {e}")
+        wire_format = "msgpack"
+    else:
+        try:
+            data = json.loads(body) if body else None
+        except ValueError as e:
+            raise WireFormatError(f"Invalid JSON body: {e}")
+        wire_format = "json"
+    if not data:
+        raise WireFormatError("No data provided")
+    if not isinstance(data, dict):
+        raise WireFormatError("The request body must be an object")
+    board = data.get("board")
+    if PackedBoard.is_packed(board):
+        return data, PackedBoard.decode(board), wire_format
+    check_board(board)
+    return data, None, wire_format
+
+
+def encode_body(payload, wire_format):
+    """
+    Returns:
+        tuple: (octets, mimetype) de la réponse dans le format de la requête
+    """
+    if wire_format == "msgpack":
+        return msgpack.packb(payload, use_bin_type=True), MSGPACK_TYPES[0]
+    return json.dumps(payload, separators=(",", ":")).encode("utf-8"), JSON_TYPE
@@ -0,0 +1,81 @@
+"""
+Point d'entrée de production du serveur (à la place de `python server.py`, qui lance
+le serveur de développement Flask avec le debugger et le rechargement automatique).
+
+    gunicorn -c gunicorn.conf.py wsgi:app     # plusieurs processus, plusieurs threads chacun
+    python wsgi.py                            # idem si gunicorn est installé, sinon
+                                              # serveur Werkzeug multi-thread sans debug
+
+Chaque processus a son pool de recherches borné (jobs.py) et, si OTHELLO_SEARCH_WORKERS > 1,
+son pool de processus de recherche parallèle. À l'arrêt (SIGTERM), les nouvelles
+recherches reçoivent un 503, celles en cours ont OTHELLO_SHUTDOWN_TIMEOUT_S secondes
+pour se terminer, puis les sessions de logs LLM sont fermées.
+"""
+import os
+import shutil
+import signal
+import sys
+
+from server import app
+from parallel import init_search_pool, shutdown_search_pool
+from jobs import search_jobs
+from ponder import ponderer
+
+HOST = os.getenv("OTHELLO_HOST", "127.0.0.1")
+PORT = int(os.getenv("OTHELLO_PORT", "5000"))
+
+# Temps laissé aux recherches en cours lors d'un arrêt
+SHUTDOWN_TIMEOUT = float(os.getenv("OTHELLO_SHUTDOWN_TIMEOUT_S", "30"))
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gunicorn.conf.py")
+
+
+def init_worker():
+    """Appelé dans chaque processus du serveur d'application, après le fork"""
+    return init_search_pool()
+
+
+def shutdown_worker():
+    """
+    Arrêt propre d'un processus : pondering abandonné, plus de nouvelles recherches,
+    attente de celles en cours.
+    Les sessions de logs LLM sont finalisées par le hook atexit de llm_logger.
+
+    Returns:
+        bool: True si toutes les recherches se sont terminées à temps
+    """
+    ponderer.shutdown()
+    drained = search_jobs.shutdown(SHUTDOWN_TIMEOUT)
+    shutdown_search_pool()
+    return drained
+
+
+def _serve_werkzeug():
+    from werkzeug.serving import run_simple
+
+    def stop(signum, frame):
+        # Un seul arrêt : les signaux suivants ne doivent pas interrompre l'attente des recherches
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, stop)
+    print(f"gunicorn not found: serving with the threaded Werkzeug server on http://{HOST}:{PORT}")
+    print(f"Minimax search workers: {init_worker()}")
+    try:
+        run_simple(HOST, PORT, app, threaded=True, use_reloader=False, use_debugger=False)
+    finally:
+        if not shutdown_worker():
+            print("Some searches were still running at shutdown")
+
+
+def main():
+    gunicorn = shutil.which("gunicorn")
+    if gunicorn is None or sys.platform == "win32":
+        _serve_werkzeug()
+        return
+    os.chdir(os.path.dirname(CONFIG_PATH))
+    os.execv(gunicorn, [gunicorn, "-c", CONFIG_PATH, "wsgi:app", *sys.argv[1:]])
+
+
+if __name__ == "__main__":
+    main()